@@ -1,3 +1,116 @@
-from src.services.llm_apadter import LLMAdapter, validate_input
+import importlib
 
-__all__ = ['LLMAdapter', 'validate_input']
\ No newline at end of file
+from src.services.llm_apadter import (
+    AsyncLLMAdapter,
+    LLMAdapter,
+    aiter_adaptations,
+    configure_backend,
+    configure_brief,
+    configure_cache,
+    configure_concurrency,
+    configure_logging,
+    configure_metrics,
+    configure_prompt_layout,
+    configure_rate_limits,
+    configure_resilience,
+    configure_response_format,
+    configure_router,
+    configure_semantic_cache,
+    iter_adaptations,
+    load_environment,
+    process_content,
+    process_content_async,
+    validate_input,
+)
+from src.services.llm_backends import LLMBackend, OfflineBackend
+from src.services.llm_metrics import (
+    InMemoryMetrics,
+    JsonLogSink,
+    MetricsSink,
+    MultiSink,
+    PrometheusMetrics,
+)
+from src.services.model_router import ModelRouter, Route, RoutingRule
+from src.services.output_schema import SchemaValidationError
+from src.services.prompt_templates import PromptRegistry
+from src.services.rate_limiter import RateLimiter
+from src.services.resilience import CircuitBreaker, CircuitOpenError, HedgePolicy
+from src.services.response_cache import (
+    MemoryCache,
+    ResponseCache,
+    SQLiteCache,
+    make_cache_key,
+)
+from src.services.similarity_cache import SemanticCache
+from src.services.token_accounting import PromptTooLargeError, UsageSummary
+
+# El servicio HTTP, la cola de trabajos y los lotes se importan al usarlos:
+# importar el paquete no debe cargar sus dependencias (multiprocessing,
+# sqlite3, asyncio del servidor) si solo se usa el adaptador
+_LAZY_EXPORTS = {
+    'AdaptationService': 'src.services.http_service',
+    'Broker': 'src.services.job_queue',
+    'SQLiteBroker': 'src.services.job_queue',
+    'run_batch': 'src.services.batch_pipeline',
+    'run_workers': 'src.services.job_queue',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+__all__ = [
+    'AdaptationService',
+    'AsyncLLMAdapter',
+    'Broker',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'HedgePolicy',
+    'LLMAdapter',
+    'LLMBackend',
+    'MemoryCache',
+    'ModelRouter',
+    'OfflineBackend',
+    'PromptRegistry',
+    'PromptTooLargeError',
+    'RateLimiter',
+    'ResponseCache',
+    'Route',
+    'RoutingRule',
+    'SQLiteBroker',
+    'SQLiteCache',
+    'SchemaValidationError',
+    'SemanticCache',
+    'UsageSummary',
+    'aiter_adaptations',
+    'configure_backend',
+    'configure_brief',
+    'configure_cache',
+    'configure_concurrency',
+    'configure_logging',
+    'configure_metrics',
+    'configure_prompt_layout',
+    'configure_rate_limits',
+    'configure_resilience',
+    'configure_response_format',
+    'configure_router',
+    'configure_semantic_cache',
+    'iter_adaptations',
+    'load_environment',
+    'make_cache_key',
+    'process_content',
+    'process_content_async',
+    'run_batch',
+    'run_workers',
+    'validate_input',
+]
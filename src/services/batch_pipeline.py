@@ -0,0 +1,316 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+try:
+    from .llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+        validate_input,
+    )
+    from .output_schema import RESPONSE_FORMATS
+    from .token_accounting import merge_usage_summaries
+except ImportError:
+    from llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+        validate_input,
+    )
+    from output_schema import RESPONSE_FORMATS
+    from token_accounting import merge_usage_summaries
+
+logger = logging.getLogger(__name__)
+
+
+def read_records(input_path: str) -> Iterator[Tuple[str, Dict]]:
+    """Lee un JSONL en streaming y genera ``(id, registro)``
+
+    Si el registro no trae ``id`` se usa su número de línea, de modo que el
+    identificador es estable entre ejecuciones sobre el mismo archivo.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Línea {line_number} no es JSON válido: {e}")
+                yield str(line_number), {}
+                continue
+            if not isinstance(record, dict):
+                logger.error(f"Línea {line_number} no es un objeto JSON")
+                yield str(line_number), {}
+                continue
+            yield str(record.get("id", line_number)), record
+
+
+def load_progress(progress_path: str) -> Set[str]:
+    """Carga los identificadores ya completados de una ejecución anterior"""
+    if not os.path.exists(progress_path):
+        return set()
+    with open(progress_path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+class BatchWriter:
+    """Escribe resultados en JSONL y registra el progreso de forma incremental"""
+
+    def __init__(self, output_path: str, progress_path: str):
+        self._lock = threading.Lock()
+        self._output = open(output_path, "a", encoding="utf-8")
+        self._progress = open(progress_path, "a", encoding="utf-8")
+
+    def write(self, record_id: str, payload: Dict, completed: bool = True) -> None:
+        """Añade el resultado; solo los ``completed`` cuentan como progreso"""
+        line = json.dumps({"id": record_id, **payload}, ensure_ascii=False)
+        with self._lock:
+            # El resultado se persiste antes que el progreso: si el proceso
+            # muere entre ambos, el registro se repite pero nunca se pierde
+            self._output.write(line + "\n")
+            self._output.flush()
+            if completed:
+                self._progress.write(record_id + "\n")
+                self._progress.flush()
+
+    def close(self) -> None:
+        self._output.close()
+        self._progress.close()
+
+
+def load_partial_results(output_path: str, completed: Set[str]) -> Dict[str, Dict]:
+    """Última línea de cada registro pendiente que quedó con redes sin adaptar
+
+    En la salida solo se añaden líneas, así que la vigente de cada ``id`` es
+    la última. Solo se conservan las de registros no completados, de modo que
+    la memoria depende de los pendientes y no del tamaño del archivo.
+    """
+    partial: Dict[str, Dict] = {}
+    if not os.path.exists(output_path):
+        return partial
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                # Línea a medio escribir de una ejecución interrumpida
+                continue
+            record_id = str(payload.get("id"))
+            if record_id in completed:
+                continue
+            if "failed_networks" in payload:
+                partial[record_id] = payload
+            else:
+                partial.pop(record_id, None)
+    return partial
+
+
+def process_record(
+    adapter: LLMAdapter,
+    record: Dict,
+    combined: bool = False,
+    previous: Optional[Dict] = None,
+) -> Dict:
+    """Adapta un registro y devuelve la línea de salida correspondiente
+
+    ``failed_networks`` lista las redes que fallaron y merecen reintento;
+    ``unsupported_networks`` las que el adaptador no soporta, que no se
+    reintentan. Con ``previous`` (la línea anterior del mismo registro) solo
+    se vuelven a adaptar sus ``failed_networks`` y se conservan el resto de
+    resultados; ``_usage`` cubre las llamadas de esta línea.
+    """
+    if not validate_input(record):
+        return {"error": "Formato de entrada inválido"}
+
+    target_networks = record["target_networks"]
+    unsupported = [n for n in target_networks if n not in adapter.CHARACTER_LIMITS]
+    supported = [n for n in target_networks if n in adapter.CHARACTER_LIMITS]
+
+    kept = {}
+    networks = supported
+    if previous is not None:
+        kept = {
+            n: result
+            for n, result in previous.get("results", {}).items()
+            if n in supported
+        }
+        networks = [n for n in supported if n not in kept]
+
+    results = {}
+    if networks:
+        results = adapter.adapt_to_multiple_networks(
+            title=record["titulo"],
+            content=record["contenido"],
+            target_networks=networks,
+            combined=combined,
+            include_usage=True,
+        )
+    usage = results.pop("_usage", None)
+    # Mantener el orden solicitado mezclando lo conservado con lo nuevo
+    merged = {
+        n: results[n] if n in results else kept[n]
+        for n in supported
+        if n in results or n in kept
+    }
+    if usage is not None:
+        merged["_usage"] = usage
+
+    payload = {"results": merged}
+    failed = [n for n in supported if n not in merged]
+    if failed:
+        payload["failed_networks"] = failed
+    if unsupported:
+        payload["unsupported_networks"] = unsupported
+    return payload
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int = 4,
+    progress_path: Optional[str] = None,
+    adapter: Optional[LLMAdapter] = None,
+    combined: bool = False,
+) -> Dict:
+    """Procesa un JSONL de entradas con un pool acotado de workers
+
+    Los resultados se añaden a ``output_path`` a medida que terminan y los
+    identificadores completados a ``progress_path`` (por defecto
+    ``<output_path>.progress``). Al relanzar sobre los mismos archivos se
+    omiten los registros ya completados y se reintentan los que terminaron
+    con error o con redes fallidas; de estos solo se adaptan las redes que
+    fallaron. La salida solo crece: la línea vigente de cada ``id`` es la
+    última. Las redes no soportadas se anotan en ``unsupported_networks`` y
+    no impiden completar el registro.
+
+    Las estadísticas devueltas incluyen en ``usage`` los tokens y el coste
+    estimado acumulados de los registros procesados en esta ejecución.
+    """
+    if workers < 1:
+        raise ValueError("workers debe ser al menos 1")
+
+    progress_path = progress_path or f"{output_path}.progress"
+    adapter = adapter or get_adapter()
+    completed = load_progress(progress_path)
+    partial = load_partial_results(output_path, completed)
+    stats = {
+        "processed": 0,
+        "skipped": 0,
+        "failed": 0,
+        "usage": merge_usage_summaries([]),
+    }
+    stats_lock = threading.Lock()
+
+    if completed:
+        logger.info(f"Reanudando lote: {len(completed)} registros ya completados")
+
+    def handle(record_id: str, record: Dict, previous: Optional[Dict]) -> None:
+        try:
+            payload = process_record(adapter, record, combined=combined, previous=previous)
+        except Exception as e:
+            logger.error(f"Error procesando registro {record_id}: {e}")
+            payload = {"error": str(e)}
+        failed = "error" in payload or "failed_networks" in payload
+        writer.write(record_id, payload, completed=not failed)
+        with stats_lock:
+            if failed:
+                stats["failed"] += 1
+            stats["processed"] += 1
+            record_usage = payload.get("results", {}).get("_usage")
+            if record_usage:
+                stats["usage"] = merge_usage_summaries([stats["usage"], record_usage])
+
+    writer = BatchWriter(output_path, progress_path)
+    # Como máximo 2 * workers registros en vuelo: la lectura del archivo
+    # espera a que se liberen huecos en lugar de encolarlo todo en memoria
+    max_pending = workers * 2
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for record_id, record in read_records(input_path):
+                if record_id in completed:
+                    stats["skipped"] += 1
+                    continue
+
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                completed.add(record_id)
+                previous = partial.pop(record_id, None)
+                pending.add(executor.submit(handle, record_id, record, previous))
+
+            wait(pending)
+    finally:
+        writer.close()
+
+    logger.info(
+        f"Lote completado. Procesados: {stats['processed']}, "
+        f"Omitidos: {stats['skipped']}, Con errores: {stats['failed']}, "
+        f"Tokens: {stats['usage']['total'].get('total_tokens', 0)}"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Procesamiento por lotes de contenido desde JSONL"
+    )
+    parser.add_argument("input", help="Archivo JSONL de entrada")
+    parser.add_argument("output", help="Archivo JSONL de resultados")
+    parser.add_argument(
+        "--workers", "-w", type=int, default=4, help="Registros procesados en paralelo"
+    )
+    parser.add_argument(
+        "--progress", "-p", help="Archivo de progreso (por defecto <output>.progress)"
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Una sola petición por registro para todas las redes",
+    )
+    parser.add_argument(
+        "--response-format",
+        choices=RESPONSE_FORMATS,
+        help="Pedir la salida en JSON mode o con esquema JSON estricto",
+    )
+
+    args = parser.parse_args()
+
+    load_environment()
+    configure_logging()
+
+    configure_response_format(args.response_format)
+
+    try:
+        stats = run_batch(
+            args.input,
+            args.output,
+            workers=args.workers,
+            progress_path=args.progress,
+            combined=args.combined,
+        )
+    except KeyboardInterrupt:
+        print("\n⏸️  Lote interrumpido; relanza el mismo comando para reanudar")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"Error en ejecución: {e}")
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from typing import Dict
+
+# Temperatura baja: el brief debe conservar los datos, no reinterpretarlos
+BRIEF_TEMPERATURE = 0.2
+
+DEFAULT_BRIEF_MAX_TOKENS = 500
+
+BRIEF_SYSTEM_PROMPT = """
+Eres un editor que prepara contenido para adaptarlo a redes sociales. Resume el contenido en un brief compacto que servirá de única fuente para redactar las publicaciones:
+- Hechos clave: qué, cuándo, dónde y por qué, con cifras y fechas exactas
+- Entidades: personas, empresas, productos, lugares y enlaces mencionados
+- Llamada a la acción: qué se pide al lector y cómo hacerlo
+- Tono del original
+No inventes datos ni añadas opiniones. Responde solo con el brief, en texto plano.
+"""
+
+
+def build_brief_request(model: str, title: str, content: str, max_tokens: int) -> Dict:
+    """Petición que resume el contenido original en un brief"""
+    user_prompt = f"TÍTULO: {title}\nCONTENIDO: {content}\n"
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": BRIEF_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": BRIEF_TEMPERATURE,
+        "max_tokens": max_tokens,
+    }
@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+try:
+    from .llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_metrics,
+        get_async_adapter,
+        load_environment,
+        validate_input,
+    )
+    from .llm_metrics import InMemoryMetrics, PrometheusMetrics
+except ImportError:
+    from llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_metrics,
+        get_async_adapter,
+        load_environment,
+        validate_input,
+    )
+    from llm_metrics import InMemoryMetrics, PrometheusMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BODY_BYTES = 1_000_000
+
+
+def request_key(input_data: Dict) -> str:
+    """Clave de una entrada: mismo título, contenido y lista de redes
+
+    Las redes cuentan tal como llegan (orden y repeticiones incluidos): la
+    respuesta compartida sigue el orden de la petición que la inició.
+    """
+    canonical = json.dumps(
+        [input_data["titulo"], input_data["contenido"], input_data["target_networks"]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Comparte una única ejecución entre llamadas concurrentes con la misma clave
+
+    La ejecución corre en su propia tarea, de modo que si el cliente que la
+    inició se desconecta el resto sigue esperando el mismo resultado.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marca la excepción como recuperada aunque nadie la espere ya
+            task.exception()
+
+
+class AdaptationService:
+    """Aplicación ASGI con ``POST /adapt``, ``GET /health`` y ``GET /metrics``
+
+    ``POST /adapt`` recibe la entrada documentada (``titulo``, ``contenido``,
+    ``target_networks``) y devuelve lo mismo que ``process_content_async``
+    con ``include_usage=True``, más ``_errors`` con el error de cada red que
+    no se adaptó; si no se adaptó ninguna responde 422 (ninguna red
+    soportada) o 502. Si el servicio no puede crear el adaptador (p. ej.
+    falta ``OPENAI_API_KEY``) responde 500 sin llegar al LLM. Reutiliza los
+    adaptadores del registro y las peticiones idénticas que llegan mientras
+    otra está en curso comparten su llamada al LLM.
+
+    ``metrics`` (por defecto un ``PrometheusMetrics`` nuevo) se expone en
+    ``/metrics``; para que reciba las llamadas de los adaptadores hay que
+    instalarlo con ``configure_metrics(service.metrics)``, como hace
+    ``create_app``.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        metrics: Optional[InMemoryMetrics] = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.max_body_bytes = max_body_bytes
+        self.metrics = metrics if metrics is not None else PrometheusMetrics()
+        self.single_flight = SingleFlight()
+        self.started_at = time.time()
+        self._responses: Counter = Counter()
+        self._routes = {
+            ("POST", "/adapt"): self._adapt,
+            ("GET", "/health"): self._health,
+            ("GET", "/metrics"): self._metrics,
+        }
+
+    async def __call__(self, scope: Dict, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"].rstrip("/") or "/"
+        handler = self._routes.get((scope["method"], path))
+        if handler is not None:
+            status, body, content_type = await handler(scope, receive)
+        elif any(route_path == path for _, route_path in self._routes):
+            status, body, content_type = _json_body(405, {"error": "Método no permitido"})
+        else:
+            # Las rutas desconocidas se agrupan para no disparar la cardinalidad
+            path = "other"
+            status, body, content_type = _json_body(404, {"error": "Ruta no encontrada"})
+
+        self._responses[(path, status)] += 1
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type.encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """Cuerpo completo de la petición, o None si supera el máximo"""
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _adapt(self, scope: Dict, receive) -> Tuple[int, bytes, str]:
+        body = await self._read_body(receive)
+        if body is None:
+            return _json_body(413, {"error": "Cuerpo demasiado grande"})
+        try:
+            input_data = json.loads(body)
+        except ValueError:
+            return _json_body(400, {"error": "El cuerpo no es un JSON válido"})
+        if not isinstance(input_data, dict) or not validate_input(input_data):
+            return _json_body(400, {"error": "Formato de entrada inválido"})
+        if not all(isinstance(n, str) for n in input_data["target_networks"]):
+            return _json_body(400, {"error": "target_networks debe contener nombres de redes"})
+
+        try:
+            adapter = get_async_adapter(self.api_key, self.model, self.base_url)
+        except ValueError as e:
+            # Error de configuración propio, no del proveedor
+            logger.error(f"Servicio mal configurado: {e}")
+            return _json_body(500, {"error": "Servicio mal configurado"})
+
+        async def adapt() -> Tuple[Dict, Dict[str, str]]:
+            errors: Dict[str, str] = {}
+            results = await adapter.adapt_to_multiple_networks(
+                title=input_data["titulo"],
+                content=input_data["contenido"],
+                target_networks=input_data["target_networks"],
+                errors=errors,
+                include_usage=True,
+            )
+            return results, errors
+
+        try:
+            results, errors = await self.single_flight.do(request_key(input_data), adapt)
+        except Exception as e:
+            logger.error(f"Error procesando petición: {e}")
+            return _json_body(502, {"error": str(e)})
+
+        if any(not network.startswith("_") for network in results):
+            return _json_body(200, dict(results, _errors=errors) if errors else results)
+        supported = [n for n in input_data["target_networks"] if n in LLMAdapter.CHARACTER_LIMITS]
+        if not supported:
+            return _json_body(422, {"error": "Ninguna red soportada", "_errors": errors})
+        return _json_body(
+            502,
+            {
+                "error": "No se pudo adaptar ninguna red",
+                "_errors": errors,
+                "_usage": results.get("_usage"),
+            },
+        )
+
+    async def _health(self, scope: Dict, receive) -> Tuple[int, bytes, str]:
+        return _json_body(
+            200,
+            {
+                "status": "ok",
+                "uptime_s": round(time.time() - self.started_at, 3),
+                "inflight": len(self.single_flight),
+            },
+        )
+
+    def service_stats(self) -> Dict:
+        """Respuestas por ruta y estado, y llamadas compartidas"""
+        responses: Dict[str, Dict[str, int]] = {}
+        for (path, status), count in self._responses.items():
+            responses.setdefault(path, {})[str(status)] = count
+        return {
+            "responses": responses,
+            "upstream_calls": self.single_flight.calls,
+            "coalesced": self.single_flight.coalesced,
+            "inflight": len(self.single_flight),
+        }
+
+    async def _metrics(self, scope: Dict, receive) -> Tuple[int, bytes, str]:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("format") == ["prometheus"] and isinstance(
+            self.metrics, PrometheusMetrics
+        ):
+            return 200, self._render_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        return _json_body(200, {"service": self.service_stats(), "llm": self.metrics.summary()})
+
+    def _render_prometheus(self) -> str:
+        stats = self.service_stats()
+        lines = [
+            "# HELP http_responses_total Respuestas del servicio por ruta y estado",
+            "# TYPE http_responses_total counter",
+        ]
+        for path, statuses in sorted(stats["responses"].items()):
+            for status, count in sorted(statuses.items()):
+                lines.append(f'http_responses_total{{path="{path}",status="{status}"}} {count}')
+        lines.append("# HELP adapt_upstream_calls_total Adaptaciones ejecutadas")
+        lines.append("# TYPE adapt_upstream_calls_total counter")
+        lines.append(f"adapt_upstream_calls_total {stats['upstream_calls']}")
+        lines.append("# HELP adapt_coalesced_total Peticiones servidas por otra idéntica en curso")
+        lines.append("# TYPE adapt_coalesced_total counter")
+        lines.append(f"adapt_coalesced_total {stats['coalesced']}")
+        return "\n".join(lines) + "\n" + self.metrics.render()
+
+
+def _json_body(status: int, payload: Dict) -> Tuple[int, bytes, str]:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return status, body, "application/json; charset=utf-8"
+
+
+def create_app(**options) -> AdaptationService:
+    """Aplicación ASGI lista para ``uvicorn src.services.http_service:create_app --factory``
+
+    Instala las métricas del servicio como destino de las del registro.
+    """
+    app = AdaptationService(**options)
+    configure_metrics(app.metrics)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP de adaptación de contenido")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model", help="Modelo (por defecto el del adaptador)")
+    parser.add_argument("--base-url", help="API compatible con OpenAI (p. ej. el mock)")
+    args = parser.parse_args()
+
+    load_environment()
+    configure_logging()
+
+    # Servidor ASGI opcional: solo lo necesita este CLI, no la aplicación
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("Se requiere uvicorn: pip install uvicorn")
+    app = create_app(model=args.model, base_url=args.base_url)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,552 @@
+import abc
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from .batch_pipeline import process_record, read_records
+    from .llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+    )
+    from .output_schema import RESPONSE_FORMATS
+except ImportError:
+    from batch_pipeline import process_record, read_records
+    from llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+    )
+    from output_schema import RESPONSE_FORMATS
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Un trabajo sin confirmar tras este tiempo vuelve a la cola (el cliente
+# HTTP corta a los 60 s, así que cubre varias redes con reintentos)
+DEFAULT_LEASE_SECONDS = 300.0
+
+MAX_RETRY_DELAY = 60.0
+
+
+def idempotency_key_for(payload: Dict) -> str:
+    """Clave por defecto: hash del contenido del trabajo"""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Broker(abc.ABC):
+    """Cola persistente de trabajos con entrega al menos una vez
+
+    Un trabajo reclamado queda asignado durante ``lease_seconds``; si el
+    worker muere sin confirmarlo, vuelve a estar disponible para otro.
+    """
+
+    @abc.abstractmethod
+    def enqueue(
+        self,
+        payload: Dict,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        """Encola un trabajo y devuelve su id (el existente si la clave se repite)"""
+
+    @abc.abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """Reclama el trabajo disponible más antiguo, o None si no hay
+
+        ``result`` trae el resultado parcial del intento anterior, si lo hubo.
+        """
+
+    @abc.abstractmethod
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Renueva la asignación; False si el worker ya no la tiene"""
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """Marca el trabajo terminado; False si el worker ya no tiene la asignación"""
+
+    @abc.abstractmethod
+    def fail(
+        self,
+        job_id: str,
+        worker_id: str,
+        error: str,
+        result: Optional[Dict] = None,
+        retry: bool = True,
+    ) -> bool:
+        """Reintenta el trabajo más tarde o lo marca fallido si agotó sus intentos
+
+        Con ``retry=False`` el error es permanente y el trabajo queda fallido
+        sin más intentos. ``result`` guarda el resultado parcial, que recibe
+        el siguiente intento. Devuelve False si el worker ya no tiene la
+        asignación.
+        """
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Estado, intentos, resultado y error del trabajo, o None si no existe"""
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Número de trabajos por estado"""
+
+
+class SQLiteBroker(Broker):
+    """Broker en un archivo SQLite compartido por procesos de la misma máquina"""
+
+    def __init__(self, path: str = "jobs.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        # Transacciones explícitas: el reclamo necesita BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, available_at)"
+        )
+
+    def enqueue(
+        self,
+        payload: Dict,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        key = idempotency_key or idempotency_key_for(payload)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, idempotency_key, payload, status, "
+                "max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    uuid.uuid4().hex,
+                    key,
+                    json.dumps(payload, ensure_ascii=False),
+                    max_attempts,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            return self._conn.execute(
+                "SELECT id FROM jobs WHERE idempotency_key = ?", (key,)
+            ).fetchone()[0]
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        with self._lock:
+            # BEGIN IMMEDIATE bloquea la escritura entre procesos: dos workers
+            # no pueden reclamar el mismo trabajo
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job = self._claim(worker_id, lease_seconds)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def _claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        while True:
+            row = self._conn.execute(
+                "SELECT id, payload, attempts, max_attempts, status, result FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_until <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, payload, attempts, max_attempts, status, result = row
+            if status == "running" and attempts >= max_attempts:
+                # El último intento murió sin confirmar: no se reintenta más
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    ("Lease expirado en el último intento", now, job_id),
+                )
+                continue
+
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                "lease_until = ?, worker = ?, updated_at = ? WHERE id = ?",
+                (now + lease_seconds, worker_id, now, job_id),
+            )
+            return {
+                "id": job_id,
+                "payload": json.loads(payload),
+                "attempt": attempts + 1,
+                "result": json.loads(result) if result else None,
+            }
+
+    # Solo el worker que tiene la asignación vigente puede confirmar o
+    # renovar: si expiró, el trabajo puede estar ya en manos de otro
+    _LEASED = "id = ? AND status = 'running' AND worker = ? AND lease_until > ?"
+
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET lease_until = ?, updated_at = ? WHERE {self._LEASED}",
+                (now + lease_seconds, now, job_id, worker_id, now),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, "
+                f"lease_until = NULL, updated_at = ? WHERE {self._LEASED}",
+                (json.dumps(result, ensure_ascii=False), now, job_id, worker_id, now),
+            )
+        return cursor.rowcount == 1
+
+    def fail(
+        self,
+        job_id: str,
+        worker_id: str,
+        error: str,
+        result: Optional[Dict] = None,
+        retry: bool = True,
+    ) -> bool:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT attempts, max_attempts FROM jobs WHERE {self._LEASED}",
+                (job_id, worker_id, now),
+            ).fetchone()
+            if row is None:
+                return False
+            attempts, max_attempts = row
+            if not retry or attempts >= max_attempts:
+                status, available_at = "failed", now
+            else:
+                status, available_at = "queued", now + min(MAX_RETRY_DELAY, 2.0 ** attempts)
+            stored = json.dumps(result, ensure_ascii=False) if result is not None else None
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = ?, available_at = ?, "
+                f"lease_until = NULL, updated_at = ? WHERE {self._LEASED}",
+                (status, error, stored, available_at, now, job_id, worker_id, now),
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, idempotency_key, status, attempts, max_attempts, worker, "
+                "result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(
+            zip(
+                (
+                    "id",
+                    "idempotency_key",
+                    "status",
+                    "attempts",
+                    "max_attempts",
+                    "worker",
+                    "result",
+                    "error",
+                    "created_at",
+                    "updated_at",
+                ),
+                row,
+            )
+        )
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def close(self) -> None:
+        """Cierra la conexión con la base de datos"""
+        self._conn.close()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    broker: Broker,
+    worker_id: Optional[str] = None,
+    adapter: Optional[LLMAdapter] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = 1.0,
+    drain: bool = False,
+    combined: bool = False,
+    stop_event: Optional[threading.Event] = None,
+) -> int:
+    """Procesa trabajos de la cola y devuelve cuántos completó
+
+    Con ``drain`` termina cuando no quedan trabajos pendientes ni en curso;
+    si no, sigue esperando nuevos hasta que se active ``stop_event``. Un
+    trabajo solo se completa si todas sus redes se adaptaron. Las redes que
+    fallaron se reintentan con espera (solo ellas: el resto del resultado
+    se conserva entre intentos); una entrada inválida o con redes no
+    soportadas falla sin reintentos, guardando lo que sí se adaptó.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    logger.info(f"Worker {worker_id} iniciado")
+
+    while stop_event is None or not stop_event.is_set():
+        job = broker.claim(worker_id, lease_seconds)
+        if job is None:
+            # Al drenar se espera también a los reintentos pendientes y a los
+            # trabajos de otros workers, que pueden volver a la cola
+            if drain and not _pending(broker):
+                break
+            time.sleep(poll_interval)
+            continue
+
+        with _LeaseHeartbeat(broker, job["id"], worker_id, lease_seconds):
+            try:
+                # El adaptador se crea con el primer trabajo, ya en el proceso worker
+                adapter = adapter or get_adapter()
+                result = process_record(
+                    adapter, job["payload"], combined=combined, previous=job.get("result")
+                )
+                error, retry = _result_error(result)
+            except Exception as e:
+                result, error, retry = job.get("result"), str(e), True
+
+        if error is not None:
+            logger.error(f"Error en el trabajo {job['id']} (intento {job['attempt']}): {error}")
+            if not broker.fail(job["id"], worker_id, error, result=result, retry=retry):
+                logger.warning(f"Trabajo {job['id']}: asignación perdida, no se registra el error")
+            continue
+
+        if broker.complete(job["id"], worker_id, result):
+            processed += 1
+        else:
+            logger.warning(f"Trabajo {job['id']}: asignación perdida, se descarta el resultado")
+
+    logger.info(f"Worker {worker_id} detenido tras {processed} trabajos")
+    return processed
+
+
+def _result_error(result: Dict) -> Tuple[Optional[str], bool]:
+    """Error de un resultado de ``process_record`` y si merece reintento
+
+    El error es None si todas las redes se adaptaron. Una entrada inválida o
+    una red no soportada fallarían igual en cada intento.
+    """
+    if "error" in result:
+        return result["error"], False
+    if "failed_networks" in result:
+        return f"Redes sin adaptar: {', '.join(result['failed_networks'])}", True
+    if "unsupported_networks" in result:
+        return f"Redes no soportadas: {', '.join(result['unsupported_networks'])}", False
+    return None, False
+
+
+class _LeaseHeartbeat:
+    """Renueva la asignación de un trabajo mientras se procesa
+
+    Así un trabajo que tarda más que ``lease_seconds`` no vuelve a la cola
+    mientras su worker sigue vivo.
+    """
+
+    def __init__(self, broker: Broker, job_id: str, worker_id: str, lease_seconds: float):
+        self.broker = broker
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.broker.extend_lease(self.job_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Trabajo {self.job_id}: no se pudo renovar la asignación")
+                return
+
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _pending(broker: Broker) -> int:
+    stats = broker.stats()
+    return stats["queued"] + stats["running"]
+
+
+def _worker_process(
+    broker_factory: Callable[[], Broker],
+    response_format: Optional[str],
+    setup: Optional[Callable[[], None]],
+    options: Dict,
+) -> None:
+    # Los procesos spawn no heredan la configuración de logging del padre
+    configure_logging()
+    configure_response_format(response_format)
+    if setup is not None:
+        setup()
+    try:
+        run_worker(broker_factory(), **options)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_workers(
+    broker_factory: Callable[[], Broker],
+    processes: int = 2,
+    response_format: Optional[str] = None,
+    setup: Optional[Callable[[], None]] = None,
+    **options,
+) -> None:
+    """Lanza ``processes`` workers en procesos separados y espera a que terminen
+
+    ``broker_factory`` se llama dentro de cada proceso (p. ej.
+    ``functools.partial(SQLiteBroker, "jobs.sqlite3")``) para que cada uno
+    tenga su propia conexión. Para escalar a más máquinas basta con lanzar
+    más workers contra el mismo broker.
+
+    Los workers arrancan con spawn y no heredan los ``configure_*`` del
+    registro hechos en este proceso, solo las variables de entorno
+    (``OPENAI_*``, ``LLM_BACKEND``, ``LLM_ROUTES_PATH``...). ``setup`` es
+    una función de módulo que cada worker ejecuta al arrancar para aplicar
+    el resto (límites de tasa, resiliencia, caché...); los límites de tasa
+    son por proceso.
+    """
+    if processes < 1:
+        raise ValueError("processes debe ser al menos 1")
+
+    # spawn: cada worker arranca limpio, sin heredar clientes HTTP ni hilos
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=_worker_process,
+            args=(broker_factory, response_format, setup, options),
+            daemon=False,
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola persistente de adaptaciones")
+    parser.add_argument("--db", default="jobs.sqlite3", help="Archivo SQLite de la cola")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="Encolar las entradas de un JSONL")
+    enqueue.add_argument("input", help="Archivo JSONL de entrada")
+    enqueue.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    work = subparsers.add_parser("work", help="Procesar trabajos con varios procesos")
+    work.add_argument("--processes", "-n", type=int, default=2)
+    work.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS)
+    work.add_argument(
+        "--drain", action="store_true", help="Terminar cuando la cola esté vacía"
+    )
+    work.add_argument(
+        "--combined",
+        action="store_true",
+        help="Una sola petición por registro para todas las redes",
+    )
+    work.add_argument("--response-format", choices=RESPONSE_FORMATS)
+
+    subparsers.add_parser("status", help="Trabajos por estado")
+
+    result = subparsers.add_parser("result", help="Estado y resultado de un trabajo")
+    result.add_argument("job_id")
+
+    args = parser.parse_args()
+
+    load_environment()
+    configure_logging()
+
+    if args.command == "enqueue":
+        broker = SQLiteBroker(args.db)
+        for record_id, record in read_records(args.input):
+            # El id del registro, si lo trae, hace la clave estable entre envíos
+            key = f"record:{record['id']}" if "id" in record else None
+            job_id = broker.enqueue(record, key, max_attempts=args.max_attempts)
+            print(f"{record_id}\t{job_id}")
+    elif args.command == "work":
+        run_workers(
+            functools.partial(SQLiteBroker, args.db),
+            processes=args.processes,
+            response_format=args.response_format,
+            lease_seconds=args.lease,
+            drain=args.drain,
+            combined=args.combined,
+        )
+        print(json.dumps(SQLiteBroker(args.db).stats(), indent=2))
+    elif args.command == "status":
+        print(json.dumps(SQLiteBroker(args.db).stats(), indent=2))
+    else:
+        job = SQLiteBroker(args.db).get(args.job_id)
+        if job is None:
+            print(f"❌ Trabajo no encontrado: {args.job_id}")
+            sys.exit(1)
+        print(json.dumps(job, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,161 @@
-import openai
+import asyncio
+import functools
 import json
 import logging
-import re
 import os
 import sys
-from typing import Dict, List
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-# Cargar variables de entorno desde .env
 try:
-    from dotenv import load_dotenv
-
-    load_dotenv()
+    from .content_brief import DEFAULT_BRIEF_MAX_TOKENS, build_brief_request
+    from .llm_backends import BACKENDS, LLMBackend, create_backend
+    from .llm_metrics import (
+        CallTimer,
+        MetricsSink,
+        merge_usage,
+        timed,
+        usage_to_dict,
+    )
+    from .model_router import ModelRouter, Route, RouteAttempts, router_from_env
+    from .output_schema import (
+        RESPONSE_FORMATS,
+        SchemaValidationError,
+        build_response_format,
+        schema_errors,
+        schema_from_structure,
+        validate_schema,
+    )
+    from .prompt_templates import (
+        PROMPT_LAYOUTS,
+        PromptRegistry,
+        UserPromptTemplate,
+        default_registry,
+    )
+    from .rate_limiter import RateLimiter, estimate_request_tokens
+    from .token_accounting import (
+        MAX_COMBINED_OUTPUT_TOKENS,
+        OVERSIZE_POLICIES,
+        PromptTooLargeError,
+        UsageSummary,
+        chunk_text,
+        context_window,
+        count_message_tokens,
+        count_tokens,
+        max_tokens_for_limit,
+    )
+    from .response_repair import (
+        RepairBudget,
+        build_repair_request,
+        invalid_json_violation,
+        missing_fields_violation,
+        over_length_violation,
+    )
+    from .response_cache import MemoryCache, ResponseCache, config_fingerprint, make_cache_key
+    from .resilience import (
+        CircuitBreaker,
+        HedgePolicy,
+        breaker_for,
+        hedged_call,
+        hedged_call_async,
+    )
+    from .response_parser import loads, parse_json_object
+    from .similarity_cache import SemanticCache
 except ImportError:
-    pass
+    from content_brief import DEFAULT_BRIEF_MAX_TOKENS, build_brief_request
+    from llm_backends import BACKENDS, LLMBackend, create_backend
+    from llm_metrics import (
+        CallTimer,
+        MetricsSink,
+        merge_usage,
+        timed,
+        usage_to_dict,
+    )
+    from model_router import ModelRouter, Route, RouteAttempts, router_from_env
+    from output_schema import (
+        RESPONSE_FORMATS,
+        SchemaValidationError,
+        build_response_format,
+        schema_errors,
+        schema_from_structure,
+        validate_schema,
+    )
+    from prompt_templates import (
+        PROMPT_LAYOUTS,
+        PromptRegistry,
+        UserPromptTemplate,
+        default_registry,
+    )
+    from rate_limiter import RateLimiter, estimate_request_tokens
+    from token_accounting import (
+        MAX_COMBINED_OUTPUT_TOKENS,
+        OVERSIZE_POLICIES,
+        PromptTooLargeError,
+        UsageSummary,
+        chunk_text,
+        context_window,
+        count_message_tokens,
+        count_tokens,
+        max_tokens_for_limit,
+    )
+    from response_repair import (
+        RepairBudget,
+        build_repair_request,
+        invalid_json_violation,
+        missing_fields_violation,
+        over_length_violation,
+    )
+    from response_cache import MemoryCache, ResponseCache, config_fingerprint, make_cache_key
+    from resilience import (
+        CircuitBreaker,
+        HedgePolicy,
+        breaker_for,
+        hedged_call,
+        hedged_call_async,
+    )
+    from response_parser import loads, parse_json_object
+    from similarity_cache import SemanticCache
 
-# Configuración de logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_env_loaded = False
+
+
+def load_environment(env_path: Optional[str] = None) -> None:
+    """Carga las variables de entorno desde .env (si python-dotenv está instalado)
+
+    Las variables ya definidas en el entorno no se sobrescriben.
+    """
+    global _env_loaded
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv(env_path)
+
+
+def configure_logging(level: Optional[int] = None) -> None:
+    """Configura el logging de los CLIs (por defecto el nivel de LOG_LEVEL o INFO)
+
+    Importar el módulo no toca el logging de la aplicación que lo usa.
+    """
+    if level is None:
+        level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    logging.basicConfig(level=level)
+
 
 class LLMAdapter:
     """Adaptador principal para generar contenido específico por red social"""
@@ -40,68 +178,233 @@ class LLMAdapter:
         "whatsapp": 0.6,
     }
 
-    def __init__(self, api_key: str):
-        """Inicializa el adaptador LLM"""
-        self.client = openai.OpenAI(api_key=api_key)
-        logger.info("LLMAdapter inicializado correctamente")
+    # Máximo de peticiones simultáneas al LLM por adaptador
+    DEFAULT_MAX_CONCURRENCY = 5
+
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+
+    # Timeout de cada petición si no se indica otro (el de openai es 10 min)
+    DEFAULT_TIMEOUT = 60.0
+
+    # Reparaciones por adaptación y tokens que pueden consumir en total
+    DEFAULT_MAX_REPAIR_ATTEMPTS = 1
+    DEFAULT_REPAIR_TOKEN_BUDGET = 3000
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout=None,
+        http_client=None,
+        cache: Optional[ResponseCache] = None,
+        cache_max_temperature: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsSink] = None,
+        response_format: Optional[str] = None,
+        max_repair_attempts: int = DEFAULT_MAX_REPAIR_ATTEMPTS,
+        repair_token_budget: int = DEFAULT_REPAIR_TOKEN_BUDGET,
+        prompts: Optional[PromptRegistry] = None,
+        prompt_layout: str = "classic",
+        max_input_tokens: Optional[int] = None,
+        oversize_policy: str = "reject",
+        brief_threshold_tokens: Optional[int] = None,
+        brief_max_tokens: int = DEFAULT_BRIEF_MAX_TOKENS,
+        brief_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedging: Optional[HedgePolicy] = None,
+        deadlines: Optional[Dict[str, float]] = None,
+        router: Optional[ModelRouter] = None,
+        backend: Optional[LLMBackend] = None,
+    ):
+        """Inicializa el adaptador LLM
+
+        Sin ``model`` se usa ``OPENAI_MODEL`` o, si no está definida,
+        ``DEFAULT_MODEL``.
+
+        El cliente OpenAI se crea en la primera petición; ``http_client`` puede
+        ser un cliente httpx o una función que lo crea en ese momento.
+
+        ``cache`` activa la caché de respuestas; con ``cache_max_temperature``
+        (modo determinista) solo se cachean redes cuya temperatura no supere
+        ese valor, p. ej. 0.8 para excluir TikTok (0.9).
+
+        ``rate_limiter`` encola las peticiones según el presupuesto de
+        peticiones y tokens por minuto; puede compartirse entre adaptadores.
+
+        ``metrics`` recibe un registro por llamada con la duración de cada
+        fase y el uso de tokens devuelto por la API.
+
+        ``response_format`` pide la salida en JSON mode (``"json_object"``) o
+        con Structured Outputs (``"json_schema"``, esquema derivado de
+        ``get_json_structure``); en ambos casos se valida contra el esquema.
+
+        Una respuesta con JSON inválido, campos ausentes o texto por encima
+        del límite de la red se repara con turnos cortos de seguimiento, hasta
+        ``max_repair_attempts`` intentos y ``repair_token_budget`` tokens.
+
+        ``prompts`` define los prompts de sistema (por defecto el registro
+        compartido, que lee ``LLM_PROMPTS_PATH`` si está definida).
+
+        ``prompt_layout="prefix_cache"`` coloca las instrucciones y el esquema
+        antes del título y el contenido, de modo que el prefijo del prompt es
+        idéntico entre publicaciones y el proveedor puede cachearlo.
+
+        Antes de enviar se cuentan los tokens del prompt; si no cabe en la
+        ventana de contexto (o en ``max_input_tokens``), ``oversize_policy``
+        decide si se rechaza (``"reject"``) o se recorta el contenido por
+        párrafos y frases hasta que quepa (``"truncate"``).
+
+        Con ``brief_threshold_tokens``, el contenido que supere ese tamaño se
+        resume una sola vez en un brief (hechos, entidades, llamada a la
+        acción) que usan todas las redes; los briefs se cachean por hash del
+        contenido en ``brief_cache`` (por defecto una ``MemoryCache``).
+
+        ``semantic_cache`` reutiliza la adaptación de una publicación casi
+        idéntica (versiones con pequeños retoques) sin pedir una nueva; se
+        consulta tras la caché exacta, con el umbral de similitud de cada red.
+
+        ``circuit_breaker`` hace fallar al instante las peticiones a un
+        endpoint que acumula errores; ``hedging`` replica las peticiones que
+        superan el p95 de latencia de su red y usa la primera respuesta.
+        ``deadlines`` fija por red el tiempo máximo de cada intento (por
+        defecto ``timeout`` o ``DEFAULT_TIMEOUT``).
+
+        ``router`` elige por red y tamaño del prompt el modelo y el endpoint
+        (OpenAI o un servidor local compatible) de cada petición, con cadenas
+        de respaldo si una ruta falla, y registra latencia y coste por ruta.
+
+        ``backend`` sustituye al cliente de openai (p. ej. ``OfflineBackend``,
+        determinista y sin red, para pruebas de carga); el resto del proceso
+        (caché, validación, reparación, métricas) no cambia.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        if response_format is not None and response_format not in RESPONSE_FORMATS:
+            raise ValueError(
+                f"response_format debe ser uno de {RESPONSE_FORMATS}: {response_format}"
+            )
+        self.response_format = response_format
+        if oversize_policy not in OVERSIZE_POLICIES:
+            raise ValueError(
+                f"oversize_policy debe ser uno de {OVERSIZE_POLICIES}: {oversize_policy}"
+            )
+        self.max_input_tokens = max_input_tokens
+        self.brief_threshold_tokens = brief_threshold_tokens
+        self.brief_max_tokens = brief_max_tokens
+        self.brief_cache = brief_cache
+        if brief_threshold_tokens is not None and brief_cache is None:
+            self.brief_cache = MemoryCache(ttl=None, max_entries=1000)
+        self.oversize_policy = oversize_policy
+        self.max_repair_attempts = max_repair_attempts
+        self.repair_token_budget = repair_token_budget
+        self._schemas: Dict[str, Dict] = {}
+        self.prompts = prompts or default_registry()
+        self._user_templates: Dict[str, UserPromptTemplate] = {}
+        self.set_prompt_layout(prompt_layout)
+        self.model = model or default_model()
+        self.router = router
+        self.backend = backend
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.circuit_breaker = circuit_breaker
+        self.hedging = hedging
+        self.deadlines = dict(deadlines or {})
+        self._hedge_executor = None
+        self.cache_max_temperature = cache_max_temperature
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        # El cliente (y el import de openai) se crea con la primera petición
+        self._client_args = (api_key, base_url, timeout, http_client)
+        self._client = None
+        self._route_clients: Dict[Tuple, object] = {}
+        self._client_lock = threading.Lock()
+        self._inflight = self._create_inflight_limiter()
+        logger.info(f"{type(self).__name__} inicializado correctamente")
+
+    @property
+    def client(self):
+        """Cliente OpenAI, creado en el primer uso"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client(*self._client_args)
+        return self._client
+
+    def _create_client(self, api_key: str, base_url, timeout, http_client):
+        """Crea el cliente OpenAI bloqueante"""
+        import openai
+
+        return openai.OpenAI(**self._client_options(api_key, base_url, timeout, http_client))
+
+    def _client_options(self, api_key: str, base_url, timeout, http_client) -> Dict:
+        if callable(http_client):
+            # Factoría del registro: el cliente httpx también se crea tarde y
+            # sus timeouts se aplican a las peticiones
+            http_client = http_client()
+            if timeout is None:
+                timeout = http_client.timeout
+        if timeout is None:
+            timeout = self.DEFAULT_TIMEOUT
+        kwargs = {
+            "api_key": api_key,
+            "base_url": base_url,
+            "http_client": http_client,
+            "timeout": timeout,
+        }
+        if self.rate_limiter is not None:
+            # El limitador reintenta los 429 y los errores transitorios
+            # (5xx, timeouts, conexión) sin duplicar los reintentos del cliente
+            kwargs["max_retries"] = 0
+        return kwargs
+
+    def _create_inflight_limiter(self):
+        # Limita las peticiones en vuelo de este adaptador, aunque se
+        # compartan entre varios hilos o llamadas concurrentes
+        return threading.BoundedSemaphore(self.max_concurrency)
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """Cambia el máximo de peticiones en vuelo
+
+        Las peticiones en curso terminan con el semáforo anterior.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        self.max_concurrency = max_concurrency
+        self._inflight = self._create_inflight_limiter()
+
+    def _release_resources(self) -> List:
+        """Suelta los clientes, el pool de réplicas y el backend
+
+        Devuelve los clientes para que el llamador los cierre; si se vuelve a
+        usar el adaptador se crean de nuevo.
+        """
+        with self._client_lock:
+            clients = [self._client, *self._route_clients.values()]
+            self._client = None
+            self._route_clients = {}
+            executor, self._hedge_executor = self._hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if self.backend is not None:
+            self.backend.close()
+        return [client for client in clients if client is not None]
+
+    def close(self) -> None:
+        """Cierra los clientes HTTP y el pool de réplicas"""
+        for client in self._release_resources():
+            client.close()
 
     def get_system_prompt(self, network: str) -> str:
         """Obtiene el prompt del sistema específico para cada red social"""
-        prompts = {
-            "facebook": """
-Eres un experto en contenido para Facebook. Tu tarea es adaptar contenido para esta red social con estas características:
-- Tono: Casual y amigable, pero profesional
-- Longitud: Máximo 500 caracteres recomendados
-- Emojis: Usar con moderación (1-3 por post)
-- Hashtags: Máximo 5, relevantes y populares
-- Enfoque: Generar engagement y conversación
-- Formato: Texto claro con saltos de línea para legibilidad
-""",
-            "instagram": """
-Eres un experto en contenido para Instagram. Tu tarea es adaptar contenido con estas características:
-- Tono: Visual, inspiracional y moderno
-- Longitud: Máximo 2200 caracteres
-- Emojis: Usar generosamente para impacto visual
-- Hashtags: Entre 5-10, incluye trending y nicho
-- Enfoque: Storytelling visual y engagement
-- Formato: Párrafos cortos, fácil de leer en móvil
-- Imagen: Incluir suggested_image_prompt con descripción detallada para foto/gráfico atractivo
-- Considerar: Estética visual, colores, composición, elementos que generen engagement
-""",
-            "linkedin": """
-Eres un experto en contenido para LinkedIn. Tu tarea es adaptar contenido con estas características:
-- Tono: Profesional, informativo y de valor
-- Longitud: Máximo 3000 caracteres
-- Emojis: Usar mínimamente, solo para énfasis
-- Hashtags: Máximo 3-5, enfocados en industria/profesión
-- Enfoque: Insights profesionales, networking, valor empresarial
-- Formato: Estructura clara con bullet points si es necesario
-""",
-            "tiktok": """
-Eres un experto en contenido para TikTok. Tu tarea es adaptar contenido con estas características:
-- Tono: Divertido, dinámico y trending
-- Longitud: Máximo 4000 caracteres
-- Emojis: Usar abundantemente para expresión
-- Hashtags: Entre 3-8, incluir trending y challenges
-- Enfoque: Entretenimiento, trends, viralidad
-- Formato: Energético, call-to-action claros
-- Video: Incluir suggested_video_prompt con descripción detallada para crear video viral
-- Considerar: Transiciones, efectos, música trending, hooks visuales
-""",
-            "whatsapp": """
-Eres un experto en contenido para WhatsApp. Tu tarea es adaptar contenido con estas características:
-- Tono: Personal, directo y conversacional
-- Longitud: Máximo 4000 caracteres, pero preferible conciso
-- Emojis: Usar naturalmente como en conversación
-- Hashtags: Evitar o usar muy pocos (1-2 máximo)
-- Enfoque: Comunicación directa, información útil
-- Formato: Como mensaje personal, fácil de reenviar
-""",
-        }
-        return prompts.get(network, prompts["facebook"])
+        return self.prompts.system_prompt(network)
 
-    def get_user_prompt(self, title: str, content: str, network: str) -> str:
-        """Crea el prompt del usuario específico para la adaptación"""
+    def get_json_structure(self, network: str) -> Dict:
+        """Estructura JSON de salida esperada para cada red social"""
         # Crear estructura JSON base
         json_structure = {
             "text": "texto adaptado aquí",
@@ -118,111 +421,967 @@ Eres un experto en contenido para WhatsApp. Tu tarea es adaptar contenido con es
         elif network == "tiktok":
             json_structure["suggested_video_prompt"] = "descripción para video sugerido"
 
-        # Convertir a string JSON para mostrar en el prompt
-        json_example = json.dumps(json_structure, indent=4, ensure_ascii=False)
+        return json_structure
 
-        return f"""
-Adapta el siguiente contenido para {network}:
+    def get_output_schema(self, network: str) -> Dict:
+        """JSON Schema de la salida de una red, derivado de su estructura"""
+        schema = self._schemas.get(network)
+        if schema is None:
+            schema = schema_from_structure(self.get_json_structure(network))
+            self._schemas[network] = schema
+        return schema
 
-TÍTULO: {title}
-CONTENIDO: {content}
+    def _response_format_param(self, name: str, schema: Dict) -> Dict:
+        return build_response_format(self.response_format, name, schema)
+
+    def set_prompt_layout(self, layout: str) -> None:
+        """Cambia la disposición del prompt de usuario (ver PROMPT_LAYOUTS)"""
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"prompt_layout debe ser uno de {PROMPT_LAYOUTS}: {layout}")
+        self.prompt_layout = layout
+        self._user_templates = {}
+
+    def get_user_prompt(self, title: str, content: str, network: str) -> str:
+        """Crea el prompt del usuario específico para la adaptación"""
+        template = self._user_templates.get(network)
+        if template is None:
+            # La estructura JSON y el límite son fijos por red: se construyen una vez
+            template = UserPromptTemplate(
+                network,
+                self.get_json_structure(network),
+                self.CHARACTER_LIMITS[network],
+                self.prompt_layout,
+            )
+            self._user_templates[network] = template
+        return template.render(title, content)
+
+    def max_output_tokens(self, network: str) -> int:
+        """``max_tokens`` de la red, derivado de su límite de caracteres"""
+        return max_tokens_for_limit(self.CHARACTER_LIMITS[network])
+
+    def input_token_budget(self, max_tokens: int, model: Optional[str] = None) -> int:
+        """Tokens de prompt admitidos junto a ``max_tokens`` de salida"""
+        budget = context_window(model or self.model) - max_tokens
+        if self.max_input_tokens is not None:
+            budget = min(budget, self.max_input_tokens)
+        return budget
+
+    def fit_request(
+        self, build: Callable[[str, str], Dict], title: str, content: str, label: str
+    ) -> Dict:
+        """Construye la petición comprobando antes su tamaño en tokens
+
+        ``build(title, content)`` crea la petición. Si el prompt no cabe en el
+        presupuesto, se lanza ``PromptTooLargeError`` o, con la política
+        ``"truncate"``, se envía solo el primer fragmento del contenido que cabe
+        y se avisa en el log de cuánto se descarta.
+
+        Con ``router`` la petición lleva el modelo de la primera ruta de
+        ``label``, que es el que fija la ventana de contexto y la clave de caché.
+        """
+        request = self._with_routed_model(build(title, content), label)
+        model = request["model"]
+        prompt_tokens = count_message_tokens(request["messages"], model)
+        budget = self.input_token_budget(request["max_tokens"], model)
+        if prompt_tokens <= budget:
+            return request
+
+        available = budget - (prompt_tokens - count_tokens(content, model))
+        if self.oversize_policy == "reject" or available < 1:
+            raise PromptTooLargeError(label, prompt_tokens, budget)
+
+        chunks = chunk_text(content, available, model)
+        dropped = chunks[1:]
+        if dropped:
+            logger.warning(
+                f"Contenido recortado para {label}: {prompt_tokens} tokens > {budget}; "
+                f"se envía el fragmento 1 de {len(chunks)} y se descartan los otros "
+                f"{len(dropped)} ({sum(len(chunk) for chunk in dropped)} caracteres "
+                f"desde «{dropped[0][:40]}»)"
+            )
+        return dict(build(title, chunks[0]), model=model)
+
+    def _with_routed_model(self, request: Dict, network: str) -> Dict:
+        """La petición con el modelo de la primera ruta de la red"""
+        if self.router is None:
+            return request
+        route = self._route_chain(request, network)[0]
+        return dict(request, model=route.model or self.model)
+
+    def build_request(self, title: str, content: str, network: str) -> Dict:
+        """Construye los parámetros de la petición de chat completion"""
+        system_prompt = self.get_system_prompt(network)
+        user_prompt = self.get_user_prompt(title, content, network)
+        temperature = self.TEMPERATURE_CONFIG.get(network, 0.7)
+
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": self.max_output_tokens(network),
+        }
+        if self.response_format is not None:
+            request["response_format"] = self._response_format_param(
+                f"adaptacion_{network}", self.get_output_schema(network)
+            )
+        return self._with_backend_task(
+            request,
+            "adapt",
+            title=title,
+            content=content,
+            structure=self.get_json_structure(network),
+        )
+
+    def _with_backend_task(self, request: Dict, kind: str, **task) -> Dict:
+        """Añade a la petición lo que se pide en forma estructurada, si hay backend
+
+        Los backends locales lo leen en lugar de interpretar los prompts; el
+        cliente de openai nunca lo recibe.
+        """
+        if self.backend is not None:
+            request["backend_task"] = dict(task, kind=kind)
+        return request
+
+    @staticmethod
+    def api_request(request: Dict) -> Dict:
+        """La petición tal como se envía a la API, sin las claves internas"""
+        if "backend_task" not in request:
+            return request
+        return {k: v for k, v in request.items() if k != "backend_task"}
+
+    def get_combined_prompts(self, title: str, content: str, networks: List[str]):
+        """Crea los prompts de sistema y usuario para varias redes a la vez"""
+        rules = "\n".join(
+            f"## {network}\n{self.get_system_prompt(network).strip()}\n"
+            for network in networks
+        )
+        system_prompt = f"""
+Eres un experto en contenido para redes sociales. Tu tarea es adaptar el mismo contenido para varias redes sociales a la vez, respetando las reglas de cada una:
+
+{rules}"""
 
-Genera SOLO un objeto JSON con esta estructura exacta:
+        json_example = json.dumps(
+            {network: self.get_json_structure(network) for network in networks},
+            indent=4,
+            ensure_ascii=False,
+        )
+        limits = "\n".join(
+            f"  - {network}: máximo {self.CHARACTER_LIMITS[network]} caracteres"
+            for network in networks
+        )
+        instructions = f"""Genera SOLO un objeto JSON con una clave por red social y esta estructura exacta:
 {json_example}
 
 IMPORTANTE:
-- El texto debe ser específico para {network}
-- Respeta el límite de {self.CHARACTER_LIMITS[network]} caracteres
-- El character_count debe ser exacto (número entero)
+- Cada texto debe ser específico para su red social
+- Respeta los límites de caracteres:
+{limits}
+- Cada character_count debe ser exacto (número entero)
 - NO agregues explicaciones adicionales, solo el JSON
 - Responde únicamente con el JSON válido
 """
+        if self.prompt_layout == "prefix_cache":
+            user_prompt = f"""
+Adapta para {", ".join(networks)}: el contenido que aparece al final (TÍTULO y CONTENIDO).
 
-    def adapt_content(self, title: str, content: str, network: str) -> Dict:
-        """Adapta contenido para una red social específica"""
+{instructions}
+TÍTULO: {title}
+CONTENIDO: {content}
+"""
+        else:
+            user_prompt = f"""
+Adapta el siguiente contenido para {", ".join(networks)}:
+
+TÍTULO: {title}
+CONTENIDO: {content}
+
+{instructions}"""
+        return system_prompt, user_prompt
+
+    def build_combined_request(
+        self, title: str, content: str, networks: List[str]
+    ) -> Dict:
+        """Construye una única petición que cubre varias redes"""
+        system_prompt, user_prompt = self.get_combined_prompts(
+            title, content, networks
+        )
+        temperature = sum(
+            self.TEMPERATURE_CONFIG.get(network, 0.7) for network in networks
+        ) / len(networks)
+
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": round(temperature, 2),
+            "max_tokens": min(
+                MAX_COMBINED_OUTPUT_TOKENS,
+                sum(self.max_output_tokens(network) for network in networks),
+            ),
+        }
+        if self.response_format is not None:
+            schema = {
+                "type": "object",
+                "properties": {
+                    network: self.get_output_schema(network) for network in networks
+                },
+                "required": list(networks),
+                "additionalProperties": False,
+            }
+            request["response_format"] = self._response_format_param(
+                "adaptacion_combinada", schema
+            )
+        return self._with_backend_task(
+            request,
+            "combined",
+            title=title,
+            content=content,
+            structure={network: self.get_json_structure(network) for network in networks},
+            system_prompts={network: self.get_system_prompt(network) for network in networks},
+        )
+
+    def needs_brief(self, content: str) -> bool:
+        """Indica si el contenido supera el umbral para resumirlo antes"""
+        return (
+            self.brief_threshold_tokens is not None
+            and count_tokens(content, self.model) > self.brief_threshold_tokens
+        )
+
+    def _lookup_brief(
+        self, title: str, content: str, timer: CallTimer
+    ) -> Tuple[Dict, str, Optional[str]]:
+        """Petición del brief, su clave de caché y el brief cacheado, si lo hay"""
+        with timer.phase("prompt_build"):
+            request = self.fit_request(
+                lambda t, c: self._with_backend_task(
+                    build_brief_request(self.model, t, c, self.brief_max_tokens),
+                    "brief",
+                    title=t,
+                    content=c,
+                ),
+                title,
+                content,
+                "brief",
+            )
+        messages = request["messages"]
+        key = make_cache_key(
+            request["model"],
+            messages[0]["content"],
+            messages[1]["content"],
+            request["temperature"],
+        )
+        with timer.phase("cache_lookup"):
+            cached = self.brief_cache.get(key)
+        return request, key, cached["brief"] if cached is not None else None
+
+    def _store_brief(self, key: str, response_text: str, content: str) -> str:
+        brief = response_text.strip()
+        if not brief:
+            raise ValueError("El LLM devolvió un brief vacío")
+        self.brief_cache.set(key, {"brief": brief})
+        logger.info(
+            f"Brief generado: {count_tokens(content, self.model)} -> "
+            f"{count_tokens(brief, self.model)} tokens"
+        )
+        return brief
+
+    def prepare_content(
+        self,
+        title: str,
+        content: str,
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> str:
+        """Contenido que recibirá cada red: el original o, si es largo, su brief
+
+        Si el brief falla se usa el contenido original.
+        """
+        return self._run_steps(self._brief_steps(title, content, usage_summary))
+
+    def _brief_steps(
+        self, title: str, content: str, usage_summary: Optional[UsageSummary]
+    ) -> Generator[Tuple, Tuple[str, Optional[Dict]], str]:
+        if not self.needs_brief(content):
+            return content
+
+        timer = CallTimer("brief", self.model)
+        usage = None
         try:
-            logger.info(f"Adaptando contenido para {network}")
+            request, key, brief = self._lookup_brief(title, content, timer)
+            if brief is not None:
+                self._record_call(timer, "cache_hit")
+                return brief
+            with timer.phase("round_trip"):
+                response_text, usage = yield request, "brief", None, timer
+            brief = self._store_brief(key, response_text, content)
+        except Exception as e:
+            self._record_call(timer, "error", usage, e, usage_summary)
+            logger.warning(f"Brief no disponible, se usa el contenido completo: {e}")
+            return content
+
+        self._record_call(timer, "success", usage, usage_summary=usage_summary)
+        return brief
+
+    def _cacheable(self, request: Dict) -> bool:
+        """Si la temperatura de la petición permite reutilizar su respuesta"""
+        return (
+            self.cache_max_temperature is None
+            or request["temperature"] <= self.cache_max_temperature
+        )
+
+    def _cache_key(self, request: Dict) -> Optional[str]:
+        """Clave de caché de la petición, o None si no debe cachearse"""
+        if self.cache is None or not self._cacheable(request):
+            return None
+
+        messages = request["messages"]
+        return make_cache_key(
+            request["model"],
+            messages[0]["content"],
+            messages[1]["content"],
+            request["temperature"],
+        )
+
+    def _semantic_namespace(self, request: Dict) -> Optional[str]:
+        """Namespace de la caché semántica para la petición, o None si no debe usarse
+
+        Como la clave exacta, distingue todo lo que cambia la respuesta salvo
+        el título y el contenido: modelo configurado y enrutado, formato del
+        prompt y de la respuesta, prompt de sistema y temperatura.
+        """
+        if self.semantic_cache is None or not self._cacheable(request):
+            return None
+        return config_fingerprint(
+            self.model,
+            request["model"],
+            self.prompt_layout,
+            self.response_format,
+            request["messages"][0]["content"],
+            request["temperature"],
+        )
+
+    def extract_json(
+        self, response_text: str, timer: Optional[CallTimer] = None
+    ) -> Dict:
+        """Extrae el objeto JSON de la respuesta del LLM"""
+        if self.response_format is not None:
+            # Con JSON mode la respuesta es el objeto tal cual; solo si el
+            # endpoint ignoró response_format se busca el JSON en el texto
+            with timed(timer, "json_loads"):
+                try:
+                    return loads(response_text)
+                except ValueError:
+                    pass
+        return parse_json_object(response_text, timer)
+
+    def validate_adaptation(self, adapted_content: Dict, network: str) -> Dict:
+        """Corrige el conteo de caracteres y valida el límite de la red"""
+        # Validar y corregir conteo de caracteres
+        actual_char_count = len(adapted_content["text"])
+        adapted_content["character_count"] = actual_char_count
+
+        # Validar límite de caracteres
+        if adapted_content["character_count"] > self.CHARACTER_LIMITS[network]:
+            logger.warning(
+                f"Contenido excede límite para {network}: {adapted_content['character_count']}"
+            )
+
+        return adapted_content
+
+    def parse_response(
+        self, response_text: str, network: str, timer: Optional[CallTimer] = None
+    ) -> Dict:
+        """Extrae el JSON de la respuesta del LLM y valida el resultado"""
+        adapted_content = self.extract_json(response_text, timer)
+        with timed(timer, "validation"):
+            if self.response_format is not None:
+                validate_schema(adapted_content, self.get_output_schema(network))
+            return self.validate_adaptation(adapted_content, network)
+
+    def parse_combined_response(
+        self,
+        response_text: str,
+        networks: List[str],
+        timer: Optional[CallTimer] = None,
+    ) -> Dict:
+        """Valida por red una respuesta combinada; omite las redes ausentes"""
+        combined = self.extract_json(response_text, timer)
+        results = {}
+        with timed(timer, "validation"):
+            for network in networks:
+                adapted_content = combined.get(network)
+                if not isinstance(adapted_content, dict) or "text" not in adapted_content:
+                    logger.warning(
+                        f"Respuesta combinada sin resultado válido para {network}"
+                    )
+                    continue
+                if self.response_format is not None:
+                    try:
+                        validate_schema(adapted_content, self.get_output_schema(network))
+                    except ValueError as e:
+                        logger.warning(f"Respuesta combinada inválida para {network}: {e}")
+                        continue
+                results[network] = self.validate_adaptation(adapted_content, network)
+        return results
+
+    def _check_output(
+        self, response_text: str, network: str, timer: Optional[CallTimer] = None
+    ) -> Tuple[Optional[Dict], Optional[str], Optional[Exception]]:
+        """Parsea la respuesta y describe el primer problema encontrado
+
+        Devuelve ``(adaptación, problema, error)``; ``error`` es la excepción
+        que se lanza si el problema no llega a repararse.
+        """
+        try:
+            adapted_content = self.extract_json(response_text, timer)
+        except ValueError as e:
+            return None, invalid_json_violation(e), e
+
+        with timed(timer, "validation"):
+            if not isinstance(adapted_content, dict):
+                error = SchemaValidationError(["la respuesta no es un objeto JSON"])
+                return None, str(error), error
+
+            missing = [
+                field
+                for field in self.get_json_structure(network)
+                if field not in adapted_content
+            ]
+            if missing:
+                violation = missing_fields_violation(missing)
+                return adapted_content, violation, SchemaValidationError([violation])
+
+            if self.response_format is not None:
+                errors = schema_errors(adapted_content, self.get_output_schema(network))
+                if errors:
+                    return adapted_content, "; ".join(errors), SchemaValidationError(errors)
+
+            # Exceder el límite no es un error: sin reparación se devuelve con aviso
+            limit = self.CHARACTER_LIMITS[network]
+            if len(adapted_content["text"]) > limit:
+                violation = over_length_violation(adapted_content["text"], limit, network)
+                return adapted_content, violation, None
+
+        return adapted_content, None, None
+
+    def _next_repair(
+        self,
+        response_text: str,
+        network: str,
+        violation: Optional[str],
+        budget: RepairBudget,
+        rewrite: bool = False,
+    ) -> Optional[Dict]:
+        """Petición de reparación si hay problema y queda presupuesto
+
+        ``rewrite`` indica que no hay un objeto que corregir y hay que
+        regenerarlo entero (ver ``build_repair_request``).
+        """
+        if violation is None or budget.attempts >= budget.max_attempts:
+            return None
+
+        fields = list(self.get_json_structure(network))
+        request = build_repair_request(
+            self.model,
+            response_text.strip(),
+            violation,
+            fields,
+            max_output_tokens=self.max_output_tokens(network),
+            rewrite=rewrite,
+        )
+        self._with_backend_task(
+            request, "repair", output=response_text.strip(), fields=fields
+        )
+        if self.response_format is not None:
+            request["response_format"] = self._response_format_param(
+                f"adaptacion_{network}", self.get_output_schema(network)
+            )
 
-            system_prompt = self.get_system_prompt(network)
-            user_prompt = self.get_user_prompt(title, content, network)
-            temperature = self.TEMPERATURE_CONFIG.get(network, 0.7)
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=temperature,
-                max_tokens=1000,
+        if not budget.allows(request):
+            logger.warning(f"Sin presupuesto de tokens para reparar {network}: {violation}")
+            return None
+
+        logger.info(
+            f"Reparando respuesta de {network} (intento {budget.attempts + 1}): {violation}"
+        )
+        return request
+
+    def _finish_output(
+        self,
+        adapted_content: Optional[Dict],
+        network: str,
+        error: Optional[Exception],
+        timer: Optional[CallTimer] = None,
+    ) -> Dict:
+        """Lanza el error pendiente o devuelve la adaptación validada"""
+        if error is not None:
+            raise error
+        with timed(timer, "validation"):
+            return self.validate_adaptation(adapted_content, network)
+
+    def _repair_steps(
+        self, response_text: str, network: str, timer: CallTimer, budget: RepairBudget
+    ) -> Generator[Tuple, Tuple[str, Optional[Dict]], Dict]:
+        """Parsea la respuesta y repara lo que incumpla con turnos cortos"""
+        while True:
+            adapted_content, violation, error = self._check_output(
+                response_text, network, timer
+            )
+            request = self._next_repair(
+                response_text, network, violation, budget, rewrite=adapted_content is None
             )
+            if request is None:
+                return self._finish_output(adapted_content, network, error, timer)
+
+            with timer.phase("repair"):
+                response_text, repair_usage = yield request, network, None, timer
+            budget.spend(request, repair_usage)
+
+    def _cached_tokens_note(self, usage: Optional[Dict]) -> str:
+        """Sufijo de log con los tokens de prompt servidos desde la caché del proveedor"""
+        if not usage or not usage.get("cached_tokens"):
+            return ""
+        return f" ({usage['cached_tokens']}/{usage['prompt_tokens']} tokens de prompt en caché)"
+
+    def _semantic_lookup(
+        self,
+        title: str,
+        content: str,
+        network: str,
+        namespace: Optional[str],
+        timer: CallTimer,
+    ) -> Optional[Dict]:
+        """Adaptación previa de una publicación casi idéntica, si la hay"""
+        if namespace is None:
+            return None
+        with timer.phase("semantic_lookup"):
+            similar = self.semantic_cache.get(network, title, content, namespace)
+        if similar is not None:
+            logger.info(f"Adaptación similar en caché para {network}")
+            self._record_call(timer, "semantic_hit")
+        return similar
+
+    def _record_call(
+        self,
+        timer: CallTimer,
+        status: str,
+        usage: Optional[Dict] = None,
+        error: Optional[Exception] = None,
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> None:
+        """Envía el registro de la llamada al destino de métricas, si lo hay
+
+        Con ``usage_summary`` el uso de tokens se acumula también en él.
+        """
+        if usage_summary is not None:
+            usage_summary.add(timer.network, usage, timer.model, timer.pricing)
+        if self.metrics is None:
+            return
+        try:
+            self.metrics.record(timer.to_record(status, usage, error))
+        except Exception as e:
+            logger.error(f"Error registrando métricas: {e}")
+
+    def adapt_content(
+        self,
+        title: str,
+        content: str,
+        network: str,
+        on_token: Optional[Callable[[str, str], None]] = None,
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> Dict:
+        """Adapta contenido para una red social específica
+
+        Si se indica ``on_token``, la respuesta se pide en streaming y se llama
+        ``on_token(network, fragmento)`` con cada fragmento recibido. El uso de
+        tokens de la llamada se acumula en ``usage_summary`` si se indica.
+        """
+        return self._run_steps(
+            self._adapt_steps(title, content, network, on_token, usage_summary)
+        )
+
+    def _run_steps(self, steps: Generator):
+        """Ejecuta un flujo enviando con ``_send`` cada petición que genera
 
-            # Extraer y limpiar respuesta JSON
-            response_text = response.choices[0].message.content.strip()
-
-            # Limpiar markdown si existe
-            if "```json" in response_text:
-                start_idx = response_text.find("```json") + 7
-                end_idx = response_text.find("```", start_idx)
-                response_text = response_text[
-                    start_idx : end_idx if end_idx != -1 else len(response_text)
-                ].strip()
-            elif "```" in response_text:
-                start_idx = response_text.find("```") + 3
-                end_idx = response_text.find("```", start_idx)
-                response_text = response_text[
-                    start_idx : end_idx if end_idx != -1 else len(response_text)
-                ].strip()
-
-            # Buscar JSON válido
-            json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(0)
-
-            adapted_content = json.loads(response_text)
-
-            # Validar y corregir conteo de caracteres
-            actual_char_count = len(adapted_content["text"])
-            adapted_content["character_count"] = actual_char_count
-
-            # Validar límite de caracteres
-            if adapted_content["character_count"] > self.CHARACTER_LIMITS[network]:
-                logger.warning(
-                    f"Contenido excede límite para {network}: {adapted_content['character_count']}"
+        Los flujos (``_adapt_steps``, ``_brief_steps``...) son comunes a los
+        adaptadores síncrono y asíncrono: generan ``(petición, red, on_token,
+        timer)``, reciben ``(texto, uso)`` y devuelven su resultado; un error
+        del envío se lanza dentro del flujo, en el punto en que lo pidió.
+        """
+        try:
+            call = next(steps)
+            while True:
+                try:
+                    reply = self._send(*call)
+                except Exception as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(reply)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            steps.close()
+
+    def _adapt_steps(
+        self,
+        title: str,
+        content: str,
+        network: str,
+        on_token: Optional[Callable[[str, str], None]],
+        usage_summary: Optional[UsageSummary],
+    ) -> Generator[Tuple, Tuple[str, Optional[Dict]], Dict]:
+        timer = CallTimer(network, self.model)
+        usage = None
+        repair = RepairBudget(self.max_repair_attempts, self.repair_token_budget)
+        try:
+            logger.info(f"Adaptando contenido para {network}")
+
+            with timer.phase("prompt_build"):
+                request = self.fit_request(
+                    lambda t, c: self.build_request(t, c, network), title, content, network
                 )
 
-            logger.info(f"Contenido adaptado exitosamente para {network}")
+            cache_key = self._cache_key(request)
+            if cache_key is not None:
+                with timer.phase("cache_lookup"):
+                    cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Respuesta en caché para {network}")
+                    self._record_call(timer, "cache_hit")
+                    return cached
+
+            namespace = self._semantic_namespace(request)
+            similar = self._semantic_lookup(title, content, network, namespace, timer)
+            if similar is not None:
+                return similar
+
+            with timer.phase("round_trip"):
+                response_text, usage = yield request, network, on_token, timer
+
+            # Extraer y validar la respuesta JSON, reparándola si hace falta
+            adapted_content = yield from self._repair_steps(
+                response_text, network, timer, repair
+            )
+
+            if cache_key is not None:
+                self.cache.set(cache_key, adapted_content)
+            if namespace is not None:
+                self.semantic_cache.set(network, title, content, adapted_content, namespace)
+
+            self._record_call(
+                timer,
+                "repaired" if repair.attempts else "success",
+                merge_usage(usage, repair.usage),
+                usage_summary=usage_summary,
+            )
+            logger.info(
+                f"Contenido adaptado exitosamente para {network} en {timer.elapsed:.2f}s"
+                f"{self._cached_tokens_note(usage)}"
+            )
             return adapted_content
 
         except json.JSONDecodeError as e:
+            self._record_call(
+                timer, "error", merge_usage(usage, repair.usage), e, usage_summary
+            )
             logger.error(f"Error parsing JSON response for {network}: {e}")
             raise Exception(f"Error parsing LLM response for {network}")
 
         except Exception as e:
+            self._record_call(
+                timer, "error", merge_usage(usage, repair.usage), e, usage_summary
+            )
             logger.error(f"Error adaptando contenido para {network}: {e}")
             raise Exception(f"Error en adaptación para {network}: {str(e)}")
 
-    def adapt_to_multiple_networks(
-        self, title: str, content: str, target_networks: List[str]
+    def _send(
+        self,
+        request: Dict,
+        network: str,
+        on_token: Optional[Callable[[str, str], None]] = None,
+        timer: Optional[CallTimer] = None,
+    ) -> Tuple[str, Optional[Dict]]:
+        """Envía la petición respetando los límites
+
+        Devuelve el texto de la respuesta y el uso de tokens informado;
+        ``timer`` recibe el modelo de la ruta que respondió.
+        """
+
+        def send() -> Tuple[str, Optional[Dict]]:
+            if on_token is not None:
+                return self._stream_completion(request, network, on_token, timer)
+            return self._complete(request, network, timer)
+
+        with self._inflight:
+            if self.rate_limiter is None:
+                return send()
+            return self.rate_limiter.call(send, estimate_request_tokens(request))
+
+    def _create(
+        self, request: Dict, network: str, timer: Optional[CallTimer] = None, **options
+    ):
+        """Llamada al endpoint con el plazo de la red y el circuito, si lo hay
+
+        Con ``router`` se prueban en orden las rutas de la red hasta que una
+        responde.
+        """
+        attempts = self._route_attempts(request, network, timer, options)
+        for route, routed in attempts:
+            try:
+                response = self._create_on(route, routed, network, options)
+            except Exception as e:
+                attempts.failed(e)
+                continue
+            return attempts.succeeded(response)
+
+    def _route_attempts(
+        self, request: Dict, network: str, timer: Optional[CallTimer], options: Dict
+    ) -> RouteAttempts:
+        """Intentos de la petición con el plazo de la red aplicado a ``options``"""
+        deadline = self.deadlines.get(network)
+        if deadline is not None:
+            options["timeout"] = deadline
+        chain = self._route_chain(request, network) if self.router is not None else [None]
+        pricing = self.backend.pricing if self.backend is not None else None
+        return RouteAttempts(
+            self.router, chain, request, network, self.model, timer, pricing
+        )
+
+    def _create_on(
+        self, route: Optional[Route], request: Dict, network: str, options: Dict
+    ):
+        create = self._create_call(route, request, network, options)
+
+        breaker = self._route_breaker(route)
+        if breaker is None:
+            return create()
+        return breaker.call(create)
+
+    def _create_call(
+        self, route: Optional[Route], request: Dict, network: str, options: Dict
+    ) -> Callable:
+        """Función que envía la petición al backend o al cliente de la ruta"""
+        if self.backend is not None:
+            return lambda: self.backend.create(request, network, **options)
+        client = self._route_client(route)
+        # El backend pudo quitarse después de construir la petición
+        request = self.api_request(request)
+        return lambda: client.chat.completions.create(**request, **options)
+
+    def _route_chain(self, request: Dict, network: str) -> List[Route]:
+        prompt_tokens = count_message_tokens(request["messages"], self.model)
+        return self.router.chain(network, prompt_tokens)
+
+    def _route_client(self, route: Optional[Route]):
+        """Cliente del endpoint de la ruta; el del adaptador si no cambia"""
+        api_key, base_url, timeout, http_client = self._client_args
+        if route is None or (route.base_url is None and route.resolve_api_key() is None):
+            return self.client
+        key = (route.base_url or base_url, route.resolve_api_key() or api_key)
+        client = self._route_clients.get(key)
+        if client is None:
+            with self._client_lock:
+                client = self._route_clients.get(key)
+                if client is None:
+                    client = self._create_client(key[1], key[0], timeout, http_client)
+                    self._route_clients[key] = client
+        return client
+
+    def _route_breaker(self, route: Optional[Route]) -> Optional[CircuitBreaker]:
+        """Circuito del endpoint de la ruta, con las opciones del del adaptador"""
+        if self.circuit_breaker is None or route is None or route.base_url is None:
+            return self.circuit_breaker
+        return breaker_for(
+            route.base_url,
+            failure_threshold=self.circuit_breaker.failure_threshold,
+            reset_timeout=self.circuit_breaker.reset_timeout,
+        )
+
+    def _complete(
+        self, request: Dict, network: str, timer: Optional[CallTimer] = None
+    ) -> Tuple[str, Optional[Dict]]:
+        """Petición sin streaming, replicada si tarda más de lo habitual"""
+
+        def attempt() -> Tuple[str, Optional[Dict]]:
+            started = time.monotonic()
+            response = self._create(request, network, timer)
+            if self.hedging is not None:
+                self.hedging.record(network, time.monotonic() - started)
+            return response.choices[0].message.content, usage_to_dict(response.usage)
+
+        def replica() -> Tuple[str, Optional[Dict]]:
+            # La réplica es una petición más: reserva su parte del límite de tasa
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimate_request_tokens(request))
+            return attempt()
+
+        delay = self.hedging.delay(network) if self.hedging is not None else None
+        if delay is None:
+            return attempt()
+        result, hedge_won = hedged_call(
+            attempt,
+            delay,
+            self._get_hedge_executor(),
+            on_hedge=lambda: self.hedging.record_hedge(network),
+            replica=replica,
+            slots=self._inflight,
+        )
+        if hedge_won:
+            self.hedging.record_win(network)
+        return result
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        # Cada petición en vuelo puede tener a la vez su original y su réplica
+        if self._hedge_executor is None:
+            with self._client_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=2 * self.max_concurrency,
+                        thread_name_prefix="llm-hedge",
+                    )
+        return self._hedge_executor
+
+    def _stream_completion(
+        self,
+        request: Dict,
+        network: str,
+        on_token: Callable[[str, str], None],
+        timer: Optional[CallTimer] = None,
+    ) -> Tuple[str, Optional[Dict]]:
+        """Consume una respuesta en streaming y devuelve el texto y el uso"""
+        chunks = []
+        usage = None
+        stream = self._create(
+            request, network, timer, stream=True, stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            # El último fragmento no trae choices, solo el uso de tokens
+            if getattr(chunk, "usage", None) is not None:
+                usage = usage_to_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                on_token(network, delta)
+        return "".join(chunks), usage
+
+    def iter_adaptations(
+        self,
+        title: str,
+        content: str,
+        target_networks: List[str],
+        on_token: Optional[Callable[[str, str], None]] = None,
+    ) -> Iterator[Tuple[str, object]]:
+        """Genera ``(red, resultado)`` a medida que cada red termina
+
+        El resultado es el diccionario adaptado o la excepción producida, de
+        modo que el llamador puede mostrar cada red sin esperar a la más lenta.
+        """
+        supported_networks, errors = self._split_networks(target_networks)
+        for network, error in errors.items():
+            yield network, ValueError(error)
+
+        if not supported_networks:
+            return
+
+        content = self.prepare_content(title, content)
+        if not self._blocking_calls():
+            for network in supported_networks:
+                try:
+                    yield network, self.adapt_content(title, content, network, on_token)
+                except Exception as e:
+                    logger.error(f"Error adaptando para {network}: {e}")
+                    yield network, e
+            return
+
+        workers = min(self.max_concurrency, len(supported_networks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self.adapt_content, title, content, network, on_token
+                ): network
+                for network in supported_networks
+            }
+            for future in as_completed(futures):
+                network = futures[future]
+                try:
+                    yield network, future.result()
+                except Exception as e:
+                    logger.error(f"Error adaptando para {network}: {e}")
+                    yield network, e
+
+    def adapt_combined(
+        self,
+        title: str,
+        content: str,
+        networks: List[str],
+        usage_summary: Optional[UsageSummary] = None,
     ) -> Dict:
-        """Adapta contenido para múltiples redes sociales"""
-        results = {}
-        errors = {}
+        """Adapta contenido para varias redes con una sola petición
 
-        logger.info(f"Iniciando adaptación para {len(target_networks)} redes")
+        Devuelve solo las redes presentes y válidas en la respuesta; el
+        llamador decide cómo completar las que falten.
+        """
+        return self._run_steps(
+            self._combined_steps(title, content, networks, usage_summary)
+        )
+
+    def _combined_steps(
+        self,
+        title: str,
+        content: str,
+        networks: List[str],
+        usage_summary: Optional[UsageSummary],
+    ) -> Generator[Tuple, Tuple[str, Optional[Dict]], Dict]:
+        logger.info(f"Adaptación combinada para {len(networks)} redes")
+
+        timer = CallTimer("combined", self.model)
+        usage = None
+        try:
+            with timer.phase("prompt_build"):
+                request = self.fit_request(
+                    lambda t, c: self.build_combined_request(t, c, networks),
+                    title,
+                    content,
+                    "combined",
+                )
+
+            with timer.phase("round_trip"):
+                response_text, usage = yield request, "combined", None, timer
+
+            results = self.parse_combined_response(response_text, networks, timer)
+        except Exception as e:
+            self._record_call(timer, "error", usage, e, usage_summary)
+            raise
+
+        self._record_call(timer, "success", usage, usage_summary=usage_summary)
+        return results
+
+    def _blocking_calls(self) -> bool:
+        """Si las llamadas esperan E/S; si no, repartirlas en hilos solo añade coste"""
+        return self.backend is None or self.backend.blocking
 
+    def _split_networks(self, target_networks: List[str]):
+        """Separa las redes soportadas de las no soportadas"""
+        supported_networks = []
+        errors = {}
         for network in target_networks:
             if network not in self.CHARACTER_LIMITS:
                 logger.warning(f"Red social no soportada: {network}")
                 errors[network] = f"Red social '{network}' no está soportada"
                 continue
+            supported_networks.append(network)
+        return supported_networks, errors
 
-            try:
-                results[network] = self.adapt_content(title, content, network)
-            except Exception as e:
-                logger.error(f"Error adaptando para {network}: {e}")
-                errors[network] = str(e)
-
+    def _log_summary(
+        self, target_networks: List[str], results: Dict, errors: Dict, usage: Dict
+    ):
+        """Registra el resumen de una adaptación multi-red"""
         # Solo agregar errores si los hay, sin otros metadatos
         if errors:
             logger.error(f"Errores en adaptación: {errors}")
@@ -233,9 +1392,405 @@ IMPORTANTE:
         logger.info(
             f"Adaptación completada. Éxito: {successful_adaptations}, Errores: {len(errors)}"
         )
+        if usage["total"]["calls"]:
+            total = usage["total"]
+            cost = total["cost_usd"]
+            logger.info(
+                f"Uso de tokens: {total['total_tokens']} en {total['calls']} llamadas"
+                + (f", coste estimado ${cost:.6f}" if cost is not None else "")
+            )
+
+    def adapt_to_multiple_networks(
+        self,
+        title: str,
+        content: str,
+        target_networks: List[str],
+        concurrent: bool = True,
+        combined: bool = False,
+        errors: Optional[Dict[str, str]] = None,
+        include_usage: bool = False,
+    ) -> Dict:
+        """Adapta contenido para múltiples redes sociales
+
+        Con ``concurrent=True`` las peticiones de cada red se envían a la vez
+        (hasta ``max_concurrency``), de modo que la latencia total es la de la
+        red más lenta en lugar de la suma de todas. Con un backend que no
+        espera E/S (``blocking`` falso) se adaptan en secuencia.
+
+        Con ``combined=True`` se pide una única respuesta con todas las redes
+        (el título y el contenido se envían una sola vez); las redes que
+        falten en ella se adaptan individualmente.
+
+        Con ``include_usage=True`` el resultado incluye ``_usage`` con los
+        tokens y el coste estimado por red y en total (siempre se registran en
+        el log). ``errors``, si se indica, recibe el error de cada red que no
+        se pudo adaptar.
+        """
+        results = {}
+        usage_summary = UsageSummary(self.model)
+        errors = errors if errors is not None else {}
+        supported_networks, content, pending = self._run_steps(
+            self._multi_steps(
+                title, content, target_networks, combined, results, errors, usage_summary
+            )
+        )
+
+        if concurrent and len(pending) > 1 and self._blocking_calls():
+            workers = min(self.max_concurrency, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        self.adapt_content,
+                        title,
+                        content,
+                        network,
+                        usage_summary=usage_summary,
+                    ): network
+                    for network in pending
+                }
+                for future in as_completed(futures):
+                    network = futures[future]
+                    try:
+                        results[network] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error adaptando para {network}: {e}")
+                        errors[network] = str(e)
+        else:
+            for network in pending:
+                try:
+                    results[network] = self.adapt_content(
+                        title, content, network, usage_summary=usage_summary
+                    )
+                except Exception as e:
+                    logger.error(f"Error adaptando para {network}: {e}")
+                    errors[network] = str(e)
+
+        return self._multi_result(
+            target_networks,
+            supported_networks,
+            results,
+            errors,
+            usage_summary,
+            include_usage,
+        )
+
+    def _multi_steps(
+        self,
+        title: str,
+        content: str,
+        target_networks: List[str],
+        combined: bool,
+        results: Dict,
+        errors: Dict[str, str],
+        usage_summary: UsageSummary,
+    ) -> Generator[Tuple, Tuple[str, Optional[Dict]], Tuple[List[str], str, List[str]]]:
+        """Parte de ``adapt_to_multiple_networks`` previa al reparto por redes
+
+        Anota en ``errors`` las redes no soportadas, prepara el contenido y,
+        con ``combined``, deja en ``results`` las redes de la respuesta
+        combinada. Devuelve ``(redes soportadas, contenido, redes pendientes)``.
+        """
+        logger.info(f"Iniciando adaptación para {len(target_networks)} redes")
+
+        supported_networks, split_errors = self._split_networks(target_networks)
+        errors.update(split_errors)
+        if supported_networks:
+            content = yield from self._brief_steps(title, content, usage_summary)
+
+        pending = supported_networks
+        if combined and len(supported_networks) > 1:
+            try:
+                combined_results = yield from self._combined_steps(
+                    title, content, supported_networks, usage_summary
+                )
+                results.update(combined_results)
+            except Exception as e:
+                logger.error(f"Error en adaptación combinada: {e}")
+            pending = [n for n in supported_networks if n not in results]
+            if pending:
+                logger.warning(f"Adaptación individual de respaldo para: {pending}")
+        return supported_networks, content, pending
+
+    def _multi_result(
+        self,
+        target_networks: List[str],
+        supported_networks: List[str],
+        results: Dict,
+        errors: Dict[str, str],
+        usage_summary: UsageSummary,
+        include_usage: bool,
+    ) -> Dict:
+        """Resultado de ``adapt_to_multiple_networks`` en el orden pedido"""
+        # Mantener el orden solicitado, no el de finalización
+        results = {n: results[n] for n in supported_networks if n in results}
+        usage = usage_summary.to_dict()
+
+        self._log_summary(target_networks, results, errors, usage)
+        if include_usage:
+            results["_usage"] = usage
         return results
 
 
+class AsyncLLMAdapter(LLMAdapter):
+    """Variante asíncrona del adaptador basada en ``openai.AsyncOpenAI``
+
+    Comparte con ``LLMAdapter`` la construcción de prompts, el parseo y el
+    flujo de cada operación (ver ``_run_steps``); solo cambia el transporte,
+    de modo que un único event loop puede atender muchas adaptaciones
+    concurrentes sin un hilo por petición.
+    """
+
+    def _create_client(self, api_key: str, base_url, timeout, http_client):
+        """Crea el cliente OpenAI asíncrono"""
+        import openai
+
+        return openai.AsyncOpenAI(
+            **self._client_options(api_key, base_url, timeout, http_client)
+        )
+
+    def _create_inflight_limiter(self):
+        # El semáforo se crea dentro del event loop en el primer uso
+        return None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_concurrency)
+        return self._inflight
+
+    async def aclose(self) -> None:
+        """Cierra los clientes HTTP asíncronos; se llama en su event loop"""
+        for client in self._release_resources():
+            await client.close()
+
+    def close(self) -> None:
+        # El cierre de los clientes asíncronos es una corrutina
+        raise TypeError("AsyncLLMAdapter se cierra con await adapter.aclose()")
+
+    async def _run_steps(self, steps: Generator):
+        """Ejecuta un flujo común enviando sus peticiones con ``await _send``"""
+        try:
+            call = next(steps)
+            while True:
+                try:
+                    reply = await self._send(*call)
+                except Exception as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(reply)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            steps.close()
+
+    async def adapt_content(
+        self,
+        title: str,
+        content: str,
+        network: str,
+        on_token: Optional[Callable[[str, str], None]] = None,
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> Dict:
+        """Adapta contenido para una red social específica"""
+        return await self._run_steps(
+            self._adapt_steps(title, content, network, on_token, usage_summary)
+        )
+
+    async def _send(
+        self,
+        request: Dict,
+        network: str,
+        on_token: Optional[Callable[[str, str], None]] = None,
+        timer: Optional[CallTimer] = None,
+    ) -> Tuple[str, Optional[Dict]]:
+        """Envía la petición respetando los límites
+
+        Devuelve el texto de la respuesta y el uso de tokens informado;
+        ``timer`` recibe el modelo de la ruta que respondió.
+        """
+
+        async def send() -> Tuple[str, Optional[Dict]]:
+            if on_token is not None:
+                return await self._stream_completion(request, network, on_token, timer)
+            return await self._complete(request, network, timer)
+
+        async with self._get_semaphore():
+            if self.rate_limiter is None:
+                return await send()
+            return await self.rate_limiter.call_async(
+                send, estimate_request_tokens(request)
+            )
+
+    async def _create(
+        self, request: Dict, network: str, timer: Optional[CallTimer] = None, **options
+    ):
+        """Llamada al endpoint con el plazo de la red y el circuito, si lo hay"""
+        attempts = self._route_attempts(request, network, timer, options)
+        for route, routed in attempts:
+            try:
+                response = await self._create_on(route, routed, network, options)
+            except Exception as e:
+                attempts.failed(e)
+                continue
+            return attempts.succeeded(response)
+
+    async def _create_on(
+        self, route: Optional[Route], request: Dict, network: str, options: Dict
+    ):
+        create = self._create_call(route, request, network, options)
+
+        breaker = self._route_breaker(route)
+        if breaker is None:
+            return await create()
+        return await breaker.call_async(create)
+
+    async def _complete(
+        self, request: Dict, network: str, timer: Optional[CallTimer] = None
+    ) -> Tuple[str, Optional[Dict]]:
+        """Petición sin streaming, replicada si tarda más de lo habitual"""
+
+        async def attempt() -> Tuple[str, Optional[Dict]]:
+            started = time.monotonic()
+            response = await self._create(request, network, timer)
+            if self.hedging is not None:
+                self.hedging.record(network, time.monotonic() - started)
+            return response.choices[0].message.content, usage_to_dict(response.usage)
+
+        async def replica() -> Tuple[str, Optional[Dict]]:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(estimate_request_tokens(request))
+            return await attempt()
+
+        delay = self.hedging.delay(network) if self.hedging is not None else None
+        if delay is None:
+            return await attempt()
+        result, hedge_won = await hedged_call_async(
+            attempt,
+            delay,
+            on_hedge=lambda: self.hedging.record_hedge(network),
+            replica=replica,
+            slots=self._get_semaphore(),
+        )
+        if hedge_won:
+            self.hedging.record_win(network)
+        return result
+
+    async def _stream_completion(
+        self,
+        request: Dict,
+        network: str,
+        on_token: Callable[[str, str], None],
+        timer: Optional[CallTimer] = None,
+    ) -> Tuple[str, Optional[Dict]]:
+        """Consume una respuesta en streaming y devuelve el texto y el uso"""
+        chunks = []
+        usage = None
+        stream = await self._create(
+            request, network, timer, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            # El último fragmento no trae choices, solo el uso de tokens
+            if getattr(chunk, "usage", None) is not None:
+                usage = usage_to_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                on_token(network, delta)
+        return "".join(chunks), usage
+
+    async def prepare_content(
+        self,
+        title: str,
+        content: str,
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> str:
+        """Contenido que recibirá cada red: el original o, si es largo, su brief"""
+        return await self._run_steps(self._brief_steps(title, content, usage_summary))
+
+    async def iter_adaptations(
+        self,
+        title: str,
+        content: str,
+        target_networks: List[str],
+        on_token: Optional[Callable[[str, str], None]] = None,
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """Genera ``(red, resultado)`` a medida que cada red termina"""
+        supported_networks, errors = self._split_networks(target_networks)
+        for network, error in errors.items():
+            yield network, ValueError(error)
+
+        if supported_networks:
+            content = await self.prepare_content(title, content)
+
+        async def run(network: str):
+            try:
+                return network, await self.adapt_content(
+                    title, content, network, on_token
+                )
+            except Exception as e:
+                logger.error(f"Error adaptando para {network}: {e}")
+                return network, e
+
+        for next_done in asyncio.as_completed([run(n) for n in supported_networks]):
+            yield await next_done
+
+    async def adapt_combined(
+        self,
+        title: str,
+        content: str,
+        networks: List[str],
+        usage_summary: Optional[UsageSummary] = None,
+    ) -> Dict:
+        """Adapta contenido para varias redes con una sola petición"""
+        return await self._run_steps(
+            self._combined_steps(title, content, networks, usage_summary)
+        )
+
+    async def adapt_to_multiple_networks(
+        self,
+        title: str,
+        content: str,
+        target_networks: List[str],
+        combined: bool = False,
+        errors: Optional[Dict[str, str]] = None,
+        include_usage: bool = False,
+    ) -> Dict:
+        """Adapta contenido para múltiples redes sociales de forma concurrente"""
+        results = {}
+        usage_summary = UsageSummary(self.model)
+        errors = errors if errors is not None else {}
+        supported_networks, content, pending = await self._run_steps(
+            self._multi_steps(
+                title, content, target_networks, combined, results, errors, usage_summary
+            )
+        )
+
+        outcomes = await asyncio.gather(
+            *(
+                self.adapt_content(title, content, network, usage_summary=usage_summary)
+                for network in pending
+            ),
+            return_exceptions=True,
+        )
+
+        for network, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error adaptando para {network}: {outcome}")
+                errors[network] = str(outcome)
+            else:
+                results[network] = outcome
+
+        return self._multi_result(
+            target_networks,
+            supported_networks,
+            results,
+            errors,
+            usage_summary,
+            include_usage,
+        )
+
+
 def validate_input(data: Dict) -> bool:
     """Valida que el input tenga la estructura correcta"""
     required_fields = ["titulo", "contenido", "target_networks"]
@@ -245,6 +1800,11 @@ def validate_input(data: Dict) -> bool:
             logger.error(f"Campo requerido faltante: {field}")
             return False
 
+    for field in ("titulo", "contenido"):
+        if not isinstance(data[field], str):
+            logger.error(f"{field} debe ser texto")
+            return False
+
     if not isinstance(data["target_networks"], list):
         logger.error("target_networks debe ser una lista")
         return False
@@ -256,31 +1816,568 @@ def validate_input(data: Dict) -> bool:
     return True
 
 
-def process_content(input_data: Dict) -> Dict:
+# Configuración del pool HTTP compartido por los adaptadores del registro
+HTTP_POOL_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60.0,
+    "timeout": 60.0,
+    "connect_timeout": 10.0,
+}
+
+# Registro de adaptadores por (api_key, modelo, base_url); los asíncronos
+# se guardan por event loop porque sus conexiones quedan ligadas a él
+_adapters: Dict = {}
+_async_adapters = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+# Peticiones en vuelo de cada adaptador del registro: un adaptador
+# compartido atiende a todo el proceso (servicio HTTP, lotes, workers)
+REGISTRY_MAX_CONCURRENCY = 32
+
+DEFAULT_ENDPOINT = "https://api.openai.com/v1"
+
+
+class _RegistrySettings:
+    """Configuración que comparten los adaptadores del registro
+
+    Cada ``configure_*`` cambia aquí sus opciones y las aplica a los
+    adaptadores ya creados; ``adapter_options`` da los argumentos con los
+    que se crean los nuevos. Una opción nueva es un atributo más, no otra
+    variable global.
+    """
+
+    def __init__(self):
+        self.max_concurrency = REGISTRY_MAX_CONCURRENCY
+        # Limitador compartido (None = sin límite)
+        self.rate_limiter: Optional[RateLimiter] = None
+        # Destino de métricas (None = sin métricas)
+        self.metrics: Optional[MetricsSink] = None
+        # Formato de respuesta (None = texto libre)
+        self.response_format: Optional[str] = None
+        self.prompt_layout = "classic"
+        # Caché de respuestas y caché semántica (None = sin ellas)
+        self.cache_options: Dict = {"cache": None, "cache_max_temperature": None}
+        self.semantic_cache: Optional[SemanticCache] = None
+        # Brief previo para contenido largo (umbral None = desactivado)
+        self.brief_options: Dict = {"brief_threshold_tokens": None}
+        # Circuito por endpoint, réplicas y plazos por red (None = desactivados)
+        self.breaker_options: Optional[Dict] = None
+        self.hedging: Optional[HedgePolicy] = None
+        self.deadlines: Optional[Dict[str, float]] = None
+        # Rutas de modelos por red; hasta que se configuren se lee LLM_ROUTES_PATH
+        self._router: Optional[ModelRouter] = None
+        self._router_loaded = False
+        # Backend por nombre en lugar del cliente de openai; hasta que se
+        # configure se lee LLM_BACKEND
+        self._backend: Optional[str] = None
+        self._backend_loaded = False
+
+    @property
+    def router(self) -> Optional[ModelRouter]:
+        if not self._router_loaded:
+            self._router = router_from_env()
+            self._router_loaded = True
+        return self._router
+
+    @router.setter
+    def router(self, router: Optional[ModelRouter]) -> None:
+        self._router = router
+        self._router_loaded = True
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        if not self._backend_loaded:
+            self._backend = os.getenv("LLM_BACKEND") or None
+            self._backend_loaded = True
+        return self._backend
+
+    @backend_name.setter
+    def backend_name(self, name: Optional[str]) -> None:
+        self._backend = name
+        self._backend_loaded = True
+
+    def backend(self, asynchronous: bool = False) -> Optional[LLMBackend]:
+        name = self.backend_name
+        if name is None:
+            return None
+        return create_backend(
+            name, asynchronous=asynchronous, character_limits=LLMAdapter.CHARACTER_LIMITS
+        )
+
+    def resilience_options(self, base_url: Optional[str]) -> Dict:
+        """Argumentos de resiliencia de un adaptador del registro"""
+        return {
+            "circuit_breaker": (
+                breaker_for(_endpoint(base_url), **self.breaker_options)
+                if self.breaker_options is not None
+                else None
+            ),
+            "hedging": self.hedging,
+            "deadlines": self.deadlines,
+        }
+
+    def adapter_options(self, base_url: Optional[str], asynchronous: bool = False) -> Dict:
+        """Argumentos de configuración de un adaptador nuevo del registro"""
+        return dict(
+            max_concurrency=self.max_concurrency,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+            response_format=self.response_format,
+            prompt_layout=self.prompt_layout,
+            semantic_cache=self.semantic_cache,
+            router=self.router,
+            backend=self.backend(asynchronous),
+            **self.cache_options,
+            **self.brief_options,
+            **self.resilience_options(base_url),
+        )
+
+
+_registry_settings = _RegistrySettings()
+
+
+def _for_each_registered_adapter(fn: Callable[["LLMAdapter"], None]) -> None:
+    """Aplica ``fn`` a cada adaptador del registro, síncrono o asíncrono
+
+    Se llama con ``_registry_lock`` adquirido, tras cambiar
+    ``_registry_settings``, para que los adaptadores creados a la vez
+    reciban ya la configuración nueva.
+    """
+    for adapter in _adapters.values():
+        fn(adapter)
+    for loop_adapters in _async_adapters.values():
+        for adapter in loop_adapters.values():
+            fn(adapter)
+
+
+def _set_on_registered_adapters(**options) -> None:
+    # Se llama con _registry_lock adquirido
+    def apply(adapter: "LLMAdapter") -> None:
+        for name, value in options.items():
+            setattr(adapter, name, value)
+
+    _for_each_registered_adapter(apply)
+
+
+def configure_http_pool(**options) -> None:
+    """Ajusta límites y timeouts del pool HTTP
+
+    Solo afecta a los adaptadores creados después; usar ``reset_adapters()``
+    para aplicar los cambios a los ya registrados.
+    """
+    unknown = set(options) - set(HTTP_POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"Opciones de pool no soportadas: {sorted(unknown)}")
+    HTTP_POOL_CONFIG.update(options)
+
+
+def configure_concurrency(max_concurrency: int) -> None:
+    """Máximo de peticiones en vuelo de cada adaptador del registro
+
+    Por defecto ``REGISTRY_MAX_CONCURRENCY``; ``HTTP_POOL_CONFIG`` debe
+    admitir al menos el doble de conexiones si se usan réplicas. Se aplica
+    también a los adaptadores ya creados.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency debe ser al menos 1")
+    with _registry_lock:
+        _registry_settings.max_concurrency = max_concurrency
+        _for_each_registered_adapter(lambda adapter: adapter.set_max_concurrency(max_concurrency))
+
+
+def configure_rate_limits(
+    requests_per_minute: int, tokens_per_minute: int, **options
+) -> RateLimiter:
+    """Activa un limitador compartido para los adaptadores del registro
+
+    Como ``configure_http_pool``, solo afecta a los adaptadores creados
+    después; usar ``reset_adapters()`` para aplicarlo a los existentes.
+    """
+    limiter = RateLimiter(
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        **options,
+    )
+    with _registry_lock:
+        _registry_settings.rate_limiter = limiter
+    return limiter
+
+
+def configure_metrics(sink: Optional[MetricsSink]) -> None:
+    """Define el destino de métricas de los adaptadores del registro
+
+    Se aplica también a los adaptadores ya creados.
+    """
+    with _registry_lock:
+        _registry_settings.metrics = sink
+        _set_on_registered_adapters(metrics=sink)
+
+
+def configure_response_format(mode: Optional[str]) -> None:
+    """Activa JSON mode o Structured Outputs en los adaptadores del registro
+
+    ``mode`` es ``"json_object"``, ``"json_schema"`` o None para volver al
+    texto libre. Se aplica también a los adaptadores ya creados.
+    """
+    if mode is not None and mode not in RESPONSE_FORMATS:
+        raise ValueError(f"response_format debe ser uno de {RESPONSE_FORMATS}: {mode}")
+    with _registry_lock:
+        _registry_settings.response_format = mode
+        _set_on_registered_adapters(response_format=mode)
+
+
+def configure_prompt_layout(layout: str) -> None:
+    """Define la disposición de prompts de los adaptadores del registro
+
+    ``"prefix_cache"`` maximiza el prefijo común entre peticiones; se aplica
+    también a los adaptadores ya creados.
+    """
+    if layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"prompt_layout debe ser uno de {PROMPT_LAYOUTS}: {layout}")
+    with _registry_lock:
+        _registry_settings.prompt_layout = layout
+        _for_each_registered_adapter(lambda adapter: adapter.set_prompt_layout(layout))
+
+
+def configure_cache(
+    cache: Optional[ResponseCache], max_temperature: Optional[float] = None
+) -> None:
+    """Define la caché de respuestas de los adaptadores del registro
+
+    ``max_temperature`` limita las redes que se cachean, como
+    ``cache_max_temperature`` de ``LLMAdapter``. Se aplica también a los
+    adaptadores ya creados; None la desactiva.
+    """
+    options = {"cache": cache, "cache_max_temperature": max_temperature}
+    with _registry_lock:
+        _registry_settings.cache_options = options
+        _set_on_registered_adapters(**options)
+
+
+def configure_semantic_cache(cache: Optional[SemanticCache]) -> None:
+    """Define la caché semántica de los adaptadores del registro
+
+    Se aplica también a los adaptadores ya creados; None la desactiva.
+    """
+    with _registry_lock:
+        _registry_settings.semantic_cache = cache
+        _set_on_registered_adapters(semantic_cache=cache)
+
+
+def configure_router(router: Optional[ModelRouter]) -> None:
+    """Define el router de modelos de los adaptadores del registro
+
+    Se aplica también a los adaptadores ya creados; None lo desactiva.
+    """
+    with _registry_lock:
+        _registry_settings.router = router
+        _set_on_registered_adapters(router=router)
+
+
+def configure_backend(name: Optional[str]) -> None:
+    """Define el backend de los adaptadores del registro (ver ``BACKENDS``)
+
+    ``"offline"`` genera respuestas deterministas sin red ni clave API. Se
+    aplica también a los adaptadores ya creados; None vuelve a openai.
+    """
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"backend debe ser uno de {BACKENDS}: {name}")
+    with _registry_lock:
+        _registry_settings.backend_name = name
+
+        def apply(adapter: "LLMAdapter") -> None:
+            asynchronous = isinstance(adapter, AsyncLLMAdapter)
+            adapter.backend = _registry_settings.backend(asynchronous)
+
+        _for_each_registered_adapter(apply)
+
+
+def _backend_name() -> Optional[str]:
+    return _registry_settings.backend_name
+
+
+def default_model() -> str:
+    """Modelo por defecto: ``OPENAI_MODEL`` o ``LLMAdapter.DEFAULT_MODEL``"""
+    return os.getenv("OPENAI_MODEL") or LLMAdapter.DEFAULT_MODEL
+
+
+def _endpoint(base_url: Optional[str]) -> str:
+    return base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_ENDPOINT
+
+
+def configure_resilience(
+    circuit_breaker: bool = True,
+    failure_threshold: int = 5,
+    reset_timeout: float = 30.0,
+    hedging: Optional[HedgePolicy] = None,
+    deadlines: Optional[Dict[str, float]] = None,
+) -> None:
+    """Activa circuitos por endpoint, réplicas y plazos por red en el registro
+
+    Los adaptadores que comparten endpoint comparten circuito. Se aplica
+    también a los adaptadores ya creados.
+    """
+    with _registry_lock:
+        _registry_settings.breaker_options = (
+            {"failure_threshold": failure_threshold, "reset_timeout": reset_timeout}
+            if circuit_breaker
+            else None
+        )
+        _registry_settings.hedging = hedging
+        _registry_settings.deadlines = deadlines
+
+        def apply(adapter: "LLMAdapter") -> None:
+            options = _registry_settings.resilience_options(adapter.base_url)
+            adapter.circuit_breaker = options["circuit_breaker"]
+            adapter.hedging = hedging
+            adapter.deadlines = dict(deadlines or {})
+
+        _for_each_registered_adapter(apply)
+
+
+def configure_brief(
+    threshold_tokens: Optional[int],
+    max_tokens: int = DEFAULT_BRIEF_MAX_TOKENS,
+    cache: Optional[ResponseCache] = None,
+) -> None:
+    """Activa el brief previo para contenido largo en los adaptadores del registro
+
+    Todos los adaptadores comparten la caché de briefs. ``threshold_tokens``
+    None lo desactiva; se aplica también a los adaptadores ya creados.
+    """
+    if threshold_tokens is not None and cache is None:
+        cache = MemoryCache(ttl=None, max_entries=1000)
+    options = {
+        "brief_threshold_tokens": threshold_tokens,
+        "brief_max_tokens": max_tokens,
+        "brief_cache": cache,
+    }
+    with _registry_lock:
+        _registry_settings.brief_options = options
+        _set_on_registered_adapters(**options)
+
+
+def _http_pool_options():
+    """Construye los límites y timeouts de httpx a partir de HTTP_POOL_CONFIG"""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_CONFIG["max_connections"],
+        max_keepalive_connections=HTTP_POOL_CONFIG["max_keepalive_connections"],
+        keepalive_expiry=HTTP_POOL_CONFIG["keepalive_expiry"],
+    )
+    timeout = httpx.Timeout(
+        HTTP_POOL_CONFIG["timeout"], connect=HTTP_POOL_CONFIG["connect_timeout"]
+    )
+    return limits, timeout
+
+
+def _pooled_http_client(asynchronous: bool = False):
+    """Cliente httpx con el pool de HTTP_POOL_CONFIG (se llama en la primera petición)"""
+    import openai
+
+    limits, timeout = _http_pool_options()
+    client_class = openai.DefaultAsyncHttpxClient if asynchronous else openai.DefaultHttpxClient
+    return client_class(limits=limits, timeout=timeout)
+
+
+def get_adapter(
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> LLMAdapter:
+    """Devuelve el adaptador compartido para la combinación dada
+
+    El adaptador (y su pool de conexiones keep-alive) se crea una sola vez
+    por proceso y se reutiliza en las llamadas siguientes.
+    """
+    api_key = api_key or _get_api_key()
+    model = model or default_model()
+    key = (api_key, model, base_url)
+
+    with _registry_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = LLMAdapter(
+                api_key,
+                model=model,
+                base_url=base_url,
+                http_client=_pooled_http_client,
+                **_registry_settings.adapter_options(base_url),
+            )
+            _adapters[key] = adapter
+    return adapter
+
+
+def get_async_adapter(
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> "AsyncLLMAdapter":
+    """Devuelve el adaptador asíncrono compartido del event loop actual"""
+    api_key = api_key or _get_api_key()
+    model = model or default_model()
+    key = (api_key, model, base_url)
+    loop = asyncio.get_running_loop()
+
+    with _registry_lock:
+        _evict_closed_loops()
+        loop_adapters = _async_adapters.setdefault(loop, {})
+        adapter = loop_adapters.get(key)
+        if adapter is None:
+            adapter = AsyncLLMAdapter(
+                api_key,
+                model=model,
+                base_url=base_url,
+                http_client=functools.partial(_pooled_http_client, asynchronous=True),
+                **_registry_settings.adapter_options(base_url, asynchronous=True),
+            )
+            loop_adapters[key] = adapter
+    return adapter
+
+
+def _evict_closed_loops() -> None:
+    # Se llama con _registry_lock adquirido. Los adaptadores retienen su loop
+    # (semáforo y clientes), así que la referencia débil no basta para que
+    # se descarten al cerrarse; sus conexiones murieron con el loop
+    for loop in [loop for loop in _async_adapters if loop.is_closed()]:
+        for adapter in _async_adapters.pop(loop).values():
+            adapter._release_resources()
+
+
+def _close_async_adapter(loop: asyncio.AbstractEventLoop, adapter: "AsyncLLMAdapter") -> None:
+    if loop.is_closed():
+        adapter._release_resources()
+    elif loop.is_running():
+        # Desde otro hilo o desde el propio loop: el cierre queda programado
+        asyncio.run_coroutine_threadsafe(adapter.aclose(), loop)
+    else:
+        loop.run_until_complete(adapter.aclose())
+
+
+def reset_adapters() -> None:
+    """Cierra y descarta los adaptadores registrados
+
+    Los asíncronos se cierran en su event loop; los de un loop ya cerrado
+    solo se descartan.
+    """
+    with _registry_lock:
+        adapters = list(_adapters.values())
+        async_adapters = [
+            (loop, list(loop_adapters.values()))
+            for loop, loop_adapters in _async_adapters.items()
+        ]
+        _adapters.clear()
+        _async_adapters.clear()
+    for adapter in adapters:
+        adapter.close()
+    for loop, loop_adapters in async_adapters:
+        for adapter in loop_adapters:
+            _close_async_adapter(loop, adapter)
+
+
+def _get_api_key() -> str:
+    """Obtiene la clave API desde el entorno"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and not _env_loaded:
+        # Sin la variable en el entorno se prueba con el .env una sola vez
+        load_environment()
+        api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and _backend_name() is not None:
+        # Los backends locales no usan la clave
+        return "offline"
+    if not api_key:
+        raise ValueError("Se requiere OPENAI_API_KEY como variable de entorno")
+    return api_key
+
+
+def process_content(input_data: Dict, include_usage: bool = False) -> Dict:
+    """Adapta la entrada documentada para cada red de ``target_networks``
+
+    Con ``include_usage=True`` añade ``_usage`` (tokens y coste estimado).
+    """
     # Validar entrada
     if not validate_input(input_data):
         raise ValueError("Formato de entrada inválido")
 
     # Obtener clave API
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("Se requiere OPENAI_API_KEY como variable de entorno")
+    api_key = _get_api_key()
 
     logger.info(f"Procesando contenido: '{input_data['titulo'][:50]}...'")
 
-    # Inicializar adaptador
-    adapter = LLMAdapter(api_key)
+    # Reutilizar el adaptador (y sus conexiones) del registro
+    adapter = get_adapter(api_key)
 
     # Procesar adaptación
     results = adapter.adapt_to_multiple_networks(
         title=input_data["titulo"],
         content=input_data["contenido"],
         target_networks=input_data["target_networks"],
+        include_usage=include_usage,
     )
 
     return results
 
 
+async def process_content_async(input_data: Dict, include_usage: bool = False) -> Dict:
+    """Equivalente asíncrono de ``process_content``"""
+    if not validate_input(input_data):
+        raise ValueError("Formato de entrada inválido")
+
+    api_key = _get_api_key()
+
+    logger.info(f"Procesando contenido: '{input_data['titulo'][:50]}...'")
+
+    adapter = get_async_adapter(api_key)
+
+    return await adapter.adapt_to_multiple_networks(
+        title=input_data["titulo"],
+        content=input_data["contenido"],
+        target_networks=input_data["target_networks"],
+        include_usage=include_usage,
+    )
+
+
+def iter_adaptations(
+    input_data: Dict, on_token: Optional[Callable[[str, str], None]] = None
+) -> Iterator[Tuple[str, object]]:
+    """Como ``process_content``, pero genera cada red en cuanto está lista"""
+    if not validate_input(input_data):
+        raise ValueError("Formato de entrada inválido")
+
+    adapter = get_adapter(_get_api_key())
+
+    logger.info(f"Procesando contenido: '{input_data['titulo'][:50]}...'")
+
+    yield from adapter.iter_adaptations(
+        title=input_data["titulo"],
+        content=input_data["contenido"],
+        target_networks=input_data["target_networks"],
+        on_token=on_token,
+    )
+
+
+async def aiter_adaptations(
+    input_data: Dict, on_token: Optional[Callable[[str, str], None]] = None
+) -> AsyncIterator[Tuple[str, object]]:
+    """Equivalente asíncrono de ``iter_adaptations``"""
+    if not validate_input(input_data):
+        raise ValueError("Formato de entrada inválido")
+
+    adapter = get_async_adapter(_get_api_key())
+
+    logger.info(f"Procesando contenido: '{input_data['titulo'][:50]}...'")
+
+    async for item in adapter.iter_adaptations(
+        title=input_data["titulo"],
+        content=input_data["contenido"],
+        target_networks=input_data["target_networks"],
+        on_token=on_token,
+    ):
+        yield item
+
+
 def interactive_input():
     """Permite entrada interactiva de datos"""
     print("=" * 60)
@@ -402,18 +2499,25 @@ def interactive_input():
 
 
 def main():
+    load_environment()
+    configure_logging()
     try:
         # Entrada interactiva de datos
         input_data = interactive_input()
 
-        # Procesar contenido
-        results = process_content(input_data)
-
-        # Mostrar resultados
+        # Procesar contenido mostrando cada red en cuanto termina
         print("\n" + "=" * 60)
         print("✅ RESULTADOS GENERADOS")
         print("=" * 60)
-        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+        results = {}
+        for network, result in iter_adaptations(input_data):
+            if isinstance(result, Exception):
+                print(f"\n❌ {network.upper()}: {result}")
+                continue
+            results[network] = result
+            print(f"\n🔹 {network.upper()}:")
+            print(json.dumps(result, indent=2, ensure_ascii=False))
 
         # Preguntar si desea guardar
         print("\n💾 ¿Deseas guardar los resultados en un archivo? (s/N)")
@@ -0,0 +1,324 @@
+import abc
+import asyncio
+import json
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .token_accounting import estimate_tokens
+except ImportError:
+    from token_accounting import estimate_tokens
+
+# Backends disponibles por nombre (LLM_BACKEND / configure_backend)
+BACKENDS = ("offline",)
+
+
+class LLMBackend(abc.ABC):
+    """Backend de chat completions alternativo al cliente de openai
+
+    ``create(request, network, **options)`` recibe la petición que construye
+    el adaptador (con ``stream=True`` si se pide en streaming) y devuelve un
+    objeto con la forma de la respuesta de openai: ``choices[0].message.content``
+    y ``usage``, o un iterable de fragmentos con ``choices[0].delta.content``.
+    En un adaptador asíncrono ``create`` debe ser una corrutina.
+
+    Con un backend configurado, la petición lleva además ``backend_task``: lo
+    que se pide en forma estructurada, para no tener que leerlo de los
+    prompts. Su ``kind`` es ``"adapt"`` (``title``, ``content`` y la
+    ``structure`` JSON de la red), ``"combined"`` (``title``, ``content`` y
+    ``structure`` y ``system_prompts`` por red), ``"brief"`` (``title`` y
+    ``content``) o ``"repair"`` (la ``output`` anterior y sus ``fields``).
+
+    ``pricing`` es el precio ``(entrada, entrada en caché, salida)`` en USD
+    por millón de tokens, o None para usar el del modelo. ``blocking`` indica
+    si ``create`` espera E/S; si no, el adaptador no reparte las redes en hilos.
+    """
+
+    pricing: Optional[Tuple[float, float, float]] = None
+    blocking = True
+
+    @abc.abstractmethod
+    def create(self, request: Dict, network: str, **options):
+        """Respuesta (o fragmentos en streaming) a la petición de la red"""
+
+    def close(self) -> None:
+        pass
+
+
+# "- Tono: Casual y amigable" en los prompts de sistema de cada red
+_RULE_LINE = re.compile(r"^- ([^:\n]+): (.+)$", re.MULTILINE)
+_NUMBER = re.compile(r"\d+")
+_WORD = re.compile(r"\w+")
+
+# Emojis por cantidad de uso descrita en la regla "Emojis"
+_EMOJI_USAGE = {
+    "mínim": 1,
+    "moderación": 1,
+    "natural": 2,
+    "generos": 3,
+    "abundant": 4,
+}
+_EMOJIS = ("🚀", "✨", "🎉", "💡", "📣", "🔥", "🙌", "📅", "🤝", "✅")
+_STOPWORDS = frozenset(
+    "sobre entre desde hasta donde cuando nuestra nuestro nuestros nuestras "
+    "estos estas todos todas tiene tienen hemos tambien mejor puede porque "
+    "aunque durante".split()
+)
+
+
+class NetworkRules:
+    """Reglas de una red extraídas de su prompt de sistema"""
+
+    __slots__ = ("tone", "length", "hashtags", "emojis")
+
+    def __init__(self, system_prompt: str):
+        rules = {
+            key.strip().lower(): value.strip()
+            for key, value in _RULE_LINE.findall(system_prompt)
+        }
+        self.tone = rules.get("tono", "Neutral")
+        length = rules.get("longitud", "")
+        numbers = [int(n) for n in _NUMBER.findall(length)]
+        self.length = numbers[0] if numbers else None
+        if "concis" in length and self.length:
+            self.length = min(self.length, 1000)
+        # El mínimo que admite la regla: "Entre 5-10" -> 5, "1-2 máximo" -> 1
+        hashtags = [int(n) for n in _NUMBER.findall(rules.get("hashtags", ""))]
+        self.hashtags = min(hashtags) if hashtags else 3
+        emojis_rule = rules.get("emojis", "").lower()
+        emojis = [int(n) for n in _NUMBER.findall(emojis_rule)]
+        self.emojis = min(emojis) if emojis else next(
+            (count for word, count in _EMOJI_USAGE.items() if word in emojis_rule), 1
+        )
+
+
+class OfflineBackend(LLMBackend):
+    """Backend determinista sin red para pruebas de carga y desarrollo
+
+    Genera la respuesta con reglas a partir del ``backend_task`` de la
+    petición: el tono, los hashtags, los emojis y la longitud salen de las
+    reglas del prompt de sistema de cada red, el límite de
+    ``character_limits`` y los campos de la estructura JSON pedida (incluidos
+    ``suggested_image_prompt`` y ``suggested_video_prompt``). La misma
+    petición da siempre la misma respuesta y no tiene coste. ``latency``
+    simula el tiempo de respuesta del proveedor.
+    """
+
+    DEFAULT_CHARACTER_LIMIT = 2000
+    pricing = (0.0, 0.0, 0.0)
+
+    def __init__(
+        self, character_limits: Optional[Dict[str, int]] = None, latency: float = 0.0
+    ):
+        self.character_limits = dict(character_limits or {})
+        self.latency = latency
+        self._rules: Dict[str, NetworkRules] = {}
+
+    @property
+    def blocking(self) -> bool:
+        # Sin latencia simulada la respuesta es cálculo puro: los hilos no aportan
+        return self.latency > 0
+
+    def create(self, request: Dict, network: str, **options):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(request, network, options.get("stream", False))
+
+    def _response(self, request: Dict, network: str, stream: bool):
+        content = self.respond(request, network)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in request["messages"])
+        completion_tokens = estimate_tokens(content)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=None,
+        )
+        if stream:
+            return self._chunks(content, usage)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=usage,
+            model=request.get("model"),
+        )
+
+    def _chunks(self, content: str, usage) -> Iterator:
+        # Fragmentos de unas pocas palabras y, al final, solo el uso de tokens
+        for start in range(0, len(content), 64):
+            delta = SimpleNamespace(content=content[start:start + 64])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    def rules_for(self, system_prompt: str) -> NetworkRules:
+        rules = self._rules.get(system_prompt)
+        if rules is None:
+            rules = self._rules[system_prompt] = NetworkRules(system_prompt)
+        return rules
+
+    def respond(self, request: Dict, network: str) -> str:
+        """Texto de la respuesta a una petición del adaptador"""
+        task = request.get("backend_task")
+        if task is None:
+            raise ValueError("La petición no trae backend_task: usarla desde el adaptador")
+        kind = task["kind"]
+
+        if kind == "brief":
+            return self.brief(task["title"], task["content"])
+
+        if kind == "repair":
+            result = self.adapt(
+                network,
+                "",
+                _previous_text(task["output"]),
+                dict.fromkeys(task["fields"]),
+                "",
+            )
+        elif kind == "combined":
+            result = {
+                name: self.adapt(
+                    name,
+                    task["title"],
+                    task["content"],
+                    fields,
+                    task["system_prompts"].get(name, ""),
+                )
+                for name, fields in task["structure"].items()
+            }
+        else:
+            result = self.adapt(
+                network,
+                task["title"],
+                task["content"],
+                task["structure"],
+                request["messages"][0]["content"],
+            )
+        return json.dumps(result, ensure_ascii=False)
+
+    def adapt(
+        self, network: str, title: str, content: str, structure: Dict, system_prompt: str
+    ) -> Dict:
+        """Adaptación con los campos de ``structure`` que respeta las reglas de la red"""
+        rules = self.rules_for(system_prompt)
+        limit = self.character_limits.get(network, self.DEFAULT_CHARACTER_LIMIT)
+        target = min(limit, rules.length or limit)
+        hashtags = _keywords(f"{title} {content}", rules.hashtags)
+        tags = [f"#{word.capitalize()}" for word in hashtags]
+        seed = zlib.crc32(f"{network}|{title}".encode("utf-8"))
+        emojis = [_EMOJIS[(seed + i) % len(_EMOJIS)] for i in range(rules.emojis)]
+        text = _compose(title, content, emojis, tags, target)
+
+        adapted: Dict = {}
+        for field in structure:
+            if field == "text":
+                adapted[field] = text
+            elif field == "hashtags":
+                adapted[field] = tags
+            elif field == "character_count":
+                adapted[field] = len(text)
+            elif field == "tone":
+                adapted[field] = rules.tone
+            elif field == "suggested_image_prompt":
+                adapted[field] = (
+                    f"Fotografía luminosa y colorida sobre «{title}», con "
+                    f"{', '.join(hashtags[:3]) or 'el tema principal'} en primer plano, "
+                    "composición limpia y espacio para texto"
+                )
+            elif field == "suggested_video_prompt":
+                adapted[field] = (
+                    f"Video vertical de 30 segundos: gancho en los primeros 3 segundos "
+                    f"con «{title}», cortes rápidos sobre "
+                    f"{', '.join(hashtags[:3]) or 'el tema principal'}, música trending "
+                    "y llamada a la acción al final"
+                )
+            else:
+                adapted[field] = f"{field} para {network}"
+        return adapted
+
+    def brief(self, title: str, content: str, max_chars: int = 600) -> str:
+        """Brief con las primeras frases del contenido y sus palabras clave"""
+        facts = _truncate(content, max_chars)
+        keywords = ", ".join(_keywords(f"{title} {content}", 5))
+        return f"Hechos clave: {title}. {facts}\nEntidades y temas: {keywords}"
+
+
+class AsyncOfflineBackend(OfflineBackend):
+    """``OfflineBackend`` para ``AsyncLLMAdapter``"""
+
+    async def create(self, request: Dict, network: str, **options):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._response(request, network, options.get("stream", False))
+        if options.get("stream", False):
+            return _aiter(response)
+        return response
+
+
+async def _aiter(chunks: Iterator) -> AsyncIterator:
+    for chunk in chunks:
+        yield chunk
+
+
+def create_backend(name: str, asynchronous: bool = False, **options) -> LLMBackend:
+    """Backend por nombre (ver ``BACKENDS``)"""
+    if name == "offline":
+        backend_cls = AsyncOfflineBackend if asynchronous else OfflineBackend
+        return backend_cls(**options)
+    raise ValueError(f"Backend desconocido: {name} (usar uno de {BACKENDS})")
+
+
+def _previous_text(output: str) -> str:
+    try:
+        previous = json.loads(output)
+    except ValueError:
+        return output
+    return previous.get("text", "") if isinstance(previous, dict) else output
+
+
+def _normalize(word: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _keywords(text: str, count: int) -> List[str]:
+    """Las ``count`` palabras largas más frecuentes, por orden de aparición en empate"""
+    return list(_ranked_words(text)[:count])
+
+
+# Las redes de una misma publicación comparten título y contenido
+@lru_cache(maxsize=256)
+def _ranked_words(text: str) -> Tuple[str, ...]:
+    words = [
+        _normalize(word)
+        for word in _WORD.findall(text)
+        if len(word) >= 5 and not word.isdigit()
+    ]
+    counts = Counter(word for word in words if word not in _STOPWORDS)
+    first_seen = {word: i for i, word in reversed(list(enumerate(words)))}
+    return tuple(sorted(counts, key=lambda word: (-counts[word], first_seen[word])))
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Recorta por palabras para no superar ``max_chars``"""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    if max_chars < 2:
+        return ""
+    cut = text[: max_chars - 1].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+def _compose(title: str, content: str, emojis: List[str], tags: List[str], target: int) -> str:
+    head = " ".join(emojis[:1] + [title]) if title else " ".join(emojis[:1])
+    footer = " ".join(emojis[1:] + tags)
+    available = target - len(head) - len(footer) - 4
+    body = _truncate(content, available) if available > 0 else ""
+    text = "\n\n".join(part for part in (head, body, footer) if part)
+    return text if len(text) <= target else _truncate(text, target)
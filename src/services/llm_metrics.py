@@ -0,0 +1,274 @@
+import abc
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Límites (en segundos) de los buckets de los histogramas de latencia
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def usage_to_dict(usage) -> Optional[Dict]:
+    """Convierte ``response.usage`` en un diccionario plano de tokens"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def merge_usage(*usages: Optional[Dict]) -> Optional[Dict]:
+    """Suma varios diccionarios de uso de tokens, ignorando los ausentes"""
+    present = [usage for usage in usages if usage]
+    if not present:
+        return None
+    merged: Dict[str, int] = {}
+    for usage in present:
+        for kind, count in usage.items():
+            merged[kind] = merged.get(kind, 0) + count
+    return merged
+
+
+def percentile(samples: Iterable[float], q: float) -> Optional[float]:
+    """Percentil ``q`` (0-100) por el método del rango más cercano, o None sin muestras"""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+class CallTimer:
+    """Acumula la duración de cada fase de una llamada al LLM"""
+
+    def __init__(self, network: str, model: str):
+        self.network = network
+        # Modelo y precio de la ruta que respondió (ver ``RouteAttempts``)
+        self.model = model
+        self.pricing: Optional[tuple] = None
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def to_record(
+        self,
+        status: str,
+        usage: Optional[Dict] = None,
+        error: Optional[Exception] = None,
+    ) -> Dict:
+        return {
+            "timestamp": time.time(),
+            "network": self.network,
+            "model": self.model,
+            "status": status,
+            "total_seconds": self.elapsed,
+            "phases": dict(self.phases),
+            "usage": usage,
+            "error": type(error).__name__ if error is not None else None,
+        }
+
+
+# nullcontext es reentrante: una única instancia evita crear una por fase
+_NO_TIMER = nullcontext()
+
+
+def timed(timer: Optional[CallTimer], name: str):
+    """Mide la fase ``name`` si hay temporizador; si no, no hace nada"""
+    return timer.phase(name) if timer is not None else _NO_TIMER
+
+
+class MetricsSink(abc.ABC):
+    """Destino de los registros por llamada generados por el adaptador"""
+
+    @abc.abstractmethod
+    def record(self, record: Dict) -> None:
+        """Recibe el registro de una llamada"""
+
+
+class InMemoryMetrics(MetricsSink):
+    """Histogramas de latencia por fase y red, y contadores de tokens"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, max_samples: int = 10000):
+        self.buckets = tuple(sorted(buckets))
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        # (fase, red) -> [conteo por bucket..., +Inf]
+        self._histograms: Dict[tuple, List[int]] = {}
+        self._sums: Dict[tuple, float] = defaultdict(float)
+        self._samples: Dict[tuple, deque] = {}
+        self._calls: Dict[tuple, int] = defaultdict(int)
+        self._tokens: Dict[tuple, int] = defaultdict(int)
+
+    def _observe(self, phase: str, network: str, seconds: float) -> None:
+        key = (phase, network)
+        if key not in self._histograms:
+            self._histograms[key] = [0] * (len(self.buckets) + 1)
+            self._samples[key] = deque(maxlen=self.max_samples)
+        counts = self._histograms[key]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += seconds
+        self._samples[key].append(seconds)
+
+    def record(self, record: Dict) -> None:
+        network = record["network"]
+        with self._lock:
+            self._calls[(network, record["status"])] += 1
+            self._observe("total", network, record["total_seconds"])
+            for phase, seconds in record["phases"].items():
+                self._observe(phase, network, seconds)
+            usage = record.get("usage") or {}
+            for kind, count in usage.items():
+                self._tokens[(network, kind)] += count
+            # Latencia de ida y vuelta separada según haya acierto en la caché
+            # de prefijos del proveedor, para medir su efecto
+            if usage and "round_trip" in record["phases"]:
+                phase = "round_trip_cached" if usage.get("cached_tokens") else "round_trip_uncached"
+                self._observe(phase, network, record["phases"]["round_trip"])
+
+    def percentile(self, phase: str, network: str, q: float) -> Optional[float]:
+        """Percentil ``q`` (0-100) de las muestras recientes de una fase"""
+        with self._lock:
+            samples = list(self._samples.get((phase, network), ()))
+        return percentile(samples, q)
+
+    def summary(self) -> Dict:
+        """Conteo, suma y p50/p95/p99 por fase y red, más tokens y llamadas"""
+        with self._lock:
+            keys = list(self._histograms)
+            sums = dict(self._sums)
+            counts = {key: sum(self._histograms[key]) for key in keys}
+            calls = dict(self._calls)
+            tokens = dict(self._tokens)
+
+        latency: Dict[str, Dict] = {}
+        for phase, network in keys:
+            latency.setdefault(network, {})[phase] = {
+                "count": counts[(phase, network)],
+                "sum": sums[(phase, network)],
+                "p50": self.percentile(phase, network, 50),
+                "p95": self.percentile(phase, network, 95),
+                "p99": self.percentile(phase, network, 99),
+            }
+
+        token_summary: Dict[str, Dict] = {}
+        for (network, kind), count in tokens.items():
+            token_summary.setdefault(network, {})[kind] = count
+        for counts in token_summary.values():
+            if counts.get("prompt_tokens"):
+                counts["cached_ratio"] = counts.get("cached_tokens", 0) / counts["prompt_tokens"]
+
+        call_summary: Dict[str, Dict] = {}
+        for (network, status), count in calls.items():
+            call_summary.setdefault(network, {})[status] = count
+
+        return {"latency": latency, "tokens": token_summary, "calls": call_summary}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._sums.clear()
+            self._samples.clear()
+            self._calls.clear()
+            self._tokens.clear()
+
+
+class PrometheusMetrics(InMemoryMetrics):
+    """Métricas en memoria exportables en formato de texto de Prometheus"""
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+            sums = dict(self._sums)
+            calls = dict(self._calls)
+            tokens = dict(self._tokens)
+
+        lines = [
+            "# HELP llm_phase_seconds Duración de cada fase de una llamada al LLM",
+            "# TYPE llm_phase_seconds histogram",
+        ]
+        for (phase, network), counts in sorted(histograms.items()):
+            labels = f'phase="{phase}",network="{network}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f'llm_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            cumulative += counts[-1]
+            lines.append(f'llm_phase_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"llm_phase_seconds_sum{{{labels}}} {sums[(phase, network)]}")
+            lines.append(f"llm_phase_seconds_count{{{labels}}} {cumulative}")
+
+        lines.append("# HELP llm_calls_total Llamadas al LLM por red y resultado")
+        lines.append("# TYPE llm_calls_total counter")
+        for (network, status), count in sorted(calls.items()):
+            lines.append(
+                f'llm_calls_total{{network="{network}",status="{status}"}} {count}'
+            )
+
+        lines.append("# HELP llm_tokens_total Tokens consumidos por red y tipo")
+        lines.append("# TYPE llm_tokens_total counter")
+        for (network, kind), count in sorted(tokens.items()):
+            lines.append(f'llm_tokens_total{{network="{network}",type="{kind}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+class JsonLogSink(MetricsSink):
+    """Escribe cada registro como una línea JSON en el log o en un stream"""
+
+    def __init__(self, stream=None, log: Optional[logging.Logger] = None):
+        self.stream = stream
+        self.log = log or logger
+        self._lock = threading.Lock()
+
+    def record(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        if self.stream is None:
+            self.log.info(line)
+            return
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class MultiSink(MetricsSink):
+    """Reenvía cada registro a varios destinos"""
+
+    def __init__(self, sinks: Iterable[MetricsSink]):
+        self.sinks = list(sinks)
+
+    def record(self, record: Dict) -> None:
+        for sink in self.sinks:
+            try:
+                sink.record(record)
+            except Exception as e:
+                logger.error(f"Error registrando métricas en {type(sink).__name__}: {e}")
@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .llm_metrics import percentile, usage_to_dict
+    from .token_accounting import estimate_cost
+except ImportError:
+    from llm_metrics import percentile, usage_to_dict
+    from token_accounting import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+# Ruta implícita: el modelo, el endpoint y la clave del propio adaptador
+DEFAULT_ROUTE = "default"
+
+
+class Route:
+    """Modelo y endpoint al que se envía una petición
+
+    Los campos que quedan en None se toman del adaptador. ``base_url`` admite
+    cualquier servidor compatible con OpenAI (vLLM, llama.cpp, Ollama...);
+    ``pricing`` es ``(entrada, entrada en caché, salida)`` en USD por millón
+    de tokens y sustituye al precio de ``MODEL_PRICING`` (p. ej. 0 en local).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        api_key_env: Optional[str] = None,
+        pricing: Optional[Sequence[float]] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.api_key_env = api_key_env
+        self.pricing = tuple(pricing) if pricing is not None else None
+
+    def resolve_api_key(self) -> Optional[str]:
+        if self.api_key is not None:
+            return self.api_key
+        if self.api_key_env is not None:
+            return os.getenv(self.api_key_env)
+        return None
+
+    def __repr__(self) -> str:
+        return f"Route({self.name!r}, model={self.model!r}, base_url={self.base_url!r})"
+
+
+class RoutingRule:
+    """Cadena de rutas para unas redes y un rango de tokens de prompt
+
+    ``networks`` None se aplica a todas (incluidas ``brief`` y ``combined``);
+    los límites de tokens son inclusivos y None no limita.
+    """
+
+    def __init__(
+        self,
+        routes: List[str],
+        networks: Optional[List[str]] = None,
+        min_prompt_tokens: Optional[int] = None,
+        max_prompt_tokens: Optional[int] = None,
+    ):
+        if not routes:
+            raise ValueError("Una regla necesita al menos una ruta")
+        self.routes = list(routes)
+        self.networks = set(networks) if networks is not None else None
+        self.min_prompt_tokens = min_prompt_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+
+    def matches(self, network: str, prompt_tokens: int) -> bool:
+        if self.networks is not None and network not in self.networks:
+            return False
+        if self.min_prompt_tokens is not None and prompt_tokens < self.min_prompt_tokens:
+            return False
+        if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+            return False
+        return True
+
+
+class _RouteStats:
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.tokens = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+        self.cost_usd: Optional[float] = 0.0
+        self.latencies: deque = deque(maxlen=window)
+
+
+class ModelRouter:
+    """Elige por red y tamaño del prompt la cadena de rutas de cada petición
+
+    La primera regla que coincide da la cadena; si una ruta falla se prueba
+    la siguiente. Sin regla se usa ``default`` (por defecto solo la ruta del
+    adaptador). Registra llamadas, errores, latencia y coste por ruta.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[List[Route]] = None,
+        rules: Optional[List[RoutingRule]] = None,
+        default: Optional[List[str]] = None,
+        window: int = 1000,
+    ):
+        self.routes: Dict[str, Route] = {DEFAULT_ROUTE: Route(DEFAULT_ROUTE)}
+        for route in routes or ():
+            self.routes[route.name] = route
+        self.rules = list(rules or ())
+        self.default = list(default or [DEFAULT_ROUTE])
+        for chain in [rule.routes for rule in self.rules] + [self.default]:
+            unknown = [name for name in chain if name not in self.routes]
+            if unknown:
+                raise ValueError(f"Rutas no definidas: {', '.join(unknown)}")
+        self.window = window
+        self._stats: Dict[str, _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "ModelRouter":
+        """Crea el router desde ``{"routes": {...}, "rules": [...], "default": [...]}``"""
+        routes = [
+            Route(name, **options) for name, options in config.get("routes", {}).items()
+        ]
+        rules = [RoutingRule(**rule) for rule in config.get("rules", [])]
+        return cls(routes, rules, config.get("default"))
+
+    @classmethod
+    def from_file(cls, path: str) -> "ModelRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def chain(self, network: str, prompt_tokens: int) -> List[Route]:
+        """Rutas a probar, en orden, para una petición"""
+        for rule in self.rules:
+            if rule.matches(network, prompt_tokens):
+                return [self.routes[name] for name in rule.routes]
+        return [self.routes[name] for name in self.default]
+
+    def record(
+        self,
+        route: Route,
+        model: str,
+        seconds: float,
+        usage: Optional[Dict] = None,
+        error: Optional[Exception] = None,
+        fallback: bool = False,
+        pricing: Optional[Tuple[float, float, float]] = None,
+    ) -> None:
+        """Registra un intento sobre ``route`` con el modelo efectivo ``model``
+
+        ``pricing``, si se indica, sustituye al precio de la ruta.
+        """
+        cost = estimate_cost(usage, model, pricing or route.pricing) if usage else 0.0
+        with self._lock:
+            stats = self._stats.get(route.name)
+            if stats is None:
+                stats = self._stats[route.name] = _RouteStats(self.window)
+            stats.calls += 1
+            stats.latencies.append(seconds)
+            if error is not None:
+                stats.errors += 1
+                return
+            if fallback:
+                stats.fallbacks += 1
+            for kind in stats.tokens:
+                stats.tokens[kind] += (usage or {}).get(kind, 0)
+            # Un coste desconocido hace desconocido el total
+            if stats.cost_usd is not None:
+                stats.cost_usd = None if cost is None else stats.cost_usd + cost
+
+    def stats(self) -> Dict[str, Dict]:
+        """Llamadas, errores, respuestas de respaldo, p50/p95, tokens y coste por ruta"""
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "fallbacks": stats.fallbacks,
+                    "p50": percentile(stats.latencies, 50),
+                    "p95": percentile(stats.latencies, 95),
+                    **stats.tokens,
+                    "cost_usd": stats.cost_usd,
+                }
+                for name, stats in sorted(self._stats.items())
+            }
+
+
+class RouteAttempts:
+    """Intentos de una petición sobre su cadena de rutas, en orden
+
+    Al iterar se obtiene ``(ruta, petición con el modelo de la ruta)``; tras
+    cada intento se llama a ``failed(error)``, que relanza el error si no
+    quedan rutas, o a ``succeeded(response)``. Sin router la cadena es
+    ``[None]``: un único intento con la petición tal cual. ``timer`` (p. ej.
+    un ``CallTimer``) recibe el ``model`` y el ``pricing`` de la ruta que
+    respondió, con los que se calcula el coste de la llamada; ``pricing``
+    fija el precio de todas las rutas (p. ej. el de un backend local).
+    """
+
+    def __init__(
+        self,
+        router: Optional[ModelRouter],
+        chain: List[Optional[Route]],
+        request: Dict,
+        network: str,
+        default_model: str,
+        timer=None,
+        pricing: Optional[Tuple[float, float, float]] = None,
+    ):
+        self.router = router
+        self.chain = chain
+        self.request = request
+        self.network = network
+        self.default_model = default_model
+        self.timer = timer
+        self.pricing = pricing
+        self._position = 0
+        self._route: Optional[Route] = None
+        self._model = request["model"]
+        self._started = 0.0
+
+    def __iter__(self) -> Iterator[Tuple[Optional[Route], Dict]]:
+        for self._position, self._route in enumerate(self.chain):
+            request = self.request
+            if self._route is not None:
+                request = dict(request, model=self._route.model or self.default_model)
+            self._model = request["model"]
+            self._started = time.monotonic()
+            yield self._route, request
+
+    def failed(self, error: Exception) -> None:
+        """Registra el fallo del intento actual; lo relanza si era la última ruta"""
+        if self._route is not None:
+            self.router.record(
+                self._route, self._model, time.monotonic() - self._started, error=error
+            )
+        if self._position == len(self.chain) - 1:
+            raise error
+        logger.warning(
+            f"Ruta {self._route.name} falló para {self.network}: {error}; "
+            f"se prueba {self.chain[self._position + 1].name}"
+        )
+
+    def succeeded(self, response):
+        """Registra la respuesta del intento actual y la devuelve"""
+        if self._route is not None:
+            self.router.record(
+                self._route,
+                self._model,
+                time.monotonic() - self._started,
+                usage_to_dict(getattr(response, "usage", None)),
+                fallback=self._position > 0,
+                pricing=self.pricing,
+            )
+        if self.timer is not None:
+            self.timer.model = self._model
+            self.timer.pricing = self.pricing or (
+                self._route.pricing if self._route is not None else None
+            )
+        return response
+
+
+def router_from_env() -> Optional[ModelRouter]:
+    """Router definido en el JSON de ``LLM_ROUTES_PATH``, o None si no está definida"""
+    path = os.getenv("LLM_ROUTES_PATH")
+    if not path:
+        return None
+    logger.info(f"Rutas de modelos cargadas desde {path}")
+    return ModelRouter.from_file(path)
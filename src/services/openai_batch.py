@@ -0,0 +1,362 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .batch_pipeline import read_records
+    from .llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+        validate_input,
+    )
+    from .output_schema import RESPONSE_FORMATS
+    from .token_accounting import PromptTooLargeError
+except ImportError:
+    from batch_pipeline import read_records
+    from llm_apadter import (
+        LLMAdapter,
+        configure_logging,
+        configure_response_format,
+        get_adapter,
+        load_environment,
+        validate_input,
+    )
+    from output_schema import RESPONSE_FORMATS
+    from token_accounting import PromptTooLargeError
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Límite de peticiones por archivo de la Batch API
+MAX_REQUESTS_PER_FILE = 50000
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def make_custom_id(record_id: str, network: str) -> str:
+    return f"{record_id}:{network}"
+
+
+def split_custom_id(custom_id: str) -> Tuple[str, str]:
+    record_id, _, network = custom_id.rpartition(":")
+    return record_id, network
+
+
+def jobs_from_records(records: Iterable[Tuple[str, Dict]]) -> List[Dict]:
+    """Expande registros de entrada en un trabajo por (registro, red)"""
+    jobs = []
+    for record_id, record in records:
+        if not validate_input(record):
+            logger.error(f"Registro {record_id} omitido: formato de entrada inválido")
+            continue
+        for network in record["target_networks"]:
+            if network not in LLMAdapter.CHARACTER_LIMITS:
+                logger.warning(f"Red social no soportada: {network}")
+                continue
+            jobs.append(
+                {
+                    "custom_id": make_custom_id(record_id, network),
+                    "title": record["titulo"],
+                    "content": record["contenido"],
+                    "network": network,
+                }
+            )
+    return jobs
+
+
+def build_batch_requests(
+    adapter: LLMAdapter, jobs: List[Dict], errors: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Convierte los trabajos en líneas de petición de la Batch API
+
+    El cuerpo de cada petición es el mismo que usa ``adapt_content``: pasa
+    por ``fit_request`` (tamaño del prompt, ``oversize_policy`` y modelo de
+    la ruta) y no lleva las claves internas del adaptador. Los trabajos cuyo
+    prompt no cabe se omiten; ``errors``, si se indica, recibe su error.
+    """
+    requests = []
+    for job in jobs:
+        network = job["network"]
+        try:
+            body = adapter.fit_request(
+                lambda t, c: adapter.build_request(t, c, network),
+                job["title"],
+                job["content"],
+                network,
+            )
+        except PromptTooLargeError as e:
+            logger.error(f"Trabajo {job['custom_id']} omitido: {e}")
+            if errors is not None:
+                errors[job["custom_id"]] = str(e)
+            continue
+        requests.append(
+            {
+                "custom_id": job["custom_id"],
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": adapter.api_request(body),
+            }
+        )
+    return requests
+
+
+def write_batch_files(
+    requests: List[Dict],
+    workdir: str,
+    max_requests_per_file: int = MAX_REQUESTS_PER_FILE,
+) -> List[str]:
+    """Escribe las peticiones en uno o varios archivos JSONL"""
+    os.makedirs(workdir, exist_ok=True)
+    paths = []
+    for start in range(0, len(requests), max_requests_per_file):
+        path = os.path.join(workdir, f"batch_input_{len(paths) + 1:03d}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests[start : start + max_requests_per_file]:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        paths.append(path)
+    return paths
+
+
+def file_digest(path: str) -> str:
+    """Hash del contenido de un archivo de peticiones"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_submitted(state_path: str) -> Dict[str, str]:
+    """Lotes enviados en una ejecución anterior: hash del archivo -> id del lote"""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_submitted(state_path: str, submitted: Dict[str, str]) -> None:
+    """Guarda los lotes enviados; se reemplaza de una vez para no dejarlo a medias"""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(submitted, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def submit_batch(
+    adapter: LLMAdapter, path: str, completion_window: str = "24h"
+) -> str:
+    """Sube un archivo de peticiones y crea el lote; devuelve su id"""
+    with open(path, "rb") as f:
+        input_file = adapter.client.files.create(file=f, purpose="batch")
+
+    batch = adapter.client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=completion_window,
+    )
+    logger.info(f"Lote {batch.id} enviado desde {path}")
+    return batch.id
+
+
+def wait_for_batch(
+    adapter: LLMAdapter,
+    batch_id: str,
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+):
+    """Consulta el lote hasta que llega a un estado final"""
+    started = time.monotonic()
+    while True:
+        batch = adapter.client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            logger.info(f"Lote {batch_id} finalizado con estado {batch.status}")
+            return batch
+
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"El lote {batch_id} no terminó en {timeout}s")
+
+        logger.info(f"Lote {batch_id} en estado {batch.status}")
+        time.sleep(poll_interval)
+
+
+def collect_batch_results(
+    adapter: LLMAdapter, batch, networks_by_id: Dict[str, str]
+) -> Tuple[Dict, Dict]:
+    """Descarga y parsea las salidas de un lote terminado
+
+    Cada respuesta pasa por ``parse_response``, igual que en
+    ``adapt_content``. ``networks_by_id`` son los trabajos del lote. Devuelve
+    ``(resultados, errores)`` por ``custom_id``.
+    """
+    results = {}
+    errors = {}
+
+    if batch.output_file_id:
+        output = adapter.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            custom_id = item["custom_id"]
+            network = networks_by_id.get(custom_id, split_custom_id(custom_id)[1])
+            response = item.get("response") or {}
+
+            if item.get("error") or response.get("status_code") != 200:
+                errors[custom_id] = str(item.get("error") or response.get("body"))
+                continue
+
+            try:
+                response_text = response["body"]["choices"][0]["message"]["content"]
+                results[custom_id] = adapter.parse_response(response_text, network)
+            except (KeyError, IndexError, ValueError) as e:
+                logger.error(f"Error parsing JSON response for {custom_id}: {e}")
+                errors[custom_id] = f"Error parsing LLM response for {network}"
+
+    if batch.error_file_id:
+        error_output = adapter.client.files.content(batch.error_file_id).text
+        for line in error_output.splitlines():
+            if line.strip():
+                item = json.loads(line)
+                errors.setdefault(item["custom_id"], str(item.get("error")))
+
+    # Lo que no aparece en ninguna salida también es un error
+    for custom_id in networks_by_id:
+        if custom_id not in results:
+            errors.setdefault(custom_id, f"Sin respuesta en el lote ({batch.status})")
+
+    return results, errors
+
+
+def run_offline_batch(
+    jobs: List[Dict],
+    adapter: Optional[LLMAdapter] = None,
+    workdir: str = "batch_work",
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+    max_requests_per_file: int = MAX_REQUESTS_PER_FILE,
+    state_path: Optional[str] = None,
+) -> Tuple[Dict, Dict]:
+    """Genera, envía, espera y recoge uno o varios lotes de la Batch API
+
+    Con ``state_path`` cada lote enviado se anota en ese archivo. Al relanzar
+    tras una interrupción, los archivos de peticiones que ya se enviaron
+    (mismo contenido) no se vuelven a enviar: se espera a su lote. El archivo
+    se borra cuando se han recogido todos los lotes.
+    """
+    adapter = adapter or get_adapter()
+    errors: Dict[str, str] = {}
+    requests = build_batch_requests(adapter, jobs, errors)
+    networks_by_id = {job["custom_id"]: job["network"] for job in jobs}
+
+    paths = write_batch_files(requests, workdir, max_requests_per_file)
+    submitted = load_submitted(state_path) if state_path else {}
+    batches = []
+    for index, path in enumerate(paths):
+        chunk = requests[index * max_requests_per_file : (index + 1) * max_requests_per_file]
+        digest = file_digest(path)
+        batch_id = submitted.get(digest)
+        if batch_id is None:
+            batch_id = submitted[digest] = submit_batch(adapter, path)
+            if state_path:
+                save_submitted(state_path, submitted)
+        else:
+            logger.info(f"Reanudando el lote {batch_id} de {path}")
+        batch_networks = {
+            request["custom_id"]: networks_by_id[request["custom_id"]] for request in chunk
+        }
+        batches.append((batch_id, batch_networks))
+
+    results = {}
+    for batch_id, batch_networks in batches:
+        batch = wait_for_batch(adapter, batch_id, poll_interval, timeout)
+        batch_results, batch_errors = collect_batch_results(
+            adapter, batch, batch_networks
+        )
+        results.update(batch_results)
+        errors.update(batch_errors)
+
+    if state_path and os.path.exists(state_path):
+        os.remove(state_path)
+
+    logger.info(
+        f"Batch API completada. Éxito: {len(results)}, Errores: {len(errors)}"
+    )
+    return results, errors
+
+
+def group_by_record(results: Dict, errors: Dict) -> Dict[str, Dict]:
+    """Agrupa resultados por registro con el formato de ``batch_pipeline``"""
+    grouped: Dict[str, Dict] = {}
+    for custom_id, adapted_content in results.items():
+        record_id, network = split_custom_id(custom_id)
+        grouped.setdefault(record_id, {"results": {}})["results"][network] = (
+            adapted_content
+        )
+    for custom_id in errors:
+        record_id, network = split_custom_id(custom_id)
+        record = grouped.setdefault(record_id, {"results": {}})
+        record.setdefault("failed_networks", []).append(network)
+    return grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Regeneración de catálogo mediante la Batch API de OpenAI"
+    )
+    parser.add_argument("input", help="Archivo JSONL de entrada")
+    parser.add_argument("output", help="Archivo JSONL de resultados")
+    parser.add_argument(
+        "--workdir", default="batch_work", help="Directorio para los archivos del lote"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=30.0, help="Segundos entre consultas"
+    )
+    parser.add_argument("--base-url", help="Endpoint compatible con OpenAI")
+    parser.add_argument(
+        "--response-format",
+        choices=RESPONSE_FORMATS,
+        help="Pedir la salida en JSON mode o con esquema JSON estricto",
+    )
+
+    args = parser.parse_args()
+
+    load_environment()
+    configure_logging()
+
+    configure_response_format(args.response_format)
+
+    try:
+        adapter = get_adapter(base_url=args.base_url)
+        jobs = jobs_from_records(read_records(args.input))
+        results, errors = run_offline_batch(
+            jobs,
+            adapter,
+            workdir=args.workdir,
+            poll_interval=args.poll_interval,
+            state_path=f"{args.output}.batches",
+        )
+    except Exception as e:
+        logger.error(f"Error en ejecución: {e}")
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for record_id, payload in group_by_record(results, errors).items():
+            f.write(json.dumps({"id": record_id, **payload}, ensure_ascii=False) + "\n")
+
+    print(f"✅ {len(results)} adaptaciones guardadas en {args.output}")
+    if errors:
+        print(f"❌ {len(errors)} adaptaciones con errores")
+
+
+if __name__ == "__main__":
+    main()
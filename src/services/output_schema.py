@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Optional
+
+# Modos de formato de respuesta de la API de chat completions
+RESPONSE_FORMATS = ("json_object", "json_schema")
+
+# Campos cuyo ejemplo en el prompt es un marcador de texto, no el tipo real
+_FIELD_TYPES = {"character_count": "integer"}
+
+
+class SchemaValidationError(ValueError):
+    """La respuesta del LLM no cumple el esquema de salida esperado"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def _property_schema(name: str, example: Any) -> Dict:
+    if name in _FIELD_TYPES:
+        return {"type": _FIELD_TYPES[name]}
+    if isinstance(example, dict):
+        return schema_from_structure(example)
+    if isinstance(example, list):
+        item = example[0] if example else ""
+        return {"type": "array", "items": _property_schema("", item)}
+    if isinstance(example, bool):
+        return {"type": "boolean"}
+    if isinstance(example, int):
+        return {"type": "integer"}
+    if isinstance(example, float):
+        return {"type": "number"}
+    return {"type": "string"}
+
+
+def schema_from_structure(structure: Dict) -> Dict:
+    """JSON Schema estricto a partir de la estructura de ejemplo del prompt
+
+    Todas las claves son obligatorias y no se admiten claves adicionales,
+    como exige el modo ``strict`` de Structured Outputs.
+    """
+    return {
+        "type": "object",
+        "properties": {
+            name: _property_schema(name, example) for name, example in structure.items()
+        },
+        "required": list(structure),
+        "additionalProperties": False,
+    }
+
+
+def build_response_format(mode: str, name: str, schema: Optional[Dict]) -> Dict:
+    """Parámetro ``response_format`` de la petición para el modo indicado"""
+    if mode == "json_object":
+        return {"type": "json_object"}
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": schema},
+        }
+    raise ValueError(
+        f"Formato de respuesta no soportado: {mode} (usar uno de {RESPONSE_FORMATS})"
+    )
+
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def schema_errors(value: Any, schema: Dict, path: str = "$") -> List[str]:
+    """Errores de ``value`` frente al subconjunto de JSON Schema generado aquí"""
+    expected = schema.get("type")
+    check = _TYPE_CHECKS.get(expected)
+    if check is not None and not check(value):
+        return [f"{path}: se esperaba {expected}, se obtuvo {type(value).__name__}"]
+
+    errors = []
+    if expected == "object":
+        properties = schema.get("properties", {})
+        for name in schema.get("required", ()):
+            if name not in value:
+                errors.append(f"{path}: falta la clave '{name}'")
+        if schema.get("additionalProperties") is False:
+            for name in value:
+                if name not in properties:
+                    errors.append(f"{path}: clave no permitida '{name}'")
+        for name, sub_schema in properties.items():
+            if name in value:
+                errors.extend(schema_errors(value[name], sub_schema, f"{path}.{name}"))
+    elif expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(schema_errors(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def validate_schema(value: Any, schema: Dict) -> None:
+    """Lanza ``SchemaValidationError`` si ``value`` no cumple ``schema``"""
+    errors = schema_errors(value, schema)
+    if errors:
+        raise SchemaValidationError(errors)
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prompts de sistema por defecto (los mismos que documenta docs/prompts.md)
+DEFAULT_SYSTEM_PROMPTS = {
+    "facebook": """
+Eres un experto en contenido para Facebook. Tu tarea es adaptar contenido para esta red social con estas características:
+- Tono: Casual y amigable, pero profesional
+- Longitud: Máximo 500 caracteres recomendados
+- Emojis: Usar con moderación (1-3 por post)
+- Hashtags: Máximo 5, relevantes y populares
+- Enfoque: Generar engagement y conversación
+- Formato: Texto claro con saltos de línea para legibilidad
+""",
+    "instagram": """
+Eres un experto en contenido para Instagram. Tu tarea es adaptar contenido con estas características:
+- Tono: Visual, inspiracional y moderno
+- Longitud: Máximo 2200 caracteres
+- Emojis: Usar generosamente para impacto visual
+- Hashtags: Entre 5-10, incluye trending y nicho
+- Enfoque: Storytelling visual y engagement
+- Formato: Párrafos cortos, fácil de leer en móvil
+- Imagen: Incluir suggested_image_prompt con descripción detallada para foto/gráfico atractivo
+- Considerar: Estética visual, colores, composición, elementos que generen engagement
+""",
+    "linkedin": """
+Eres un experto en contenido para LinkedIn. Tu tarea es adaptar contenido con estas características:
+- Tono: Profesional, informativo y de valor
+- Longitud: Máximo 3000 caracteres
+- Emojis: Usar mínimamente, solo para énfasis
+- Hashtags: Máximo 3-5, enfocados en industria/profesión
+- Enfoque: Insights profesionales, networking, valor empresarial
+- Formato: Estructura clara con bullet points si es necesario
+""",
+    "tiktok": """
+Eres un experto en contenido para TikTok. Tu tarea es adaptar contenido con estas características:
+- Tono: Divertido, dinámico y trending
+- Longitud: Máximo 4000 caracteres
+- Emojis: Usar abundantemente para expresión
+- Hashtags: Entre 3-8, incluir trending y challenges
+- Enfoque: Entretenimiento, trends, viralidad
+- Formato: Energético, call-to-action claros
+- Video: Incluir suggested_video_prompt con descripción detallada para crear video viral
+- Considerar: Transiciones, efectos, música trending, hooks visuales
+""",
+    "whatsapp": """
+Eres un experto en contenido para WhatsApp. Tu tarea es adaptar contenido con estas características:
+- Tono: Personal, directo y conversacional
+- Longitud: Máximo 4000 caracteres, pero preferible conciso
+- Emojis: Usar naturalmente como en conversación
+- Hashtags: Evitar o usar muy pocos (1-2 máximo)
+- Enfoque: Comunicación directa, información útil
+- Formato: Como mensaje personal, fácil de reenviar
+""",
+}
+
+# Disposición del prompt de usuario: "classic" pone el título y el contenido
+# antes de las instrucciones; "prefix_cache" deja todo lo estático delante
+# para aprovechar la caché de prefijos del proveedor
+PROMPT_LAYOUTS = ("classic", "prefix_cache")
+
+# "### Facebook - ..." seguido de "**System Prompt Específico**:" y un bloque ```
+_SYSTEM_PROMPT_SECTION = re.compile(
+    r"^### (\w+)[^\n]*\n.*?\*\*System Prompt Específico\*\*:\s*\n```[^\n]*\n(.*?)\n```",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+class UserPromptTemplate:
+    """Prompt de usuario con las partes estáticas de una red ya construidas"""
+
+    __slots__ = ("head", "middle", "tail")
+
+    def __init__(
+        self,
+        network: str,
+        json_structure: Dict,
+        character_limit: int,
+        layout: str = "classic",
+    ):
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"layout debe ser uno de {PROMPT_LAYOUTS}: {layout}")
+        json_example = json.dumps(json_structure, indent=4, ensure_ascii=False)
+        instructions = f"""Genera SOLO un objeto JSON con esta estructura exacta:
+{json_example}
+
+IMPORTANTE:
+- El texto debe ser específico para {network}
+- Respeta el límite de {character_limit} caracteres
+- El character_count debe ser exacto (número entero)
+- NO agregues explicaciones adicionales, solo el JSON
+- Responde únicamente con el JSON válido
+"""
+        self.middle = "\nCONTENIDO: "
+        if layout == "classic":
+            self.head = f"\nAdapta el siguiente contenido para {network}:\n\nTÍTULO: "
+            self.tail = "\n\n" + instructions
+        else:
+            self.head = (
+                f"\nAdapta para {network}: el contenido que aparece al final "
+                f"(TÍTULO y CONTENIDO).\n\n{instructions}\nTÍTULO: "
+            )
+            self.tail = "\n"
+
+    def render(self, title: str, content: str) -> str:
+        # Concatenación directa: el título y el contenido pueden traer llaves.
+        # str() conserva lo que admitía la f-string (p. ej. un título numérico)
+        return self.head + str(title) + self.middle + str(content) + self.tail
+
+
+def parse_system_prompts(markdown: str) -> Dict[str, str]:
+    """Extrae los prompts de sistema por red de un documento como docs/prompts.md"""
+    prompts = {}
+    for match in _SYSTEM_PROMPT_SECTION.finditer(markdown):
+        network = match.group(1).lower()
+        prompts[network] = "\n" + match.group(2).strip("\n") + "\n"
+    return prompts
+
+
+class PromptRegistry:
+    """Prompts de sistema por red, opcionalmente cargados de un archivo
+
+    Con ``path`` se leen de un markdown con el formato de docs/prompts.md y
+    se recargan al cambiar el archivo (comprobado como mucho cada
+    ``reload_interval`` segundos), sin reiniciar el proceso. Las redes que
+    el archivo no define usan los prompts por defecto.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._prompts = dict(DEFAULT_SYSTEM_PROMPTS)
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        if path is not None:
+            self.reload()
+
+    def reload(self) -> bool:
+        """Relee el archivo de prompts; devuelve True si cambió algo"""
+        if self.path is None:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = parse_system_prompts(f.read())
+        except OSError as e:
+            # Se conservan los prompts vigentes si el archivo no es legible
+            logger.error(f"No se pudieron cargar los prompts de {self.path}: {e}")
+            return False
+
+        prompts = dict(DEFAULT_SYSTEM_PROMPTS)
+        prompts.update(loaded)
+        with self._lock:
+            self._mtime = mtime
+            if prompts == self._prompts:
+                return False
+            self._prompts = prompts
+        logger.info(f"Prompts cargados de {self.path}: {sorted(loaded)}")
+        return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def system_prompt(self, network: str) -> str:
+        """Prompt de sistema de la red (el de Facebook si no está definida)"""
+        if self.path is not None:
+            self._maybe_reload()
+        prompts = self._prompts
+        return prompts.get(network, prompts["facebook"])
+
+
+_default_registry: Optional[PromptRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def default_registry() -> PromptRegistry:
+    """Registro compartido; usa LLM_PROMPTS_PATH si está definida"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = PromptRegistry(os.getenv("LLM_PROMPTS_PATH"))
+        return _default_registry
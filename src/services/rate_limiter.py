@@ -0,0 +1,210 @@
+import asyncio
+import datetime
+import email.utils
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+try:
+    from .token_accounting import estimate_tokens
+except ImportError:
+    from token_accounting import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def estimate_request_tokens(request: Dict) -> int:
+    """Tokens que una petición puede consumir: prompt estimado + max_tokens"""
+    prompt_tokens = sum(
+        estimate_tokens(message["content"]) for message in request["messages"]
+    )
+    return prompt_tokens + request.get("max_tokens", 1000)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Indica si la excepción corresponde a un 429 del proveedor"""
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Errores que openai reintentaría: 408, 409, 5xx, timeouts y conexión"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in (408, 409) or status_code >= 500
+    # openai ya está importado si la excepción viene de su cliente
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Lee ``retry-after-ms`` o ``retry-after`` de la respuesta de error"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    # Formato de fecha HTTP; un valor mal formado hace que se aplique backoff
+    # (según la versión de Python falla con TypeError o ValueError)
+    try:
+        parsed = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        # Las fechas HTTP van en GMT aunque digan -0000
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+class _Bucket:
+    """Token bucket que permite reservar por adelantado
+
+    El nivel puede quedar en negativo: cada llamador reserva su parte y
+    espera lo necesario, de modo que los siguientes quedan detrás en la cola.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # Una petición mayor que el bucket nunca pasaría: se limita a su capacidad
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class RateLimiter:
+    """Planificador compartido de peticiones por minuto y tokens por minuto
+
+    Las llamadas esperan en cola hasta que hay presupuesto en lugar de fallar.
+    Ante un 429 se respeta ``Retry-After`` (o se aplica backoff exponencial
+    con jitter) y se pausa a todos los workers que comparten el limitador.
+    Los errores transitorios (5xx, timeouts, conexión) se reintentan con el
+    mismo backoff pero solo esperan la llamada que falló; así sustituye a los
+    reintentos del cliente de openai, que se desactivan.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 3500,
+        tokens_per_minute: int = 90000,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        if requests_per_minute <= 0 or tokens_per_minute <= 0:
+            raise ValueError("Los límites por minuto deben ser positivos")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = _Bucket(requests_per_minute)
+        self._tokens = _Bucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserva presupuesto y devuelve los segundos que hay que esperar"""
+        with self._lock:
+            now = time.monotonic()
+            return max(
+                self._requests.reserve(1, now),
+                self._tokens.reserve(tokens, now),
+                self._paused_until - now,
+            )
+
+    def acquire(self, tokens: int) -> None:
+        """Bloquea hasta que la petición cabe en el presupuesto"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Esperando {delay:.2f}s por límite de tasa")
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Equivalente asíncrono de ``acquire``"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Esperando {delay:.2f}s por límite de tasa")
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Detiene todas las peticiones durante ``seconds`` segundos"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Retardo antes del reintento ``attempt`` (0 = primero)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _handle_error(self, error: Exception, attempt: int) -> float:
+        """Relanza ``error`` si no se reintenta; si no, devuelve la espera propia"""
+        rate_limited = is_rate_limit_error(error)
+        if not (rate_limited or is_transient_error(error)) or attempt >= self.max_retries:
+            raise error
+        delay = self.backoff_delay(attempt, retry_after_seconds(error))
+        if rate_limited:
+            logger.warning(
+                f"Límite de tasa alcanzado; reintento {attempt + 1}/{self.max_retries} "
+                f"en {delay:.1f}s"
+            )
+            self.pause(delay)
+            return 0.0
+        logger.warning(
+            f"Error transitorio ({error}); reintento {attempt + 1}/{self.max_retries} "
+            f"en {delay:.1f}s"
+        )
+        return delay
+
+    def call(self, fn: Callable[[], T], tokens: int) -> T:
+        """Ejecuta ``fn`` respetando el presupuesto y reintentando 429 y errores transitorios"""
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._handle_error(e, attempt)
+                attempt += 1
+            if delay > 0:
+                time.sleep(delay)
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Equivalente asíncrono de ``call``"""
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._handle_error(e, attempt)
+                attempt += 1
+            if delay > 0:
+                await asyncio.sleep(delay)
@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Executor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+try:
+    from .llm_metrics import percentile
+except ImportError:
+    from llm_metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """El circuito del endpoint está abierto: la petición falla sin enviarse"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(
+            f"Circuito abierto para {endpoint}; nuevo intento en {retry_in:.1f}s"
+        )
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """Fallos del endpoint: timeouts, errores de conexión y 5xx
+
+    Los 4xx (incluido el 429, que gestiona el limitador) indican que el
+    endpoint responde y no abren el circuito; tampoco cualquier otra
+    excepción (p. ej. un ``ValueError`` del parseo o de un backend).
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code >= 500
+    # openai ya está importado si la excepción viene de su cliente;
+    # APITimeoutError es una subclase de APIConnectionError
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Corta las peticiones a un endpoint tras ``failure_threshold`` fallos seguidos
+
+    Abierto, las peticiones fallan al instante con ``CircuitOpenError``.
+    Pasados ``reset_timeout`` segundos deja pasar una sola petición de prueba
+    (semiabierto): si va bien el circuito se cierra y si falla se reabre.
+    """
+
+    def __init__(
+        self, endpoint: str = "default", failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold debe ser al menos 1")
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+            self._state = "half_open"
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> bool:
+        """Lanza ``CircuitOpenError`` si la petición no debe enviarse
+
+        Devuelve True si la petición es la prueba del circuito semiabierto.
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (now - self._opened_at))
+        raise CircuitOpenError(self.endpoint, retry_in)
+
+    def record(self, error: Optional[Exception] = None) -> None:
+        """Registra el resultado de una petición enviada"""
+        failed = error is not None and is_endpoint_failure(error)
+        with self._lock:
+            if not failed:
+                if self._state != "closed":
+                    logger.info(f"Circuito cerrado para {self.endpoint}")
+                self._state = "closed"
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    logger.warning(
+                        f"Circuito abierto para {self.endpoint} tras {self._failures} fallos"
+                    )
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Libera la prueba sin registrar resultado (p. ej. si se canceló)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def call(self, fn: Callable[[], T]) -> T:
+        probe = self.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            self.record(e)
+            raise
+        except BaseException:
+            # Cancelación o interrupción: no dice nada del endpoint, pero la
+            # prueba debe quedar libre para la siguiente petición
+            if probe:
+                self.release_probe()
+            raise
+        self.record()
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> T:
+        probe = self.before_call()
+        try:
+            result = await fn()
+        except Exception as e:
+            self.record(e)
+            raise
+        except BaseException:
+            if probe:
+                self.release_probe()
+            raise
+        self.record()
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self._current_state(time.monotonic()),
+                "consecutive_failures": self._failures,
+                "rejected": self._rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(endpoint: str, **options) -> CircuitBreaker:
+    """Circuito compartido por todos los adaptadores que usan ``endpoint``"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint, **options)
+        else:
+            # Reconfigurar conserva el estado del circuito
+            for name, value in options.items():
+                setattr(breaker, name, value)
+        return breaker
+
+
+class HedgePolicy:
+    """Decide cuándo replicar una petición lenta
+
+    Si una petición tarda más que el percentil ``quantile`` de las últimas
+    latencias de su red, se lanza una réplica y se usa la primera respuesta.
+    Hasta reunir ``min_samples`` latencias no se replica.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 95,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        window: int = 200,
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self._latencies: Dict[str, deque] = {}
+        self._fired: Counter = Counter()
+        self._won: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, network: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.get(network)
+            if samples is None:
+                samples = self._latencies[network] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def delay(self, network: str) -> Optional[float]:
+        """Espera antes de replicar, o None si aún no hay muestras suficientes"""
+        with self._lock:
+            samples = list(self._latencies.get(network, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(samples, self.quantile))
+
+    def record_hedge(self, network: str) -> None:
+        with self._lock:
+            self._fired[network] += 1
+
+    def record_win(self, network: str) -> None:
+        """La réplica respondió antes que la petición original"""
+        with self._lock:
+            self._won[network] += 1
+
+    def stats(self) -> Dict[str, Dict]:
+        """Réplicas lanzadas y ganadas, y espera actual por red"""
+        with self._lock:
+            networks = set(self._latencies) | set(self._fired)
+            fired, won = dict(self._fired), dict(self._won)
+        return {
+            network: {
+                "hedges": fired.get(network, 0),
+                "hedge_wins": won.get(network, 0),
+                "delay": self.delay(network),
+            }
+            for network in sorted(networks)
+        }
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    delay: float,
+    executor: Executor,
+    on_hedge: Optional[Callable[[], None]] = None,
+    replica: Optional[Callable[[], T]] = None,
+    slots: Optional[threading.Semaphore] = None,
+) -> Tuple[T, bool]:
+    """Ejecuta ``fn`` y, si tarda más de ``delay``, una réplica en paralelo
+
+    Devuelve el primer resultado correcto y si lo dio la réplica; al lanzar
+    la réplica se llama ``on_hedge``. La petición perdedora no se puede
+    cancelar y termina en segundo plano.
+
+    ``replica`` sustituye a ``fn`` en la réplica. Con ``slots`` la réplica
+    ocupa un hueco del semáforo mientras dura; si no queda ninguno libre no
+    se replica y se espera a la petición original.
+    """
+    first = executor.submit(fn)
+    try:
+        return first.result(timeout=delay), False
+    except FutureTimeoutError:
+        pass
+
+    if slots is not None and not slots.acquire(blocking=False):
+        return first.result(), False
+    if on_hedge is not None:
+        on_hedge()
+    second = executor.submit(_holding_slot, replica or fn, slots)
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), future is second
+            error = future.exception()
+    raise error
+
+
+def _holding_slot(fn: Callable[[], T], slots: Optional[threading.Semaphore]) -> T:
+    try:
+        return fn()
+    finally:
+        if slots is not None:
+            slots.release()
+
+
+async def hedged_call_async(
+    fn: Callable[[], Awaitable[T]],
+    delay: float,
+    on_hedge: Optional[Callable[[], None]] = None,
+    replica: Optional[Callable[[], Awaitable[T]]] = None,
+    slots: Optional[asyncio.Semaphore] = None,
+) -> Tuple[T, bool]:
+    """Equivalente asíncrono de ``hedged_call``; la petición perdedora se cancela"""
+    first = asyncio.ensure_future(fn())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result(), False
+
+        if slots is not None and slots.locked():
+            return await first, False
+        if on_hedge is not None:
+            on_hedge()
+        second = asyncio.ensure_future(_holding_slot_async(replica or fn, slots))
+        tasks.append(second)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is second
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _holding_slot_async(
+    fn: Callable[[], Awaitable[T]], slots: Optional[asyncio.Semaphore]
+) -> T:
+    if slots is None:
+        return await fn()
+    async with slots:
+        return await fn()
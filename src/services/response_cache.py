@@ -0,0 +1,221 @@
+import abc
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    model: str, system_prompt: str, user_prompt: str, temperature: float
+) -> str:
+    """Genera la clave de caché a partir de todo lo que determina la respuesta"""
+    payload = json.dumps(
+        [model, system_prompt, user_prompt, temperature], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def config_fingerprint(*parts) -> str:
+    """Huella corta de la configuración con la que se generó una respuesta"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache(abc.ABC):
+    """Interfaz base para cachés de respuestas adaptadas
+
+    Las subclases implementan ``_get``, ``_set``, ``_clear`` y ``__len__``;
+    esta clase lleva los contadores de aciertos y fallos.
+    """
+
+    def __init__(self, ttl: Optional[float] = 3600, max_entries: int = 1000):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser al menos 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl if self.ttl is not None else None
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Devuelve una copia del valor cacheado o None si no existe o expiró"""
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict) -> None:
+        """Guarda un valor, desalojando el menos usado si se supera el límite"""
+        with self._lock:
+            self._set(key, value)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores"""
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Devuelve aciertos, fallos, tasa de acierto y tamaño actual"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self),
+            }
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[Dict]:
+        """Valor vigente de la clave, o None; se llama con el lock adquirido"""
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: Dict) -> None:
+        """Guarda el valor; se llama con el lock adquirido"""
+
+    @abc.abstractmethod
+    def _clear(self) -> None:
+        """Elimina todas las entradas; se llama con el lock adquirido"""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Número de entradas vigentes"""
+
+
+class MemoryCache(ResponseCache):
+    """Caché LRU en memoria con expiración por TTL"""
+
+    def __init__(self, ttl: Optional[float] = 3600, max_entries: int = 1000):
+        super().__init__(ttl, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def _set(self, key: str, value: Dict) -> None:
+        self._entries[key] = (self._expires_at(), copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        now = time.time()
+        return sum(
+            1
+            for expires_at, _ in self._entries.values()
+            if expires_at is None or expires_at > now
+        )
+
+
+class SQLiteCache(ResponseCache):
+    """Caché persistente en SQLite con expiración por TTL y desalojo LRU"""
+
+    def __init__(
+        self,
+        path: str = "llm_cache.sqlite3",
+        ttl: Optional[float] = 86400,
+        max_entries: int = 100000,
+    ):
+        super().__init__(ttl, max_entries)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        self._conn.execute(
+            "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+        )
+        self._conn.commit()
+        return json.loads(value)
+
+    def _set(self, key: str, value: Dict) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), self._expires_at(), now),
+        )
+        # Purgar expirados y, si sigue lleno, los menos usados
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        self._conn.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        # Las caducadas siguen en la tabla hasta la próxima escritura
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM responses WHERE expires_at IS NULL OR expires_at > ?",
+            (time.time(),),
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        """Cierra la conexión con la base de datos"""
+        self._conn.close()
@@ -0,0 +1,94 @@
+import json
+import re
+from typing import Any, Optional
+
+try:
+    from .llm_metrics import CallTimer, timed
+except ImportError:
+    from llm_metrics import CallTimer, timed
+
+# Backend JSON más rápido si está instalado
+try:
+    import orjson
+
+    def loads(data: str) -> Any:
+        return orjson.loads(data)
+
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+# Decodifica un valor JSON a partir de una posición y dice dónde termina
+_DECODER = json.JSONDecoder()
+
+# Todo lo que no es una llave: texto sin comillas ni llaves y cadenas JSON
+# completas (con escapes), para que las llaves que contienen no cuenten.
+# Bucle desenrollado: avanza en C hasta la siguiente llave sin retroceder
+_SKIP = re.compile(r'[^"{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}]*)*')
+
+_LEADING_BRACE = re.compile(r"\s*\{").match
+
+
+def _scan_start(text: str) -> int:
+    """Dónde empieza la búsqueda del objeto
+
+    Una respuesta que empieza por ``{`` es el objeto (aunque sus cadenas
+    contengan ```); si no, tras la apertura de un bloque ``` o ```json, o
+    desde el principio si no lo hay.
+    """
+    if _LEADING_BRACE(text):
+        return 0
+    index = text.find("```")
+    if index == -1:
+        return 0
+    index += 3
+    if text.startswith("json", index):
+        index += 4
+    return index
+
+
+def _balanced_end(text: str, start: int) -> int:
+    """Fin del tramo con llaves balanceadas que abre ``text[start]``, o -1 si no cierra"""
+    skip = _SKIP.match
+    depth = 0
+    position = start
+    while position < len(text):
+        char = text[position]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        # Una comilla sin cerrar se salta como cualquier otro carácter
+        position = skip(text, position + 1).end()
+    return -1
+
+
+def parse_json_object(text: str, timer: Optional[CallTimer] = None) -> Any:
+    """Extrae y decodifica el primer objeto JSON completo de la respuesta
+
+    Recorre el texto una sola vez desde el bloque de código markdown, si lo
+    hay, o desde la primera llave. Cada candidato se decodifica en C con
+    ``raw_decode``, que se detiene al cerrar el objeto sin mirar el texto
+    posterior. Si no es JSON válido (p. ej. ``{placeholder}`` en la prosa) se
+    salta hasta su llave de cierre y se prueba el siguiente; un candidato
+    sin cerrar (respuesta truncada) termina la búsqueda.
+    """
+    with timed(timer, "json_extract"):
+        position = text.find("{", _scan_start(text))
+
+    error = None
+    while position != -1:
+        with timed(timer, "json_loads"):
+            try:
+                return _DECODER.raw_decode(text, position)[0]
+            except json.JSONDecodeError as e:
+                error = e
+        with timed(timer, "json_extract"):
+            end = _balanced_end(text, position)
+            position = text.find("{", end) if end != -1 else -1
+
+    if error is None:
+        error = json.JSONDecodeError("No hay ningún objeto JSON", text, 0)
+    raise error
@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+
+try:
+    from .llm_metrics import merge_usage
+    from .rate_limiter import estimate_request_tokens
+    from .token_accounting import estimate_tokens
+except ImportError:
+    from llm_metrics import merge_usage
+    from rate_limiter import estimate_request_tokens
+    from token_accounting import estimate_tokens
+
+# Temperatura baja: la reparación debe corregir, no reescribir
+REPAIR_TEMPERATURE = 0.2
+
+# Margen de tokens de salida sobre la respuesta original
+REPAIR_OUTPUT_MARGIN = 100
+
+REPAIR_SYSTEM_PROMPT = (
+    "Corriges salidas JSON de un adaptador de contenido para redes sociales. "
+    "Responde únicamente con el objeto JSON corregido, sin explicaciones."
+)
+
+
+class RepairBudget:
+    """Intentos y tokens disponibles para reparar una adaptación"""
+
+    def __init__(self, max_attempts: int, max_tokens: int):
+        self.max_attempts = max_attempts
+        self.remaining_tokens = max_tokens
+        self.attempts = 0
+        self.usage: Optional[Dict] = None
+
+    def allows(self, request: Dict) -> bool:
+        return (
+            self.attempts < self.max_attempts
+            and estimate_request_tokens(request) <= self.remaining_tokens
+        )
+
+    def spend(self, request: Dict, usage: Optional[Dict]) -> None:
+        """Descuenta el uso real si la API lo informa; si no, el estimado"""
+        self.attempts += 1
+        self.usage = merge_usage(self.usage, usage)
+        spent = (usage or {}).get("total_tokens") or estimate_request_tokens(request)
+        self.remaining_tokens -= spent
+
+
+def over_length_violation(text: str, limit: int, network: str) -> str:
+    return (
+        f"el campo text tiene {len(text)} caracteres y el máximo para {network} es "
+        f"{limit}; acórtalo conservando el mensaje, el tono y los hashtags"
+    )
+
+
+def missing_fields_violation(missing: List[str]) -> str:
+    return f"faltan los campos obligatorios: {', '.join(missing)}"
+
+
+def invalid_json_violation(error: Exception) -> str:
+    return f"no es un JSON válido ({error}); devuelve el objeto completo y bien cerrado"
+
+
+def build_repair_request(
+    model: str,
+    bad_output: str,
+    violation: str,
+    fields: List[str],
+    max_output_tokens: int,
+    rewrite: bool = False,
+) -> Dict:
+    """Petición corta de seguimiento con solo la salida defectuosa y el problema
+
+    Una corrección acota ``max_tokens`` al tamaño de la salida defectuosa más
+    un margen. Con ``rewrite`` (JSON inválido o truncado) el objeto se genera
+    de nuevo entero y la salida defectuosa no sirve de medida: se usa el
+    ``max_output_tokens`` de la red, el mismo que en la petición original.
+    """
+    if not rewrite:
+        max_output_tokens = min(
+            max_output_tokens, estimate_tokens(bad_output) + REPAIR_OUTPUT_MARGIN
+        )
+    user_prompt = (
+        f"Salida anterior:\n{bad_output}\n\n"
+        f"Problema: {violation}\n\n"
+        f"Devuelve el JSON corregido con los campos: {', '.join(fields)}"
+    )
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": REPAIR_TEMPERATURE,
+        "max_tokens": max_output_tokens,
+    }
@@ -0,0 +1,252 @@
+import bisect
+import copy
+import logging
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# NumPy acelera la búsqueda (un producto matriz-vector por consulta); sin él
+# se usan vectores dispersos en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_DIMENSIONS = 1024
+DEFAULT_NGRAM = 3
+
+_NON_WORD = re.compile(r"[^\w#@]+")
+
+
+def normalize_text(title: str, content: str) -> str:
+    """Título y contenido en minúsculas, sin tildes ni puntuación"""
+    text = unicodedata.normalize("NFKD", f"{title}\n{content}".lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def hashed_ngrams(text: str, dimensions: int, n: int) -> Dict[int, float]:
+    """Vector disperso L2-normalizado de n-gramas de caracteres y palabras
+
+    Cada n-grama se proyecta en ``dimensions`` posiciones con crc32, que es
+    estable entre procesos (al contrario que ``hash``).
+    """
+    counts: Counter = Counter()
+    padded = f" {text} "
+    for i in range(len(padded) - n + 1):
+        counts[zlib.crc32(padded[i : i + n].encode("utf-8")) % dimensions] += 1
+    for word in text.split():
+        counts[zlib.crc32(word.encode("utf-8")) % dimensions] += 1
+
+    norm = sum(count * count for count in counts.values()) ** 0.5
+    if not norm:
+        return {}
+    return {index: count / norm for index, count in counts.items()}
+
+
+class _NetworkIndex:
+    """Vectores y adaptaciones de una red, del más antiguo al más reciente
+
+    Con NumPy los vectores viven en una matriz preasignada: las filas válidas
+    son ``matrix[start:end]`` y cada inserción escribe una fila sin copiar el
+    resto. Al estar en orden de inserción, las entradas desalojadas y las
+    caducadas son siempre un prefijo y basta con avanzar ``start``.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.created: List[float] = []
+        self.values: List[Dict] = []
+        self.vectors: List = []
+        self.matrix = None
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, vector, value: Dict, max_entries: int) -> None:
+        if len(self) >= max_entries:
+            self._drop_oldest(len(self) - max_entries + 1)
+        if np is not None:
+            self._reserve_row(max_entries)
+            self.matrix[self.start + len(self)] = vector
+        else:
+            self.vectors.append(vector)
+        self.created.append(time.monotonic())
+        self.values.append(value)
+
+    def _reserve_row(self, max_entries: int) -> None:
+        """Garantiza una fila libre tras las válidas, compactando o creciendo
+
+        La capacidad llega hasta ``2 * max_entries``: compactar solo cuando el
+        prefijo libre es tan grande como las filas válidas deja el coste de
+        cada inserción constante en promedio.
+        """
+        size = len(self)
+        capacity = 0 if self.matrix is None else len(self.matrix)
+        if self.start + size < capacity:
+            return
+        if capacity and self.start >= size:
+            self.matrix[:size] = self.matrix[self.start : self.start + size]
+        else:
+            matrix = np.empty(
+                (min(max(2 * capacity, 16), 2 * max_entries), self.dimensions),
+                dtype=np.float32,
+            )
+            if size:
+                matrix[:size] = self.matrix[self.start : self.start + size]
+            self.matrix = matrix
+        self.start = 0
+
+    def expire(self, ttl: Optional[float]) -> None:
+        """Descarta las entradas con más de ``ttl`` segundos"""
+        if ttl is not None:
+            self._drop_oldest(bisect.bisect_left(self.created, time.monotonic() - ttl))
+
+    def _drop_oldest(self, count: int) -> None:
+        if not count:
+            return
+        del self.created[:count]
+        del self.values[:count]
+        if np is not None:
+            self.start += count
+        else:
+            del self.vectors[:count]
+
+    def best_match(self, vector) -> Tuple[int, float]:
+        """Posición y similitud coseno de la entrada más parecida"""
+        if np is not None:
+            scores = self.matrix[self.start : self.start + len(self)] @ vector
+            best = int(np.argmax(scores))
+            return best, float(scores[best])
+
+        best, best_score = -1, 0.0
+        for i, candidate in enumerate(self.vectors):
+            small, large = (
+                (vector, candidate) if len(vector) < len(candidate) else (candidate, vector)
+            )
+            score = sum(weight * large.get(index, 0.0) for index, weight in small.items())
+            if score > best_score:
+                best, best_score = i, score
+        return best, best_score
+
+
+class SemanticCache:
+    """Caché de adaptaciones para publicaciones casi idénticas
+
+    Indexa ``titulo`` + ``contenido`` normalizados como vectores de
+    n-gramas con hashing y devuelve la adaptación previa de la misma red si
+    la similitud coseno alcanza el umbral de esa red. Un umbral ``None`` en
+    ``thresholds`` desactiva la caché para esa red.
+
+    ``namespace`` separa las entradas generadas con configuraciones
+    distintas (modelo, formato de prompt o de respuesta): solo se comparan
+    publicaciones de la misma red y el mismo ``namespace``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        thresholds: Optional[Dict[str, Optional[float]]] = None,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        ngram: int = DEFAULT_NGRAM,
+        max_entries: int = 1000,
+        ttl: Optional[float] = None,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold debe estar entre 0 y 1")
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._indexes: Dict[Tuple[str, str], _NetworkIndex] = {}
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def threshold_for(self, network: str) -> Optional[float]:
+        return self.thresholds.get(network, self.threshold)
+
+    def vectorize(self, title: str, content: str):
+        sparse = hashed_ngrams(normalize_text(title, content), self.dimensions, self.ngram)
+        if np is None:
+            return sparse
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if sparse:
+            vector[list(sparse)] = list(sparse.values())
+        return vector
+
+    def get(
+        self, network: str, title: str, content: str, namespace: str = ""
+    ) -> Optional[Dict]:
+        """Copia de la adaptación más parecida por encima del umbral, o None"""
+        threshold = self.threshold_for(network)
+        if threshold is None:
+            return None
+        vector = self.vectorize(title, content)
+
+        with self._lock:
+            index = self._indexes.get((network, namespace))
+            if index is not None:
+                # Las caducadas se descartan antes de buscar la más parecida
+                index.expire(self.ttl)
+            if index:
+                position, score = index.best_match(vector)
+                if score >= threshold:
+                    self._hits[network] += 1
+                    logger.info(f"Caché semántica: {network} con similitud {score:.3f}")
+                    return copy.deepcopy(index.values[position])
+            self._misses[network] += 1
+        return None
+
+    def set(
+        self, network: str, title: str, content: str, value: Dict, namespace: str = ""
+    ) -> None:
+        if self.threshold_for(network) is None:
+            return
+        vector = self.vectorize(title, content)
+        with self._lock:
+            index = self._indexes.get((network, namespace))
+            if index is None:
+                index = self._indexes[(network, namespace)] = _NetworkIndex(self.dimensions)
+            index.add(vector, copy.deepcopy(value), self.max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._hits.clear()
+            self._misses.clear()
+
+    def stats(self) -> Dict:
+        """Aciertos, fallos, tasa de acierto y tamaño por red y en total"""
+        with self._lock:
+            sizes: Counter = Counter()
+            for (network, _), index in self._indexes.items():
+                sizes[network] += len(index)
+            networks = set(self._hits) | set(self._misses) | set(sizes)
+            per_network = {}
+            for network in sorted(networks):
+                hits, misses = self._hits[network], self._misses[network]
+                per_network[network] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                    "size": sizes[network],
+                    "threshold": self.threshold_for(network),
+                }
+            hits, misses = sum(self._hits.values()), sum(self._misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "networks": per_network,
+        }
@@ -0,0 +1,285 @@
+import logging
+import math
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Tokenizador local opcional; sin él se usa una estimación conservadora
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Ventana de contexto por prefijo de modelo (el prefijo más largo gana)
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+}
+DEFAULT_CONTEXT_WINDOW = 16385
+
+# Codificación de tiktoken por familia de modelo (el prefijo más largo gana),
+# para los modelos que la versión instalada aún no conoce
+TOKENIZER_ENCODINGS = {
+    "gpt-3.5-turbo": "cl100k_base",
+    "gpt-4": "cl100k_base",
+    "gpt-4o": "o200k_base",
+    "gpt-4.1": "o200k_base",
+    "o1": "o200k_base",
+    "o3": "o200k_base",
+    "o4-mini": "o200k_base",
+}
+DEFAULT_ENCODING = "cl100k_base"
+
+# Precio en USD por millón de tokens: (entrada, entrada en caché, salida)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+}
+
+# Tokens de salida: ~3 caracteres por token en español con emojis, más el
+# resto de campos del JSON (hashtags, tono, prompts de imagen o video)
+CHARS_PER_OUTPUT_TOKEN = 3
+OUTPUT_OVERHEAD_TOKENS = 200
+MAX_OUTPUT_TOKENS = 2048
+
+# Límite de salida de los modelos más pequeños (gpt-3.5-turbo), que acota la
+# suma de una petición combinada
+MAX_COMBINED_OUTPUT_TOKENS = 4096
+
+# Tokens que añade el formato de chat por mensaje y por respuesta
+_TOKENS_PER_MESSAGE = 3
+_REPLY_PRIMING_TOKENS = 3
+
+OVERSIZE_POLICIES = ("reject", "truncate")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+class PromptTooLargeError(ValueError):
+    """El prompt no cabe en el presupuesto de tokens de entrada"""
+
+    def __init__(self, label: str, prompt_tokens: int, budget: int):
+        self.prompt_tokens = prompt_tokens
+        self.budget = budget
+        super().__init__(
+            f"Prompt demasiado largo para {label}: {prompt_tokens} tokens "
+            f"(máximo {budget})"
+        )
+
+
+def _lookup(table: Dict, model: str):
+    """Valor de la entrada cuyo nombre es el prefijo más largo del modelo"""
+    matches = [name for name in table if model.startswith(name)]
+    return table[max(matches, key=len)] if matches else None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens sin tokenizador (~3 caracteres por token)
+
+    Es la única heurística del proyecto (limitador, ajuste de prompts y
+    backends locales); conservadora para texto en español con emojis.
+    """
+    return len(text) // 3 + 1
+
+
+def encoding_name(model: str) -> str:
+    """Codificación de la familia del modelo, o ``DEFAULT_ENCODING`` si es desconocida"""
+    return _lookup(TOKENIZER_ENCODINGS, model) or DEFAULT_ENCODING
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(encoding_name(model))
+    except Exception as e:
+        # tiktoken descarga los archivos BPE la primera vez: sin red, tras un
+        # proxy o con la caché corrupta se usa la estimación
+        logger.warning(f"Tokenizador de {model} no disponible, se estiman los tokens: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Tokens de ``text`` con el tokenizador del modelo, o ``estimate_tokens``"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict], model: str) -> int:
+    """Tokens de prompt de una lista de mensajes de chat"""
+    return _REPLY_PRIMING_TOKENS + sum(
+        _TOKENS_PER_MESSAGE + count_tokens(message["content"], model)
+        for message in messages
+    )
+
+
+def context_window(model: str) -> int:
+    return _lookup(CONTEXT_WINDOWS, model) or DEFAULT_CONTEXT_WINDOW
+
+
+def max_tokens_for_limit(character_limit: int) -> int:
+    """``max_tokens`` suficiente para un texto de ``character_limit`` caracteres"""
+    return min(
+        MAX_OUTPUT_TOKENS,
+        math.ceil(character_limit / CHARS_PER_OUTPUT_TOKEN) + OUTPUT_OVERHEAD_TOKENS,
+    )
+
+
+def estimate_cost(
+    usage: Optional[Dict], model: str, pricing: Optional[Tuple[float, float, float]] = None
+) -> Optional[float]:
+    """Coste en USD de un uso de tokens, o None si el modelo no tiene precio
+
+    ``pricing`` sustituye al precio de ``MODEL_PRICING`` para el modelo.
+    """
+    if pricing is None:
+        pricing = _lookup(MODEL_PRICING, model)
+    if pricing is None or not usage:
+        return None
+    input_price, cached_price, output_price = pricing
+    cached = usage.get("cached_tokens", 0)
+    uncached = usage.get("prompt_tokens", 0) - cached
+    return (
+        uncached * input_price
+        + cached * cached_price
+        + usage.get("completion_tokens", 0) * output_price
+    ) / 1_000_000
+
+
+def chunk_text(text: str, max_tokens: int, model: str) -> List[str]:
+    """Divide el texto en fragmentos de como mucho ``max_tokens`` tokens
+
+    Corta por párrafos, después por frases y, como último recurso, por
+    palabras, para no partir frases a la mitad.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens debe ser al menos 1")
+
+    # Piezas (separador previo, texto) que no superan max_tokens
+    pieces = []
+    for paragraph in text.split("\n\n"):
+        if count_tokens(paragraph, model) <= max_tokens:
+            pieces.append(("\n\n", paragraph))
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if count_tokens(sentence, model) <= max_tokens:
+                pieces.append((" ", sentence))
+                continue
+            # Suma aproximada palabra a palabra para no retokenizar cada prefijo
+            current, current_tokens = [], 0
+            for word in sentence.split(" "):
+                word_tokens = count_tokens(" " + word, model)
+                if current and current_tokens + word_tokens > max_tokens:
+                    pieces.append((" ", " ".join(current)))
+                    current, current_tokens = [], 0
+                current.append(word)
+                current_tokens += word_tokens
+            if current:
+                pieces.append((" ", " ".join(current)))
+
+    # Se agrupan las piezas contiguas mientras quepan (el separador cuenta 1)
+    chunks, current, current_tokens = [], "", 0
+    for separator, piece in pieces:
+        piece_tokens = count_tokens(piece, model) + 1
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current = current + separator + piece if current else piece
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class UsageSummary:
+    """Acumula uso de tokens y coste por red; seguro entre hilos
+
+    El coste se calcula en cada llamada con el modelo que respondió (el de
+    su ruta si hay router); ``model`` es el del adaptador.
+    """
+
+    _FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens")
+
+    def __init__(self, model: str):
+        self.model = model
+        self._networks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _empty_counts(self) -> Dict:
+        counts: Dict = dict.fromkeys(self._FIELDS, 0)
+        counts["calls"] = 0
+        counts["cost_usd"] = 0.0
+        return counts
+
+    def add(
+        self,
+        network: str,
+        usage: Optional[Dict],
+        model: Optional[str] = None,
+        pricing: Optional[Tuple[float, float, float]] = None,
+    ) -> None:
+        """Suma el uso de una llamada respondida por ``model`` (por defecto el del resumen)"""
+        if not usage:
+            return
+        cost = estimate_cost(usage, model or self.model, pricing)
+        with self._lock:
+            counts = self._networks.setdefault(network, self._empty_counts())
+            counts["calls"] += 1
+            for field in self._FIELDS:
+                counts[field] += usage.get(field, 0)
+            counts["cost_usd"] = _add_cost(counts["cost_usd"], cost)
+
+    def to_dict(self) -> Dict:
+        """``{"model", "networks": {red: uso + coste}, "total": uso + coste}``"""
+        with self._lock:
+            networks = {network: dict(counts) for network, counts in self._networks.items()}
+        total = self._empty_counts()
+        for counts in networks.values():
+            for field in self._FIELDS + ("calls",):
+                total[field] += counts[field]
+            total["cost_usd"] = _add_cost(total["cost_usd"], counts["cost_usd"])
+        return {"model": self.model, "networks": networks, "total": total}
+
+
+def merge_usage_summaries(summaries: List[Dict]) -> Dict:
+    """Suma varios ``UsageSummary.to_dict()`` (p. ej. los de un lote)"""
+    networks: Dict[str, Dict] = {}
+    total: Dict = {"calls": 0, "cost_usd": 0.0}
+    for summary in summaries:
+        for network, counts in summary.get("networks", {}).items():
+            merged = networks.setdefault(network, {"cost_usd": 0.0})
+            for field, value in counts.items():
+                if field == "cost_usd":
+                    continue
+                merged[field] = merged.get(field, 0) + value
+            merged["cost_usd"] = _add_cost(merged["cost_usd"], counts.get("cost_usd"))
+        for field, value in summary.get("total", {}).items():
+            if field == "cost_usd":
+                total["cost_usd"] = _add_cost(total["cost_usd"], value)
+            else:
+                total[field] = total.get(field, 0) + value
+    return {"networks": networks, "total": total}
+
+
+def _add_cost(current: Optional[float], cost: Optional[float]) -> Optional[float]:
+    # Un coste desconocido hace desconocido el total
+    if current is None or cost is None:
+        return None
+    return current + cost
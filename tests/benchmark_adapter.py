@@ -0,0 +1,309 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_metrics import percentile
+from mock_server import NETWORKS, MockOpenAIServer
+
+DEFAULT_BASELINE = os.path.join(project_root, "tests", "benchmark_baseline.json")
+
+POST = {
+    "titulo": "Conferencia TechFuture 2025: El futuro de la tecnología está aquí",
+    "contenido": "Te invitamos a la conferencia más importante del año en tecnología. "
+    * 8,
+}
+
+
+def run_scenario(mode, concurrency, network_count, posts, base_url):
+    """Ejecuta ``posts`` publicaciones y mide throughput, latencia y memoria"""
+    import llm_apadter
+
+    networks = NETWORKS[:network_count]
+    input_data = dict(POST, target_networks=networks)
+    adapter = llm_apadter.get_adapter(base_url=base_url)
+
+    def one_post(_):
+        started = time.perf_counter()
+        if mode == "process_content":
+            results = llm_apadter.process_content(input_data)
+        else:
+            results = adapter.adapt_to_multiple_networks(
+                input_data["titulo"], input_data["contenido"], networks
+            )
+        adapted = [n for n in results if not n.startswith("_")]
+        return time.perf_counter() - started, len(adapted)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one_post, range(posts)))
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = [latency for latency, _ in outcomes]
+    adapted = sum(count for _, count in outcomes)
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "networks": network_count,
+        "posts": posts,
+        "throughput_posts_s": posts / elapsed,
+        "success_rate": adapted / (posts * network_count),
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "peak_memory_mb": peak_memory / (1024 * 1024),
+    }
+
+
+def scenario_key(result):
+    return f"{result['mode']}|c{result['concurrency']}|n{result['networks']}"
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Devuelve las regresiones respecto a la línea base guardada"""
+    regressions = []
+    previous = {scenario_key(r): r for r in baseline.get("results", [])}
+    for result in results:
+        base = previous.get(scenario_key(result))
+        if base is None:
+            continue
+        if result["throughput_posts_s"] < base["throughput_posts_s"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario_key(result)}: throughput {result['throughput_posts_s']:.2f} "
+                f"< {base['throughput_posts_s']:.2f}"
+            )
+        if result["success_rate"] < base["success_rate"]:
+            regressions.append(
+                f"{scenario_key(result)}: éxito {result['success_rate']:.1%} "
+                f"< {base['success_rate']:.1%}"
+            )
+        for metric in ("p95_s", "p99_s"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario_key(result)}: {metric} {result[metric]:.3f}s "
+                    f"> {base[metric]:.3f}s"
+                )
+    return regressions
+
+
+def mostrar_resultados(results):
+    print(
+        f"\n{'escenario':<36} {'posts/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'éxito':>7} {'MB':>7}"
+    )
+    print("-" * 90)
+    for r in results:
+        print(
+            f"{scenario_key(r):<36} {r['throughput_posts_s']:>9.2f} {r['p50_s']:>8.3f} "
+            f"{r['p95_s']:>8.3f} {r['p99_s']:>8.3f} {r['success_rate']:>7.1%} "
+            f"{r['peak_memory_mb']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark del adaptador contra un servidor OpenAI simulado"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["process_content", "adapt_to_multiple_networks"],
+        nargs="+",
+        default=["process_content", "adapt_to_multiple_networks"],
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--networks", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--posts", type=int, default=20, help="Publicaciones por escenario")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--response-format",
+        choices=["json_object", "json_schema"],
+        help="Pedir JSON mode o Structured Outputs (sin respuestas malformadas)",
+    )
+    parser.add_argument(
+        "--prompt-layout",
+        choices=["classic", "prefix_cache"],
+        default="classic",
+        help="Disposición de prompts (prefix_cache: parte estática primero)",
+    )
+    parser.add_argument(
+        "--prefix-cache-min-tokens",
+        type=int,
+        default=1024,
+        help="Prefijo mínimo que el servidor simulado cachea",
+    )
+    parser.add_argument(
+        "--slow-rate", type=float, default=0.0, help="Fracción de respuestas lentas (cola)"
+    )
+    parser.add_argument(
+        "--slow-latency", type=float, default=1.0, help="Latencia extra de las lentas (s)"
+    )
+    parser.add_argument(
+        "--hedge", action="store_true", help="Replicar peticiones más lentas que el p95"
+    )
+    parser.add_argument(
+        "--circuit-breaker", action="store_true", help="Circuito por endpoint"
+    )
+    parser.add_argument("--deadline", type=float, help="Plazo por petición (s), todas las redes")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Backend determinista sin red: mide todo lo que rodea al LLM",
+    )
+    parser.add_argument(
+        "--routes", help="JSON de rutas de modelos (sin base_url usan el servidor simulado)"
+    )
+    parser.add_argument(
+        "--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Guardar línea base"
+    )
+    parser.add_argument(
+        "--compare", nargs="?", const=DEFAULT_BASELINE, help="Comparar con línea base"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Degradación tolerada (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    server = MockOpenAIServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+        prefix_cache_min_tokens=args.prefix_cache_min_tokens,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+    ).start()
+
+    # process_content usa el registro de adaptadores con la configuración del
+    # entorno: se apunta al servidor simulado, sin acceso a red
+    os.environ["OPENAI_API_KEY"] = "sk-mock"
+    os.environ["OPENAI_BASE_URL"] = server.url
+
+    import llm_apadter
+
+    from llm_metrics import InMemoryMetrics
+    from model_router import ModelRouter
+    from resilience import HedgePolicy
+
+    hedging = HedgePolicy() if args.hedge else None
+    llm_apadter.configure_resilience(
+        circuit_breaker=args.circuit_breaker,
+        hedging=hedging,
+        deadlines=dict.fromkeys(NETWORKS, args.deadline) if args.deadline else None,
+    )
+    router = ModelRouter.from_file(args.routes) if args.routes else None
+    llm_apadter.configure_router(router)
+    llm_apadter.configure_backend("offline" if args.offline else None)
+    llm_apadter.configure_response_format(args.response_format)
+    llm_apadter.configure_prompt_layout(args.prompt_layout)
+    metrics = InMemoryMetrics()
+    llm_apadter.configure_metrics(metrics)
+
+    print("⏱️  BENCHMARK DEL ADAPTADOR LLM (servidor simulado)")
+    print(
+        f"   latencia={args.latency}s jitter={args.jitter}s errores={args.error_rate} "
+        f"429={args.rate_limit_rate} malformado={args.malformed_rate} "
+        f"formato={args.response_format or 'texto'} prompts={args.prompt_layout}"
+    )
+    print(
+        f"   lentas={args.slow_rate} (+{args.slow_latency}s) réplicas={args.hedge} "
+        f"circuito={args.circuit_breaker} plazo={args.deadline}"
+    )
+    if args.offline:
+        print("   backend=offline (el servidor simulado no recibe peticiones)")
+
+    results = []
+    try:
+        for mode in args.mode:
+            for network_count in args.networks:
+                for concurrency in args.concurrency:
+                    results.append(
+                        run_scenario(
+                            mode,
+                            concurrency,
+                            network_count,
+                            args.posts,
+                            server.url if mode != "process_content" else None,
+                        )
+                    )
+    finally:
+        server.stop()
+
+    mostrar_resultados(results)
+
+    summary = metrics.summary()
+    print(f"\n{'red':<12} {'llamadas':>9} {'p50 ida':>9} {'p95 ida':>9} {'p99 ida':>9}")
+    for network, phases in sorted(summary["latency"].items()):
+        round_trip = phases.get("round_trip")
+        if round_trip:
+            print(
+                f"{network:<12} {round_trip['count']:>9} {round_trip['p50']:>9.3f} "
+                f"{round_trip['p95']:>9.3f} {round_trip['p99']:>9.3f}"
+            )
+    if hedging is not None:
+        hedges = hedging.stats()
+        fired = sum(h["hedges"] for h in hedges.values())
+        won = sum(h["hedge_wins"] for h in hedges.values())
+        print(f"\nRéplicas lanzadas: {fired}, ganadas: {won}")
+
+    if router is not None:
+        print(
+            f"\n{'ruta':<12} {'llamadas':>9} {'errores':>8} {'respaldo':>9} "
+            f"{'p50':>8} {'p95':>8} {'coste $':>10}"
+        )
+        for name, route in router.stats().items():
+            cost = f"{route['cost_usd']:.4f}" if route["cost_usd"] is not None else "?"
+            print(
+                f"{name:<12} {route['calls']:>9} {route['errors']:>8} {route['fallbacks']:>9} "
+                f"{route['p50']:>8.3f} {route['p95']:>8.3f} {cost:>10}"
+            )
+
+    tokens = summary["tokens"]
+    prompt_tokens = sum(t.get("prompt_tokens", 0) for t in tokens.values())
+    cached_tokens = sum(t.get("cached_tokens", 0) for t in tokens.values())
+    if prompt_tokens:
+        print(
+            f"\nTokens de prompt en caché ({args.prompt_layout}): "
+            f"{cached_tokens}/{prompt_tokens} ({cached_tokens / prompt_tokens:.1%})"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"created": datetime.now().isoformat(), "results": results},
+                f,
+                indent=2,
+            )
+        print(f"\n💾 Línea base guardada en: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ REGRESIONES DETECTADAS:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones respecto a la línea base")
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from mock_server import NETWORKS, MockOpenAIServer
+
+
+async def call(app, method, path, body=None, query=b""):
+    """Ejecuta una petición contra la aplicación ASGI, sin servidor HTTP"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(b"content-type", b"application/json")],
+    }
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    status = sent[0]["status"]
+    return status, b"".join(m.get("body", b"") for m in sent[1:])
+
+
+async def run(app, requests, duplicates):
+    """Lanza ``requests`` peticiones concurrentes con ``duplicates`` copias de cada una"""
+    bodies = [
+        {
+            "titulo": f"Publicación {i // duplicates}",
+            "contenido": "Te invitamos a la conferencia más importante del año. " * 4,
+            "target_networks": NETWORKS,
+        }
+        for i in range(requests)
+    ]
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(call(app, "POST", "/adapt", body) for body in bodies))
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for status, _ in responses if status == 200)
+    return elapsed, ok
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark del servicio HTTP contra un servidor OpenAI simulado"
+    )
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument(
+        "--duplicates", type=int, default=4, help="Copias idénticas de cada publicación"
+    )
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    with MockOpenAIServer(latency=args.latency, seed=args.seed) as server:
+        os.environ["OPENAI_API_KEY"] = "sk-mock"
+        os.environ["OPENAI_BASE_URL"] = server.url
+
+        from http_service import create_app
+
+        app = create_app()
+
+        async def main():
+            elapsed, ok = await run(app, args.requests, args.duplicates)
+            _, health = await call(app, "GET", "/health")
+            _, metrics = await call(app, "GET", "/metrics")
+            return elapsed, ok, json.loads(health), json.loads(metrics)
+
+        elapsed, ok, health, metrics = asyncio.run(main())
+        upstream = server.request_count
+
+    service = metrics["service"]
+    print("⏱️  BENCHMARK DEL SERVICIO HTTP (servidor simulado)")
+    print(f"   peticiones={args.requests} duplicados={args.duplicates} latencia={args.latency}s")
+    print(f"   respuestas 200: {ok}/{args.requests} en {elapsed:.2f}s")
+    print(
+        f"   adaptaciones ejecutadas: {service['upstream_calls']} "
+        f"(compartidas: {service['coalesced']}), llamadas al LLM: {upstream}"
+    )
+    print(f"   health: {health['status']}")
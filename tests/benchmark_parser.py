@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import sys
+import timeit
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+import response_parser
+from response_parser import parse_json_object
+
+CORPUS_PATH = os.path.join(project_root, "tests", "data", "respuestas_llm.jsonl")
+
+
+def legacy_parse(response_text):
+    """Parseo anterior: búsqueda de bloques markdown + regex voraz + json.loads"""
+    response_text = response_text.strip()
+    if "```json" in response_text:
+        start_idx = response_text.find("```json") + 7
+        end_idx = response_text.find("```", start_idx)
+        response_text = response_text[
+            start_idx : end_idx if end_idx != -1 else len(response_text)
+        ].strip()
+    elif "```" in response_text:
+        start_idx = response_text.find("```") + 3
+        end_idx = response_text.find("```", start_idx)
+        response_text = response_text[
+            start_idx : end_idx if end_idx != -1 else len(response_text)
+        ].strip()
+    json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if json_match:
+        response_text = json_match.group(0)
+    return json.loads(response_text)
+
+
+def cargar_corpus():
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def es_correcto(parser, caso):
+    """Un caso es correcto si el parser acierta en si hay JSON utilizable"""
+    try:
+        result = parser(caso["response"])
+        parsed = isinstance(result, dict) and "text" in result
+    except ValueError:
+        parsed = False
+    return parsed == caso["valid"]
+
+
+def respuesta_charlatana(repeticiones):
+    """Respuesta larga con prosa y llaves alrededor del JSON"""
+    adaptacion = {
+        "text": "🚀 Contenido adaptado " * 40,
+        "hashtags": ["#Tech", "#IA"],
+        "character_count": 0,
+        "tone": "energético",
+    }
+    prosa = "Recuerda sustituir {marca} por el nombre de tu empresa. " * repeticiones
+    return f"{prosa}\n```json\n{json.dumps(adaptacion, ensure_ascii=False)}\n```\n{prosa}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark del parseo de respuestas del LLM"
+    )
+    parser.add_argument("--number", "-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = cargar_corpus()
+    parsers = {"anterior": legacy_parse, "actual": parse_json_object}
+    backend = "orjson" if response_parser.orjson is not None else "json"
+
+    print(f"🔍 CORPUS DE RESPUESTAS ({len(corpus)} casos, backend {backend})")
+    print("-" * 60)
+    for nombre, fn in parsers.items():
+        fallos = [caso["name"] for caso in corpus if not es_correcto(fn, caso)]
+        print(
+            f"  {nombre:<9} aciertos {len(corpus) - len(fallos)}/{len(corpus)}"
+            + (f" | fallos: {', '.join(fallos)}" if fallos else "")
+        )
+
+    print(f"\n⏱️  COSTE POR RESPUESTA (µs, {args.number} repeticiones)")
+    print("-" * 60)
+    muestras = {
+        "corpus válido": [c["response"] for c in corpus if c["valid"]],
+        "charlatana x10": [respuesta_charlatana(10)],
+        "charlatana x100": [respuesta_charlatana(100)],
+    }
+    for muestra, respuestas in muestras.items():
+        fila = []
+        for nombre, fn in parsers.items():
+
+            def run():
+                for respuesta in respuestas:
+                    try:
+                        fn(respuesta)
+                    except ValueError:
+                        pass
+
+            total = timeit.timeit(run, number=args.number)
+            fila.append(f"{nombre} {total / (args.number * len(respuestas)) * 1e6:8.1f}")
+        print(f"  {muestra:<16} " + " | ".join(fila))
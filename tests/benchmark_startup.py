@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+services_path = os.path.join(project_root, "src", "services")
+
+DEFAULT_BASELINE = os.path.join(project_root, "tests", "startup_baseline.json")
+
+# Módulos cuyo tiempo de import se mide
+TARGETS = ["llm_apadter", "batch_pipeline", "http_service", "job_queue", "src.services"]
+
+# Dependencias pesadas que no deben cargarse al importar la librería: el
+# cliente HTTP se importa con la primera petición
+LAZY_MODULES = ("openai", "httpx", "pydantic")
+
+# "import time:  self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(module):
+    """Ejecuta ``python -X importtime`` y devuelve ``{módulo: (self_us, cumulative_us)}``"""
+    code = f"import sys; sys.path.insert(0, {services_path!r}); import {module}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{completed.stderr[-2000:]}")
+    profile = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            profile[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return profile
+
+
+def measure_import(module, runs):
+    """Mejor tiempo acumulado de ``runs`` imports en frío y módulos perezosos cargados"""
+    best, eager = None, set()
+    for _ in range(runs):
+        profile = import_profile(module)
+        cumulative = profile[module][1] / 1000
+        best = cumulative if best is None else min(best, cumulative)
+        eager.update(
+            name for name in profile if name.split(".")[0] in LAZY_MODULES
+        )
+    heaviest = sorted(profile.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        "target": module,
+        "import_ms": best,
+        "eager_heavy": sorted({name.split(".")[0] for name in eager}),
+        "heaviest": [(name, self_us / 1000) for name, (self_us, _) in heaviest],
+    }
+
+
+def measure_list_command(runs):
+    """Mejor tiempo total de ``tests/test_all_cases.py --list``"""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-startup"))
+    script = os.path.join(project_root, "tests", "test_all_cases.py")
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, script, "--list"],
+            cwd=project_root,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return {"target": "test_all_cases.py --list", "import_ms": best, "eager_heavy": []}
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Devuelve las regresiones respecto a la línea base guardada"""
+    regressions = []
+    previous = {r["target"]: r for r in baseline.get("results", [])}
+    for result in results:
+        if result["eager_heavy"]:
+            regressions.append(
+                f"{result['target']}: importa al cargar {', '.join(result['eager_heavy'])}"
+            )
+        base = previous.get(result["target"])
+        if base is not None and result["import_ms"] > base["import_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['target']}: {result['import_ms']:.1f}ms > {base['import_ms']:.1f}ms"
+            )
+    return regressions
+
+
+def mostrar_resultados(results):
+    print(f"\n{'objetivo':<28} {'ms':>8}  {'más lentos (self ms)'}")
+    print("-" * 90)
+    for r in results:
+        heaviest = ", ".join(f"{name} {ms:.1f}" for name, ms in r.get("heaviest", [])[:3])
+        print(f"{r['target']:<28} {r['import_ms']:>8.1f}  {heaviest}")
+        if r["eager_heavy"]:
+            print(f"{'':<28} ⚠️  carga al importar: {', '.join(r['eager_heavy'])}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark del tiempo de arranque (python -X importtime)"
+    )
+    parser.add_argument("--targets", nargs="+", default=TARGETS, help="Módulos a importar")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones (se toma el mejor)")
+    parser.add_argument(
+        "--skip-cli", action="store_true", help="No medir test_all_cases.py --list"
+    )
+    parser.add_argument(
+        "--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Guardar línea base"
+    )
+    parser.add_argument(
+        "--compare", nargs="?", const=DEFAULT_BASELINE, help="Comparar con línea base"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3, help="Degradación tolerada (0.3 = 30%%)"
+    )
+    args = parser.parse_args()
+
+    print("⏱️  BENCHMARK DE ARRANQUE")
+    results = [measure_import(module, args.runs) for module in args.targets]
+    if not args.skip_cli:
+        results.append(measure_list_command(args.runs))
+
+    mostrar_resultados(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"created": datetime.now().isoformat(), "results": results},
+                f,
+                indent=2,
+            )
+        print(f"\n💾 Línea base guardada en: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ REGRESIONES DETECTADAS:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones respecto a la línea base")
@@ -0,0 +1,3 @@
+# test_all_cases.py es un CLI que llama a la API real (ver README), no un
+# módulo de pytest: se excluye de la recolección
+collect_ignore = ["test_all_cases.py"]
@@ -0,0 +1,470 @@
+import argparse
+import email.parser
+import email.policy
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NETWORKS = ["facebook", "instagram", "linkedin", "tiktok", "whatsapp"]
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _requested_networks(user_prompt: str) -> List[str]:
+    """Redes pedidas en la primera línea del prompt ("... para X, Y:")"""
+    match = re.search(r"para ([a-z, ]+):", user_prompt)
+    if not match:
+        return ["facebook"]
+    networks = [n.strip() for n in match.group(1).split(",")]
+    return [n for n in networks if n in NETWORKS] or ["facebook"]
+
+
+def fake_adaptation(network: str, title: str) -> Dict:
+    """Adaptación sintética con la estructura que espera el adaptador"""
+    text = f"{title} | contenido adaptado para {network} #{network}"
+    adapted = {
+        "text": text,
+        "hashtags": [f"#{network}", "#mock"],
+        "character_count": len(text),
+        "tone": "neutral",
+    }
+    if network == "instagram":
+        adapted["suggested_image_prompt"] = f"Imagen ilustrativa para {title}"
+    elif network == "tiktok":
+        adapted["suggested_video_prompt"] = f"Video dinámico sobre {title}"
+    return adapted
+
+
+def repaired_adaptation(user_prompt: str) -> Dict:
+    """Respuesta a un turno de reparación con los campos que se piden"""
+    match = re.search(r"con los campos: (.*)", user_prompt)
+    fields = [f.strip() for f in match.group(1).split(",")] if match else []
+    if "suggested_image_prompt" in fields:
+        network = "instagram"
+    elif "suggested_video_prompt" in fields:
+        network = "tiktok"
+    else:
+        network = "facebook"
+    return fake_adaptation(network, "Contenido reparado")
+
+
+class MockConfig:
+    """Comportamiento del servidor simulado"""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: Optional[int] = None,
+        prefix_cache_min_tokens: int = 1024,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        # Cola de latencia: una fracción de peticiones tarda slow_latency más
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.prefix_cache_min_tokens = prefix_cache_min_tokens
+        self._seen_prefixes = set()
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            if self.slow_rate and self.random.random() < self.slow_rate:
+                delay += self.slow_latency
+            return delay
+
+    def cached_prompt_tokens(self, prompt: str) -> int:
+        """Simula la caché de prefijos del proveedor
+
+        Como en OpenAI, se cachea en bloques de 128 tokens a partir de un
+        mínimo (1024 por defecto); devuelve los tokens del prefijo ya visto.
+        """
+        block = 128 * 4
+        minimum = self.prefix_cache_min_tokens * 4
+        cached = 0
+        with self.lock:
+            for end in range(minimum, len(prompt) + 1, block):
+                digest = hash(prompt[:end])
+                if digest in self._seen_prefixes:
+                    cached = end
+                else:
+                    self._seen_prefixes.add(digest)
+        return cached // 4
+
+
+def build_completion(body: Dict, config: MockConfig) -> Dict:
+    """Genera una respuesta de chat completion a partir de la petición"""
+    messages = body.get("messages", [])
+    user_prompt = messages[-1]["content"] if messages else ""
+    title_match = re.search(r"TÍTULO: (.*)", user_prompt)
+    title = title_match.group(1).strip() if title_match else "Sin título"
+    networks = _requested_networks(user_prompt)
+
+    # Con response_format la API garantiza JSON sin texto alrededor
+    json_mode = body.get("response_format") is not None
+
+    if not json_mode and config.roll() < config.malformed_rate:
+        content = 'Aquí tienes tu contenido: {"text": "respuesta incompleta'
+    elif "brief compacto" in (messages[0]["content"] if messages else ""):
+        content = (
+            f"Hechos clave: {title}. Entidades: organizador del evento. "
+            "Llamada a la acción: inscribirse en la web. Tono: entusiasta."
+        )
+    elif "Salida anterior:" in user_prompt:
+        content = json.dumps(repaired_adaptation(user_prompt), ensure_ascii=False)
+    elif "una clave por red" in user_prompt:
+        content = json.dumps(
+            {n: fake_adaptation(n, title) for n in networks}, ensure_ascii=False
+        )
+    elif json_mode:
+        content = json.dumps(fake_adaptation(networks[0], title), ensure_ascii=False)
+    else:
+        content = "```json\n" + json.dumps(
+            fake_adaptation(networks[0], title), ensure_ascii=False
+        ) + "\n```"
+
+    prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+    cached_tokens = config.cached_prompt_tokens(
+        "".join(m.get("content", "") for m in messages)
+    )
+    completion_tokens = _estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente abandonó la petición (plazo vencido o réplica perdedora)
+            self.close_connection = True
+
+    @property
+    def mock(self) -> "MockOpenAIServer":
+        return self.server.mock
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict] = None):
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": "mock_error", "code": status}},
+            headers,
+        )
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def _path(self) -> str:
+        path = self.path.split("?", 1)[0]
+        return path[3:] if path.startswith("/v1/") else path
+
+    def do_GET(self):
+        path = self._path()
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "requests": self.mock.request_count})
+        elif path.startswith("/batches/"):
+            batch = self.mock.batches.get(path.split("/")[2])
+            if batch is None:
+                self._send_error(404, "Lote no encontrado")
+            else:
+                self._send_json(200, batch)
+        elif path.startswith("/files/") and path.endswith("/content"):
+            data = self.mock.files.get(path.split("/")[2])
+            if data is None:
+                self._send_error(404, "Archivo no encontrado")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_error(404, f"Ruta no soportada: {self.path}")
+
+    def do_POST(self):
+        path = self._path()
+        body = self._read_body()
+        if path == "/chat/completions":
+            self._chat_completions(json.loads(body or b"{}"))
+        elif path == "/files":
+            self._upload_file(body)
+        elif path == "/batches":
+            self._create_batch(json.loads(body or b"{}"))
+        else:
+            self._send_error(404, f"Ruta no soportada: {self.path}")
+
+    def _chat_completions(self, body: Dict):
+        config = self.mock.config
+        self.mock.count_request()
+        time.sleep(config.delay())
+
+        roll = config.roll()
+        if roll < config.rate_limit_rate:
+            self._send_error(
+                429, "Rate limit exceeded", {"retry-after": str(config.retry_after)}
+            )
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._send_error(500, "Internal server error")
+            return
+
+        completion = build_completion(body, config)
+        if not body.get("stream"):
+            self._send_json(200, completion)
+            return
+
+        # Streaming SSE: el contenido se parte en fragmentos de 20 caracteres
+        content = completion["choices"][0]["message"]["content"]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {k: completion[k] for k in ("id", "created", "model")}
+        for start in range(0, len(content), 20):
+            chunk = dict(
+                base,
+                object="chat.completion.chunk",
+                choices=[
+                    {
+                        "index": 0,
+                        "delta": {"content": content[start : start + 20]},
+                        "finish_reason": None,
+                    }
+                ],
+            )
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = dict(
+                base,
+                object="chat.completion.chunk",
+                choices=[],
+                usage=completion["usage"],
+            )
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _upload_file(self, body: bytes):
+        header = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode()
+        message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+            header + body
+        )
+        content = b""
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                content = part.get_payload(decode=True)
+        file_id = self.mock.store_file(content)
+        self._send_json(
+            200,
+            {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": "batch.jsonl",
+                "purpose": "batch",
+                "status": "processed",
+            },
+        )
+
+    def _create_batch(self, body: Dict):
+        input_data = self.mock.files.get(body.get("input_file_id"), b"")
+        lines = []
+        for line in input_data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(
+                json.dumps(
+                    {
+                        "id": f"batch_req_{uuid.uuid4().hex[:8]}",
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "request_id": uuid.uuid4().hex,
+                            "body": build_completion(request["body"], self.mock.config),
+                        },
+                        "error": None,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+        output_file_id = self.mock.store_file("\n".join(lines).encode("utf-8"))
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:12]}",
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body.get("input_file_id"),
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "completed",
+            "output_file_id": output_file_id,
+            "error_file_id": None,
+            "created_at": now,
+            "completed_at": now,
+            "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0},
+        }
+        self.mock.batches[batch["id"]] = batch
+        self._send_json(200, batch)
+
+
+class MockOpenAIServer:
+    """Servidor local compatible con la API de OpenAI para pruebas y benchmarks
+
+    Atiende ``/v1/chat/completions`` (con y sin streaming) y un subconjunto de
+    ``/v1/files`` y ``/v1/batches``, con latencia, jitter, errores 500, 429 y
+    respuestas con JSON malformado configurables.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **config):
+        self.config = MockConfig(**config)
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.request_count += 1
+
+    def store_file(self, content: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = content
+        return file_id
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Servidor simulado escuchando en {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor OpenAI simulado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia media (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación de latencia (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fracción de 429")
+    parser.add_argument(
+        "--malformed-rate", type=float, default=0.0, help="Fracción de JSON malformado"
+    )
+    parser.add_argument("--seed", type=int, help="Semilla para resultados reproducibles")
+    parser.add_argument(
+        "--prefix-cache-min-tokens",
+        type=int,
+        default=1024,
+        help="Prefijo mínimo para simular tokens en caché",
+    )
+    parser.add_argument(
+        "--slow-rate", type=float, default=0.0, help="Fracción de peticiones lentas"
+    )
+    parser.add_argument(
+        "--slow-latency", type=float, default=1.0, help="Latencia extra de las lentas (s)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockOpenAIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+        prefix_cache_min_tokens=args.prefix_cache_min_tokens,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+    )
+    print(f"🧪 Servidor simulado en {server.url} (Ctrl+C para salir)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+NETWORKS = ["tiktok", "linkedin", "facebook"]
+
+
+class SlowBackend(OfflineBackend):
+    """Backend con latencia que cuenta las llamadas simultáneas"""
+
+    def __init__(self, latency=0.2, failing=()):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS, latency=latency)
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def create(self, request, network, **options):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if network in self.failing:
+                time.sleep(self.latency)
+                raise ValueError(f"respuesta inválida para {network}")
+            return super().create(request, network, **options)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def adapter_with(backend, **options):
+    return LLMAdapter("sk-test", backend=backend, **options)
+
+
+def test_networks_are_adapted_concurrently_in_requested_order():
+    backend = SlowBackend()
+    adapter = adapter_with(backend)
+
+    started = time.perf_counter()
+    results = adapter.adapt_to_multiple_networks(TITLE, CONTENT, NETWORKS)
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == NETWORKS
+    assert backend.max_active == len(NETWORKS)
+    # La latencia total es la de la red más lenta, no la suma
+    assert elapsed < 2 * backend.latency
+
+
+def test_sequential_mode_and_max_concurrency():
+    backend = SlowBackend(latency=0.05)
+    adapter_with(backend).adapt_to_multiple_networks(TITLE, CONTENT, NETWORKS, concurrent=False)
+    assert backend.max_active == 1
+
+    backend = SlowBackend(latency=0.05)
+    adapter_with(backend, max_concurrency=2).adapt_to_multiple_networks(TITLE, CONTENT, NETWORKS)
+    assert backend.max_active == 2
+
+    with pytest.raises(ValueError):
+        adapter_with(backend, max_concurrency=0)
+
+
+def test_failed_networks_do_not_cancel_the_rest():
+    adapter = adapter_with(SlowBackend(latency=0.05, failing={"linkedin"}))
+    errors = {}
+
+    results = adapter.adapt_to_multiple_networks(
+        TITLE, CONTENT, NETWORKS + ["myspace"], errors=errors
+    )
+
+    assert list(results) == ["tiktok", "facebook"]
+    assert set(errors) == {"linkedin", "myspace"}
+    assert "no está soportada" in errors["myspace"]
+
+
+class CombinedBackend(OfflineBackend):
+    """Registra el tipo de cada petición; ``combined`` decide la respuesta combinada"""
+
+    def __init__(self, combined=None):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.combined = combined
+        self.kinds = []
+
+    def respond(self, request, network):
+        kind = request["backend_task"]["kind"]
+        self.kinds.append((kind, network))
+        response = super().respond(request, network)
+        if kind == "combined" and self.combined is not None:
+            return self.combined(response)
+        return response
+
+
+def test_combined_mode_sends_one_request_for_all_networks():
+    backend = CombinedBackend()
+    results = adapter_with(backend).adapt_to_multiple_networks(
+        TITLE, CONTENT, NETWORKS, combined=True, include_usage=True
+    )
+
+    assert backend.kinds == [("combined", "combined")]
+    assert list(results) == NETWORKS + ["_usage"]
+    assert results["_usage"]["total"]["calls"] == 1
+    for network in NETWORKS:
+        assert results[network]["character_count"] == len(results[network]["text"])
+
+
+def test_combined_mode_adapts_missing_networks_individually():
+    def without_facebook(response):
+        payload = json.loads(response)
+        del payload["facebook"]
+        return json.dumps(payload)
+
+    backend = CombinedBackend(without_facebook)
+    results = adapter_with(backend).adapt_to_multiple_networks(
+        TITLE, CONTENT, NETWORKS, combined=True
+    )
+
+    assert backend.kinds == [("combined", "combined"), ("adapt", "facebook")]
+    assert list(results) == NETWORKS
+
+
+def test_combined_mode_falls_back_when_the_response_is_unusable():
+    backend = CombinedBackend(lambda response: "Lo siento, no puedo ayudar.")
+    results = adapter_with(backend).adapt_to_multiple_networks(
+        TITLE, CONTENT, NETWORKS, combined=True
+    )
+
+    assert backend.kinds[0] == ("combined", "combined")
+    assert sorted(backend.kinds[1:]) == sorted(("adapt", network) for network in NETWORKS)
+    assert list(results) == NETWORKS
+
+
+class StaggeredBackend(OfflineBackend):
+    """Cada red tarda lo que indica ``latencies``"""
+
+    def __init__(self, latencies):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS, latency=max(latencies.values()))
+        self.latencies = latencies
+
+    def create(self, request, network, **options):
+        time.sleep(self.latencies[network])
+        return self._response(request, network, options.get("stream", False))
+
+
+def test_iter_adaptations_yields_networks_as_they_finish():
+    backend = StaggeredBackend({"tiktok": 0.3, "linkedin": 0.0, "facebook": 0.15})
+    adapter = adapter_with(backend)
+
+    yielded = list(adapter.iter_adaptations(TITLE, CONTENT, NETWORKS + ["myspace"]))
+
+    # Las no soportadas primero y después por orden de finalización
+    assert [network for network, _ in yielded] == ["myspace", "linkedin", "facebook", "tiktok"]
+    assert isinstance(yielded[0][1], ValueError)
+    assert all(isinstance(result, dict) for _, result in yielded[1:])
+
+
+def test_iter_adaptations_streams_tokens_per_network():
+    chunks = {}
+
+    def on_token(network, text):
+        chunks.setdefault(network, []).append(text)
+
+    adapter = adapter_with(OfflineBackend(LLMAdapter.CHARACTER_LIMITS))
+    results = dict(adapter.iter_adaptations(TITLE, CONTENT, ["linkedin"], on_token=on_token))
+
+    streamed = json.loads("".join(chunks["linkedin"]))
+    assert len(chunks["linkedin"]) > 1
+    assert streamed["text"] == results["linkedin"]["text"]
@@ -17,7 +17,7 @@ try:
 except ImportError:
     print("Warning: python-dotenv no instalado.")
 
-from llm_apadter import process_content
+from llm_apadter import configure_logging, process_content
 
 CASOS_PRUEBA = {
     "corporativo": {
@@ -319,11 +319,21 @@ if __name__ == "__main__":
     parser.add_argument(
         "--interactive", "-i", action="store_true", help="Modo interactivo"
     )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Respuestas deterministas sin red ni API key (LLM_BACKEND=offline)",
+    )
 
     args = parser.parse_args()
 
-    # Verificar API key
-    if not os.getenv("OPENAI_API_KEY"):
+    configure_logging()
+
+    if args.offline:
+        os.environ["LLM_BACKEND"] = "offline"
+
+    # Verificar API key (los backends locales no la necesitan)
+    if not os.getenv("OPENAI_API_KEY") and not os.getenv("LLM_BACKEND"):
         print("❌ OPENAI_API_KEY no configurada")
         print("   Configura tu clave API en el archivo .env")
         sys.exit(1)
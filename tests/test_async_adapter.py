@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sys
+import time
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import AsyncLLMAdapter, LLMAdapter
+from llm_backends import AsyncOfflineBackend, OfflineBackend
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+NETWORKS = ["tiktok", "linkedin", "facebook"]
+
+
+class SlowAsyncBackend(AsyncOfflineBackend):
+    def __init__(self, latency=0.2, failing=()):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS, latency=latency)
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, request, network, **options):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if network in self.failing:
+                raise ValueError(f"respuesta inválida para {network}")
+            return await super().create(request, network, **options)
+        finally:
+            self.active -= 1
+
+
+def test_async_adapter_gathers_networks_on_one_loop():
+    backend = SlowAsyncBackend()
+
+    async def run():
+        adapter = AsyncLLMAdapter("sk-test", backend=backend)
+        started = time.perf_counter()
+        results = await adapter.adapt_to_multiple_networks(TITLE, CONTENT, NETWORKS)
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert list(results) == NETWORKS
+    assert backend.max_active == len(NETWORKS)
+    assert elapsed < 2 * backend.latency
+
+
+def test_async_adapter_respects_max_concurrency_and_reports_errors():
+    backend = SlowAsyncBackend(latency=0.02, failing={"linkedin"})
+    errors = {}
+
+    async def run():
+        adapter = AsyncLLMAdapter("sk-test", backend=backend, max_concurrency=2)
+        return await adapter.adapt_to_multiple_networks(
+            TITLE, CONTENT, NETWORKS + ["myspace"], errors=errors
+        )
+
+    results = asyncio.run(run())
+
+    assert backend.max_active == 2
+    assert list(results) == ["tiktok", "facebook"]
+    assert set(errors) == {"linkedin", "myspace"}
+
+
+def test_async_adapter_matches_sync_adapter():
+    sync_results = LLMAdapter(
+        "sk-test", backend=OfflineBackend(LLMAdapter.CHARACTER_LIMITS)
+    ).adapt_to_multiple_networks(TITLE, CONTENT, NETWORKS, include_usage=True)
+
+    async def run():
+        adapter = AsyncLLMAdapter(
+            "sk-test", backend=AsyncOfflineBackend(LLMAdapter.CHARACTER_LIMITS)
+        )
+        return await adapter.adapt_to_multiple_networks(
+            TITLE, CONTENT, NETWORKS, include_usage=True
+        )
+
+    assert asyncio.run(run()) == sync_results
@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from batch_pipeline import load_progress, read_records, run_batch
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+
+RECORDS = [
+    {
+        "id": "a",
+        "titulo": "Lanzamiento",
+        "contenido": "Presentamos nuestra nueva plataforma de análisis.",
+        "target_networks": ["linkedin", "facebook"],
+    },
+    {
+        "titulo": "Evento",
+        "contenido": "Te esperamos el jueves en el auditorio central.",
+        "target_networks": ["instagram"],
+    },
+    {"id": "c", "titulo": "Incompleto"},
+]
+
+
+class FlakyBackend(OfflineBackend):
+    """Falla para las redes que estén en ``down``"""
+
+    def __init__(self, down):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.down = set(down)
+        self.calls = []
+
+    def create(self, request, network, **options):
+        self.calls.append(network)
+        if network in self.down:
+            raise ConnectionError(f"{network} no responde")
+        return super().create(request, network, **options)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    input_path = tmp_path / "entrada.jsonl"
+    lines = [json.dumps(record, ensure_ascii=False) for record in RECORDS]
+    input_path.write_text("\n".join(lines + ["", "[1, 2]", "{no es json"]) + "\n", encoding="utf-8")
+    return str(input_path), str(tmp_path / "salida.jsonl")
+
+
+def read_output(output_path):
+    with open(output_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_records_uses_line_number_as_default_id(paths):
+    records = list(read_records(paths[0]))
+    assert [record_id for record_id, _ in records] == ["a", "2", "c", "5", "6"]
+    # Las líneas que no son un objeto JSON llegan vacías y fallan la validación
+    assert records[3][1] == {} and records[4][1] == {}
+
+
+def test_run_batch_writes_results_and_progress(paths):
+    input_path, output_path = paths
+    adapter = LLMAdapter("sk-test", backend=OfflineBackend(LLMAdapter.CHARACTER_LIMITS))
+
+    stats = run_batch(input_path, output_path, workers=2, adapter=adapter)
+
+    assert (stats["processed"], stats["skipped"], stats["failed"]) == (5, 0, 3)
+    assert stats["usage"]["total"]["calls"] == 3
+    assert stats["usage"]["total"]["cost_usd"] == 0.0
+    assert load_progress(output_path + ".progress") == {"a", "2"}
+    output = {line["id"]: line for line in read_output(output_path)}
+    assert set(output["a"]["results"]) == {"linkedin", "facebook", "_usage"}
+    assert output["c"] == {"id": "c", "error": "Formato de entrada inválido"}
+
+
+def test_run_batch_resumes_and_retries_failed_records(paths):
+    input_path, output_path = paths
+    backend = FlakyBackend(down={"facebook"})
+    adapter = LLMAdapter("sk-test", backend=backend)
+
+    first = run_batch(input_path, output_path, workers=2, adapter=adapter)
+    assert first["failed"] == 4
+    assert load_progress(output_path + ".progress") == {"2"}
+    output = {line["id"]: line for line in read_output(output_path)}
+    assert output["a"]["failed_networks"] == ["facebook"]
+
+    backend.down.clear()
+    second = run_batch(input_path, output_path, workers=2, adapter=adapter)
+
+    # Solo se repiten los registros sin completar
+    assert (second["processed"], second["skipped"]) == (4, 1)
+    assert load_progress(output_path + ".progress") == {"2", "a"}
+    retried = [line for line in read_output(output_path) if line["id"] == "a"]
+    assert "failed_networks" in retried[0] and "failed_networks" not in retried[-1]
+
+
+def test_run_batch_resume_only_adapts_failed_networks(paths):
+    input_path, output_path = paths
+    backend = FlakyBackend(down={"facebook"})
+    adapter = LLMAdapter("sk-test", backend=backend)
+    run_batch(input_path, output_path, workers=1, adapter=adapter)
+    first = {line["id"]: line for line in read_output(output_path)}
+
+    backend.down.clear()
+    backend.calls.clear()
+    run_batch(input_path, output_path, workers=1, adapter=adapter)
+
+    assert backend.calls == ["facebook"]
+    retried = [line for line in read_output(output_path) if line["id"] == "a"][-1]
+    assert list(retried["results"]) == ["linkedin", "facebook", "_usage"]
+    assert retried["results"]["linkedin"] == first["a"]["results"]["linkedin"]
+    assert retried["results"]["_usage"]["total"]["calls"] == 1
+
+
+def test_unsupported_networks_complete_the_record(tmp_path):
+    input_path = tmp_path / "entrada.jsonl"
+    record = dict(RECORDS[0], target_networks=["linkedin", "myspace"])
+    input_path.write_text(json.dumps(record) + "\n", encoding="utf-8")
+    output_path = str(tmp_path / "salida.jsonl")
+    backend = FlakyBackend(down=())
+    adapter = LLMAdapter("sk-test", backend=backend)
+
+    for _ in range(2):
+        stats = run_batch(str(input_path), output_path, adapter=adapter)
+
+    # La segunda ejecución lo omite: myspace no se reintenta
+    assert (stats["processed"], stats["skipped"], stats["failed"]) == (0, 1, 0)
+    assert backend.calls == ["linkedin"]
+    assert load_progress(output_path + ".progress") == {"a"}
+    (line,) = read_output(output_path)
+    assert line["unsupported_networks"] == ["myspace"]
+    assert "failed_networks" not in line
+
+
+def test_run_batch_rejects_invalid_workers(paths):
+    with pytest.raises(ValueError):
+        run_batch(*paths, workers=0)
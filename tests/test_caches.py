@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import LLMBackend, OfflineBackend
+from llm_metrics import MetricsSink
+from response_cache import MemoryCache, ResponseCache, SQLiteCache, make_cache_key
+import similarity_cache
+from similarity_cache import SemanticCache
+
+POST = (
+    "Conferencia TechFuture 2025",
+    "Te invitamos a la conferencia más importante del año en tecnología, "
+    "con charlas sobre inteligencia artificial y sostenibilidad digital.",
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    caches = []
+
+    def make(**options):
+        if request.param == "memory":
+            cache = MemoryCache(**options)
+        else:
+            cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), **options)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        if isinstance(cache, SQLiteCache):
+            cache.close()
+
+
+def test_make_cache_key_depends_on_every_input():
+    key = make_cache_key("gpt-4o-mini", "sistema", "usuario", 0.7)
+    assert key == make_cache_key("gpt-4o-mini", "sistema", "usuario", 0.7)
+    assert key != make_cache_key("gpt-4o-mini", "sistema", "usuario", 0.8)
+    assert key != make_cache_key("gpt-4o", "sistema", "usuario", 0.7)
+
+
+def test_cache_get_set_and_stats(make_cache):
+    cache = make_cache()
+    assert cache.get("a") is None
+
+    cache.set("a", {"text": "hola"})
+    value = cache.get("a")
+    assert value == {"text": "hola"}
+
+    # Se devuelve una copia: modificarla no altera la caché
+    value["text"] = "cambiado"
+    assert cache.get("a") == {"text": "hola"}
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 1}
+
+
+def test_cache_evicts_least_recently_used(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    cache.get("a")
+    cache.set("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("c") == {"n": 3}
+    assert len(cache) == 2
+
+
+def test_cache_expires_entries(make_cache):
+    cache = make_cache(ttl=0)
+    cache.set("a", {"n": 1})
+    assert cache.get("a") is None
+
+
+def test_cache_size_ignores_expired_entries(make_cache, monkeypatch):
+    cache = make_cache(ttl=60)
+    cache.set("vieja", {"text": "a"})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    cache.set("nueva", {"text": "b"})
+
+    monkeypatch.setattr(time, "time", lambda: now + 80)
+    assert len(cache) == 1
+    assert cache.stats()["size"] == 1
+
+
+def test_cache_base_classes_are_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache()
+    with pytest.raises(TypeError):
+        MetricsSink()
+    with pytest.raises(TypeError):
+        LLMBackend()
+
+
+def test_cache_clear_resets_counters(make_cache):
+    cache = make_cache()
+    cache.set("a", {"n": 1})
+    cache.get("a")
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0}
+
+
+def test_sqlite_cache_persists_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+    cache.set("a", {"text": "hola"})
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    try:
+        assert reopened.get("a") == {"text": "hola"}
+    finally:
+        reopened.close()
+
+
+def test_memory_cache_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        MemoryCache(max_entries=0)
+
+
+def test_adapter_serves_repeated_requests_from_cache():
+    cache = MemoryCache()
+    adapter = LLMAdapter("sk-test", backend=OfflineBackend(), cache=cache)
+
+    first = adapter.adapt_content(*POST, "linkedin")
+    second = adapter.adapt_content(*POST, "linkedin")
+
+    assert first == second
+    assert cache.stats()["hits"] == 1
+
+
+def test_adapter_skips_cache_above_max_temperature():
+    cache = MemoryCache()
+    adapter = LLMAdapter(
+        "sk-test", backend=OfflineBackend(), cache=cache, cache_max_temperature=0.8
+    )
+
+    # TikTok usa temperatura 0.9
+    adapter.adapt_content(*POST, "tiktok")
+    assert len(cache) == 0
+
+
+def test_semantic_cache_matches_near_duplicates():
+    cache = SemanticCache(threshold=0.9)
+    cache.set("linkedin", *POST, {"text": "adaptado"})
+
+    title, content = POST
+    similar = cache.get("linkedin", title + "!", content.replace("charlas", "charla"))
+    assert similar == {"text": "adaptado"}
+
+    assert cache.get("linkedin", "Receta de paella", "Arroz, azafrán y caldo.") is None
+    assert cache.get("facebook", *POST) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_semantic_cache_threshold_none_disables_network():
+    cache = SemanticCache(thresholds={"tiktok": None})
+    cache.set("tiktok", *POST, {"text": "adaptado"})
+    assert cache.get("tiktok", *POST) is None
+
+
+def test_semantic_cache_returns_copies():
+    cache = SemanticCache()
+    cache.set("linkedin", *POST, {"hashtags": ["#a"]})
+    cache.get("linkedin", *POST)["hashtags"].append("#b")
+    assert cache.get("linkedin", *POST) == {"hashtags": ["#a"]}
+
+
+@pytest.fixture(params=["numpy", "python"])
+def vector_backend(request, monkeypatch):
+    """Ejecuta la prueba con y sin NumPy"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(similarity_cache, "np", None)
+
+
+def test_semantic_cache_separates_namespaces_and_expires_before_matching(
+    vector_backend, monkeypatch
+):
+    cache = SemanticCache(ttl=60)
+    cache.set("linkedin", *POST, {"text": "gpt-4o"}, namespace="a")
+    assert cache.get("linkedin", *POST, namespace="b") is None
+
+    # La entrada caducada no tapa a una más reciente menos parecida
+    clock = [time.monotonic()]
+    monkeypatch.setattr(similarity_cache.time, "monotonic", lambda: clock[0])
+    cache.set("linkedin", *POST, {"text": "antigua"})
+    clock[0] += 45
+    title, content = POST
+    cache.set("linkedin", title + "!", content, {"text": "reciente"})
+    clock[0] += 30
+    assert cache.get("linkedin", *POST) == {"text": "reciente"}
+    assert cache.stats()["networks"]["linkedin"]["size"] == 2
+
+
+def test_semantic_cache_evicts_oldest_beyond_max_entries(vector_backend):
+    cache = SemanticCache(threshold=0.99, max_entries=3)
+    posts = [(f"Publicación {i}", f"Contenido distinto número {i} " * 3) for i in range(40)]
+    for i, post in enumerate(posts):
+        cache.set("linkedin", *post, {"text": str(i)})
+
+    assert cache.stats()["networks"]["linkedin"]["size"] == 3
+    assert cache.get("linkedin", *posts[36]) is None
+    assert [cache.get("linkedin", *post)["text"] for post in posts[37:]] == ["37", "38", "39"]
+
+
+def test_semantic_cache_is_scoped_to_the_adapter_configuration():
+    semantic = SemanticCache(threshold=0.9)
+    backend = OfflineBackend()
+    first = LLMAdapter("sk-test", backend=backend, semantic_cache=semantic)
+    first.adapt_content(*POST, "linkedin")
+
+    same = LLMAdapter("sk-test", backend=backend, semantic_cache=semantic)
+    other_model = LLMAdapter("sk-test", model="gpt-4o", backend=backend, semantic_cache=semantic)
+    json_mode = LLMAdapter(
+        "sk-test", backend=backend, semantic_cache=semantic, response_format="json_object"
+    )
+    for adapter in (same, other_model, json_mode):
+        adapter.adapt_content(*POST, "linkedin")
+    assert semantic.stats()["hits"] == 1
+
+    # Por encima de cache_max_temperature no se consulta ni se guarda
+    hot = LLMAdapter(
+        "sk-test", backend=backend, semantic_cache=semantic, cache_max_temperature=0.5
+    )
+    hot.adapt_content(*POST, "tiktok")
+    assert "tiktok" not in semantic.stats()["networks"]
@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+
+TITLE = "Informe anual"
+SHORT_CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+LONG_CONTENT = " ".join(
+    f"En el trimestre {n} la empresa creció un {n * 3}% y abrió oficina en Lima."
+    for n in range(1, 40)
+)
+NETWORKS = ["linkedin", "facebook", "tiktok"]
+
+
+class RecordingBackend(OfflineBackend):
+    """Guarda las peticiones; ``brief_text`` sustituye la respuesta del brief"""
+
+    def __init__(self, brief_text=None):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.brief_text = brief_text
+        self.requests = []
+
+    def respond(self, request, network):
+        self.requests.append((request["backend_task"]["kind"], request))
+        if request["backend_task"]["kind"] == "brief" and self.brief_text is not None:
+            return self.brief_text
+        return super().respond(request, network)
+
+    def kinds(self):
+        return [kind for kind, _ in self.requests]
+
+
+def brief_adapter(backend):
+    return LLMAdapter("sk-test", backend=backend, brief_threshold_tokens=100)
+
+
+def test_long_content_is_briefed_once_for_all_networks():
+    backend = RecordingBackend()
+    adapter = brief_adapter(backend)
+
+    results = adapter.adapt_to_multiple_networks(TITLE, LONG_CONTENT, NETWORKS, include_usage=True)
+
+    assert backend.kinds() == ["brief"] + ["adapt"] * len(NETWORKS)
+    brief = adapter.prepare_content(TITLE, LONG_CONTENT)
+    assert len(brief) < len(LONG_CONTENT)
+    for _, request in backend.requests[1:]:
+        assert brief in request["messages"][1]["content"]
+        assert LONG_CONTENT not in request["messages"][1]["content"]
+    assert results["_usage"]["networks"]["brief"]["calls"] == 1
+
+
+def test_briefs_are_cached_by_content():
+    backend = RecordingBackend()
+    adapter = brief_adapter(backend)
+
+    adapter.adapt_to_multiple_networks(TITLE, LONG_CONTENT, ["linkedin"])
+    adapter.adapt_to_multiple_networks(TITLE, LONG_CONTENT, ["facebook"])
+
+    assert backend.kinds() == ["brief", "adapt", "adapt"]
+
+
+def test_short_content_skips_the_brief():
+    backend = RecordingBackend()
+    brief_adapter(backend).adapt_to_multiple_networks(TITLE, SHORT_CONTENT, NETWORKS)
+
+    assert "brief" not in backend.kinds()
+    assert not LLMAdapter("sk-test", backend=backend).needs_brief(LONG_CONTENT)
+
+
+def test_failed_brief_falls_back_to_the_full_content():
+    backend = RecordingBackend(brief_text="   ")
+    adapter = brief_adapter(backend)
+
+    results = adapter.adapt_to_multiple_networks(TITLE, LONG_CONTENT, ["linkedin"])
+
+    assert list(results) == ["linkedin"]
+    assert LONG_CONTENT in backend.requests[-1][1]["messages"][1]["content"]
+    # Un brief vacío no se cachea: la siguiente petición lo vuelve a intentar
+    adapter.prepare_content(TITLE, LONG_CONTENT)
+    assert backend.kinds().count("brief") == 2
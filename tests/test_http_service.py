@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+import http_service
+import llm_apadter
+from http_service import AdaptationService, request_key
+from llm_backends import AsyncOfflineBackend
+
+BODY = {
+    "titulo": "Lanzamiento",
+    "contenido": "Presentamos nuestra nueva plataforma de análisis.",
+    "target_networks": ["linkedin", "facebook"],
+}
+
+
+@pytest.fixture(autouse=True)
+def offline_registry(monkeypatch):
+    llm_apadter.reset_adapters()
+    monkeypatch.setattr(llm_apadter, "_registry_settings", llm_apadter._RegistrySettings())
+    llm_apadter.configure_backend("offline")
+    yield
+    llm_apadter.reset_adapters()
+
+
+async def call(app, method, path, body=None):
+    """Ejecuta una petición contra la aplicación ASGI, sin servidor HTTP"""
+    scope = {"type": "http", "method": method, "path": path, "query_string": b""}
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def post(app, *bodies):
+    async def run():
+        return await asyncio.gather(*(call(app, "POST", "/adapt", body) for body in bodies))
+
+    return asyncio.run(run())
+
+
+def test_adapt_returns_results_and_errors():
+    body = dict(BODY, target_networks=["linkedin", "myspace"])
+    ((status, payload),) = post(AdaptationService(), body)
+
+    assert status == 200
+    assert list(payload) == ["linkedin", "_usage", "_errors"]
+    assert "myspace" in payload["_errors"]
+
+
+@pytest.mark.parametrize(
+    "body, status",
+    [
+        (b"{no es json", 400),
+        ({"titulo": "Sin contenido"}, 400),
+        (dict(BODY, target_networks=[1]), 400),
+        (dict(BODY, target_networks=["myspace"]), 422),
+    ],
+)
+def test_adapt_rejects_invalid_requests(body, status):
+    ((response_status, payload),) = post(AdaptationService(), body)
+    assert response_status == status
+    assert "error" in payload
+
+
+class DownBackend(AsyncOfflineBackend):
+    async def create(self, request, network, **options):
+        raise ConnectionError("sin conexión")
+
+
+def test_adapt_returns_502_when_every_network_fails(monkeypatch):
+    adapter = llm_apadter.AsyncLLMAdapter("sk-test", backend=DownBackend())
+    monkeypatch.setattr(http_service, "get_async_adapter", lambda *args: adapter)
+
+    ((status, payload),) = post(AdaptationService(), BODY)
+
+    assert status == 502
+    assert set(payload["_errors"]) == {"linkedin", "facebook"}
+
+
+def test_adapt_returns_500_on_missing_api_key(monkeypatch):
+    llm_apadter.configure_backend(None)
+    monkeypatch.setattr(llm_apadter, "_env_loaded", True)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    ((status, payload),) = post(AdaptationService(), BODY)
+
+    assert (status, payload) == (500, {"error": "Servicio mal configurado"})
+
+
+def test_identical_requests_share_one_call():
+    service = AdaptationService()
+    reordered = dict(BODY, target_networks=["facebook", "linkedin"])
+
+    responses = post(service, BODY, BODY, reordered)
+
+    assert service.single_flight.calls == 2 and service.single_flight.coalesced == 1
+    assert responses[0] == responses[1]
+    # Cada petición recibe las redes en el orden que pidió
+    assert list(responses[2][1]) == ["facebook", "linkedin", "_usage"]
+
+
+def test_request_key_keeps_network_order_and_duplicates():
+    assert request_key(BODY) == request_key(dict(BODY))
+    assert request_key(BODY) != request_key(dict(BODY, target_networks=["facebook", "linkedin"]))
+    assert request_key(BODY) != request_key(
+        dict(BODY, target_networks=["linkedin", "facebook", "facebook"])
+    )
+
+
+def test_health_and_metrics():
+    service = AdaptationService()
+    post(service, BODY)
+
+    async def run():
+        return await call(service, "GET", "/health"), await call(service, "GET", "/metrics")
+
+    (health_status, health), (metrics_status, metrics) = asyncio.run(run())
+    assert (health_status, health["status"]) == (200, "ok")
+    assert metrics_status == 200
+    assert metrics["service"]["responses"]["/adapt"] == {"200": 1}
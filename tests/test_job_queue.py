@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+import job_queue
+from job_queue import SQLiteBroker, run_worker
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+
+PAYLOAD = {
+    "titulo": "Lanzamiento",
+    "contenido": "Presentamos nuestra nueva plataforma de análisis.",
+    "target_networks": ["linkedin", "facebook"],
+}
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = SQLiteBroker(str(tmp_path / "jobs.sqlite3"))
+    yield broker
+    broker.close()
+
+
+def test_enqueue_is_idempotent(broker):
+    job_id = broker.enqueue(PAYLOAD)
+    assert broker.enqueue(dict(PAYLOAD)) == job_id
+    assert broker.enqueue(PAYLOAD, idempotency_key="otra") != job_id
+    assert broker.stats()["queued"] == 2
+
+
+def test_claim_leases_job_to_one_worker(broker):
+    job_id = broker.enqueue(PAYLOAD)
+
+    job = broker.claim("w1", lease_seconds=60)
+    assert job == {"id": job_id, "payload": PAYLOAD, "attempt": 1, "result": None}
+    assert broker.claim("w2", lease_seconds=60) is None
+
+    assert not broker.complete(job_id, "w2", {"ok": True})
+    assert broker.complete(job_id, "w1", {"ok": True})
+    stored = broker.get(job_id)
+    assert (stored["status"], stored["result"]) == ("done", {"ok": True})
+
+
+def test_expired_lease_moves_job_to_another_worker(broker):
+    job_id = broker.enqueue(PAYLOAD)
+    broker.claim("w1", lease_seconds=0.01)
+    time.sleep(0.02)
+
+    job = broker.claim("w2", lease_seconds=60)
+    assert (job["id"], job["attempt"]) == (job_id, 2)
+
+    # El primer worker ya no puede confirmar, renovar ni registrar errores
+    assert not broker.extend_lease(job_id, "w1", 60)
+    assert not broker.complete(job_id, "w1", {"ok": True})
+    assert not broker.fail(job_id, "w1", "tarde")
+    assert broker.get(job_id)["worker"] == "w2"
+
+
+def test_extend_lease_keeps_job_assigned(broker):
+    job_id = broker.enqueue(PAYLOAD)
+    broker.claim("w1", lease_seconds=0.05)
+    assert broker.extend_lease(job_id, "w1", 60)
+    time.sleep(0.06)
+    assert broker.claim("w2", lease_seconds=60) is None
+
+
+def test_fail_retries_with_backoff_until_max_attempts(broker):
+    job_id = broker.enqueue(PAYLOAD, max_attempts=2)
+
+    broker.claim("w1", lease_seconds=60)
+    assert broker.fail(job_id, "w1", "error transitorio")
+    assert broker.get(job_id)["status"] == "queued"
+    # El reintento espera 2 ** intentos segundos
+    assert broker.claim("w1", lease_seconds=60) is None
+
+    broker._conn.execute("UPDATE jobs SET available_at = 0 WHERE id = ?", (job_id,))
+    assert broker.claim("w1", lease_seconds=60)["attempt"] == 2
+    assert broker.fail(job_id, "w1", "error definitivo")
+    job = broker.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "error definitivo")
+
+
+def test_expired_last_attempt_is_marked_failed(broker):
+    job_id = broker.enqueue(PAYLOAD, max_attempts=1)
+    broker.claim("w1", lease_seconds=0.01)
+    time.sleep(0.02)
+
+    assert broker.claim("w2", lease_seconds=60) is None
+    assert broker.get(job_id)["status"] == "failed"
+
+
+class FlakyBackend(OfflineBackend):
+    """Falla la primera llamada de cada red que esté en ``flaky``"""
+
+    def __init__(self, flaky=()):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.flaky = set(flaky)
+        self.calls = []
+
+    def create(self, request, network, **options):
+        self.calls.append(network)
+        if network in self.flaky:
+            self.flaky.discard(network)
+            raise ConnectionError(f"{network} no responde")
+        return super().create(request, network, **options)
+
+
+def test_run_worker_drains_queue(broker):
+    done_id = broker.enqueue(PAYLOAD)
+    unsupported_id = broker.enqueue(dict(PAYLOAD, target_networks=["linkedin", "myspace"]))
+    invalid_id = broker.enqueue({"titulo": "Sin contenido"})
+    backend = FlakyBackend()
+    adapter = LLMAdapter("sk-test", backend=backend)
+
+    processed = run_worker(broker, "w1", adapter=adapter, poll_interval=0.01, drain=True)
+
+    assert processed == 1
+    assert set(broker.get(done_id)["result"]["results"]) == {"linkedin", "facebook", "_usage"}
+    # Los errores permanentes no se reintentan aunque queden intentos
+    for job_id, error in (
+        (unsupported_id, "Redes no soportadas: myspace"),
+        (invalid_id, "Formato de entrada inválido"),
+    ):
+        job = broker.get(job_id)
+        assert (job["status"], job["attempts"], job["error"]) == ("failed", 1, error)
+    assert set(broker.get(unsupported_id)["result"]["results"]) == {"linkedin", "_usage"}
+    assert backend.calls == ["linkedin", "facebook", "linkedin"]
+    assert broker.stats() == {"queued": 0, "running": 0, "done": 1, "failed": 2}
+
+
+def test_run_worker_retries_only_failed_networks(broker, monkeypatch):
+    monkeypatch.setattr(job_queue, "MAX_RETRY_DELAY", 0.0)
+    job_id = broker.enqueue(PAYLOAD)
+    backend = FlakyBackend(flaky={"facebook"})
+    adapter = LLMAdapter("sk-test", backend=backend)
+
+    assert run_worker(broker, "w1", adapter=adapter, poll_interval=0.01, drain=True) == 1
+
+    # El segundo intento solo repite la red que falló
+    assert backend.calls == ["linkedin", "facebook", "facebook"]
+    job = broker.get(job_id)
+    assert (job["status"], job["attempts"]) == ("done", 2)
+    assert list(job["result"]["results"]) == ["linkedin", "facebook", "_usage"]
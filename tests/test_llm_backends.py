@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import (
+    AsyncOfflineBackend,
+    NetworkRules,
+    OfflineBackend,
+    create_backend,
+)
+from prompt_templates import DEFAULT_SYSTEM_PROMPTS
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+LONG_CONTENT = " ".join(
+    f"La plataforma analiza campañas de marketing digital en {n} mercados distintos."
+    for n in range(1, 200)
+)
+
+
+def offline_adapter():
+    return LLMAdapter("sk-test", backend=OfflineBackend(LLMAdapter.CHARACTER_LIMITS))
+
+
+@pytest.mark.parametrize(
+    "network, length, hashtags, emojis",
+    [
+        ("facebook", 500, 5, 1),
+        ("instagram", 2200, 5, 3),
+        ("linkedin", 3000, 3, 1),
+        ("tiktok", 4000, 3, 4),
+        # "preferible conciso" limita la longitud
+        ("whatsapp", 1000, 1, 2),
+    ],
+)
+def test_rules_come_from_the_system_prompts(network, length, hashtags, emojis):
+    rules = NetworkRules(DEFAULT_SYSTEM_PROMPTS[network])
+    assert (rules.length, rules.hashtags, rules.emojis) == (length, hashtags, emojis)
+
+
+@pytest.mark.parametrize("content", [CONTENT, LONG_CONTENT])
+def test_adaptations_respect_structure_and_limits(content):
+    adapter = offline_adapter()
+    networks = list(LLMAdapter.CHARACTER_LIMITS)
+
+    results = adapter.adapt_to_multiple_networks(TITLE, content, networks)
+
+    assert list(results) == networks
+    for network, adapted in results.items():
+        rules = NetworkRules(DEFAULT_SYSTEM_PROMPTS[network])
+        assert list(adapted) == list(adapter.get_json_structure(network))
+        assert adapted["character_count"] == len(adapted["text"])
+        assert len(adapted["text"]) <= min(LLMAdapter.CHARACTER_LIMITS[network], rules.length)
+        assert len(adapted["hashtags"]) == rules.hashtags
+        assert adapted["tone"] == rules.tone
+
+
+def test_responses_are_deterministic():
+    networks = ["instagram", "tiktok"]
+    first = offline_adapter().adapt_to_multiple_networks(TITLE, CONTENT, networks)
+    second = offline_adapter().adapt_to_multiple_networks(TITLE, CONTENT, networks)
+
+    assert first == second
+    assert "«Lanzamiento»" in first["instagram"]["suggested_image_prompt"]
+    assert first["tiktok"]["suggested_video_prompt"].startswith("Video vertical")
+
+
+def test_streaming_chunks_end_with_usage():
+    request = offline_adapter().build_request(TITLE, CONTENT, "linkedin")
+    backend = OfflineBackend(LLMAdapter.CHARACTER_LIMITS)
+
+    *chunks, last = backend.create(request, "linkedin", stream=True)
+    response = backend.create(request, "linkedin")
+
+    streamed = "".join(chunk.choices[0].delta.content for chunk in chunks)
+    assert streamed == response.choices[0].message.content
+    assert json.loads(streamed)["text"]
+    assert last.choices == [] and last.usage.total_tokens > 0
+
+
+def test_backend_contract():
+    backend = OfflineBackend()
+    assert backend.blocking is False and OfflineBackend(latency=0.1).blocking is True
+    assert backend.pricing == (0.0, 0.0, 0.0)
+    with pytest.raises(ValueError):
+        backend.respond({"messages": []}, "linkedin")
+
+    assert isinstance(create_backend("offline", asynchronous=True), AsyncOfflineBackend)
+    with pytest.raises(ValueError):
+        create_backend("vllm")
+
+
+def test_brief_keeps_title_and_keywords():
+    brief = OfflineBackend().brief(TITLE, LONG_CONTENT)
+
+    assert brief.startswith("Hechos clave: Lanzamiento.")
+    assert "plataforma" in brief.splitlines()[-1]
+    assert len(brief) < 800
@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from llm_metrics import (
+    CallTimer,
+    InMemoryMetrics,
+    JsonLogSink,
+    MultiSink,
+    PrometheusMetrics,
+    merge_usage,
+    percentile,
+)
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+
+
+def record(network="linkedin", status="success", total=0.2, usage=None, **phases):
+    return {
+        "network": network,
+        "status": status,
+        "total_seconds": total,
+        "phases": phases or {"round_trip": total},
+        "usage": usage,
+    }
+
+
+def test_percentile_and_merge_usage():
+    assert percentile([], 50) is None
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 99) == 4.0
+
+    merged = merge_usage({"prompt_tokens": 10, "total_tokens": 12}, None, {"prompt_tokens": 5})
+    assert merged == {"prompt_tokens": 15, "total_tokens": 12}
+    assert merge_usage(None, {}) is None
+
+
+def test_call_timer_accumulates_phases():
+    timer = CallTimer("linkedin", "gpt-4o-mini")
+    with timer.phase("json_loads"):
+        pass
+    with timer.phase("json_loads"):
+        pass
+
+    result = timer.to_record("error", error=ValueError("x"))
+    assert set(result["phases"]) == {"json_loads"}
+    assert result["error"] == "ValueError"
+    assert result["total_seconds"] >= result["phases"]["json_loads"]
+
+
+def test_in_memory_metrics_summary():
+    metrics = InMemoryMetrics()
+    usage = {"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 50}
+    metrics.record(record(total=0.1, usage=usage))
+    metrics.record(record(total=0.3, status="error"))
+
+    summary = metrics.summary()
+    assert summary["calls"]["linkedin"] == {"success": 1, "error": 1}
+    assert summary["latency"]["linkedin"]["total"]["count"] == 2
+    assert summary["latency"]["linkedin"]["total"]["p95"] == 0.3
+    assert summary["tokens"]["linkedin"]["cached_ratio"] == 0.5
+    # La ida y vuelta se separa según el acierto en la caché de prefijos
+    assert summary["latency"]["linkedin"]["round_trip_cached"]["count"] == 1
+
+
+def test_prometheus_render_has_cumulative_buckets():
+    metrics = PrometheusMetrics(buckets=(0.1, 1.0))
+    metrics.record(record(total=0.05))
+    metrics.record(record(total=0.5))
+
+    text = metrics.render()
+    labels = 'phase="total",network="linkedin"'
+    assert f'llm_phase_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'llm_phase_seconds_bucket{{{labels},le="1.0"}} 2' in text
+    assert f'llm_phase_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert 'llm_calls_total{network="linkedin",status="success"} 2' in text
+
+
+def test_multi_sink_isolates_failing_sinks():
+    class BrokenSink(InMemoryMetrics):
+        def record(self, record):
+            raise RuntimeError("sin disco")
+
+    stream = io.StringIO()
+    MultiSink([BrokenSink(), JsonLogSink(stream)]).record(record())
+
+    assert json.loads(stream.getvalue())["network"] == "linkedin"
+
+
+@pytest.mark.parametrize("network_count", [1, 3])
+def test_adapter_records_one_call_per_network_with_phases(network_count):
+    metrics = InMemoryMetrics()
+    adapter = LLMAdapter(
+        "sk-test", backend=OfflineBackend(LLMAdapter.CHARACTER_LIMITS), metrics=metrics
+    )
+    networks = ["linkedin", "facebook", "tiktok"][:network_count]
+
+    adapter.adapt_to_multiple_networks(TITLE, CONTENT, networks)
+
+    summary = metrics.summary()
+    assert {network: calls for network, calls in summary["calls"].items()} == {
+        network: {"success": 1} for network in networks
+    }
+    phases = summary["latency"]["linkedin"]
+    assert {"total", "prompt_build", "round_trip", "json_extract", "validation"} <= set(phases)
+    assert summary["tokens"]["linkedin"]["total_tokens"] > 0
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from model_router import ModelRouter, Route, RoutingRule, router_from_env
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+
+ROUTES = {
+    "routes": {
+        "grande": {"model": "gpt-4o"},
+        "local": {"model": "llama-3", "base_url": "http://localhost:8000/v1"},
+    },
+    "rules": [
+        {"routes": ["grande", "default"], "networks": ["linkedin"]},
+        {"routes": ["local"], "max_prompt_tokens": 50},
+    ],
+}
+
+
+class ModelDownBackend(OfflineBackend):
+    """Falla con los modelos de ``down`` y anota el modelo de cada intento"""
+
+    def __init__(self, down=()):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.down = set(down)
+        self.models = []
+
+    def create(self, request, network, **options):
+        self.models.append(request["model"])
+        if request["model"] in self.down:
+            raise ConnectionError(f"{request['model']} no disponible")
+        return super().create(request, network, **options)
+
+
+def test_chain_follows_the_first_matching_rule():
+    router = ModelRouter.from_dict(ROUTES)
+
+    assert [route.name for route in router.chain("linkedin", 500)] == ["grande", "default"]
+    assert [route.name for route in router.chain("tiktok", 20)] == ["local"]
+    assert [route.name for route in router.chain("tiktok", 500)] == ["default"]
+
+    with pytest.raises(ValueError):
+        ModelRouter([Route("grande")], [RoutingRule(["grande", "mediano"])])
+    with pytest.raises(ValueError):
+        RoutingRule([])
+
+
+def test_failed_route_falls_back_to_the_next_one():
+    router = ModelRouter.from_dict(ROUTES)
+    backend = ModelDownBackend(down={"gpt-4o"})
+    adapter = LLMAdapter("sk-test", model="gpt-4o-mini", backend=backend, router=router)
+
+    adapted = adapter.adapt_content(TITLE, CONTENT, "linkedin")
+
+    assert adapted["character_count"] == len(adapted["text"])
+    assert backend.models == ["gpt-4o", "gpt-4o-mini"]
+    stats = router.stats()
+    assert (stats["grande"]["calls"], stats["grande"]["errors"]) == (1, 1)
+    assert stats["default"]["fallbacks"] == 1
+    assert stats["default"]["prompt_tokens"] > 0
+    # El backend local fija el precio de todas las rutas
+    assert stats["default"]["cost_usd"] == 0.0
+
+
+def test_network_fails_when_every_route_fails():
+    router = ModelRouter(
+        [Route("grande", "gpt-4o"), Route("mediano", "gpt-4.1-mini")],
+        [RoutingRule(["grande", "mediano"], networks=["linkedin"])],
+    )
+    adapter = LLMAdapter(
+        "sk-test",
+        model="gpt-4o-mini",
+        backend=ModelDownBackend(down={"gpt-4o", "gpt-4.1-mini"}),
+        router=router,
+    )
+    errors = {}
+
+    results = adapter.adapt_to_multiple_networks(
+        TITLE, CONTENT, ["linkedin", "facebook"], errors=errors
+    )
+
+    assert list(results) == ["facebook"]
+    assert "gpt-4.1-mini no disponible" in errors["linkedin"]
+    stats = router.stats()
+    assert (stats["grande"]["errors"], stats["mediano"]["errors"]) == (1, 1)
+    assert stats["default"] == dict(stats["default"], calls=1, errors=0, fallbacks=0)
+
+
+def test_router_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_ROUTES_PATH", raising=False)
+    assert router_from_env() is None
+
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(ROUTES), encoding="utf-8")
+    monkeypatch.setenv("LLM_ROUTES_PATH", str(path))
+
+    router = router_from_env()
+    assert router.routes["local"].base_url == "http://localhost:8000/v1"
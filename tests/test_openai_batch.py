@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from openai_batch import build_batch_requests, group_by_record, run_offline_batch
+
+JOBS = [
+    {
+        "custom_id": f"{record_id}:{network}",
+        "title": "Lanzamiento",
+        "content": "Presentamos nuestra nueva plataforma.",
+        "network": network,
+    }
+    for record_id in ("a", "b")
+    for network in ("linkedin", "instagram")
+]
+
+ADAPTATION = {"text": "Hola", "hashtags": [], "character_count": 4, "tone": "casual"}
+
+
+class FakeBatchClient:
+    """Files y Batches de openai en memoria; cada lote termina al consultarlo"""
+
+    def __init__(self):
+        self.uploads = {}
+        self.batches = SimpleNamespace(
+            create=self._create_batch, retrieve=self._retrieve_batch
+        )
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.created = []
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self.created)}"
+        self.created.append((batch_id, input_file_id))
+        return SimpleNamespace(id=batch_id)
+
+    def _retrieve_batch(self, batch_id):
+        input_file_id = dict(self.created)[batch_id]
+        return SimpleNamespace(
+            id=batch_id,
+            status="completed",
+            output_file_id=f"out-{input_file_id}",
+            error_file_id=None,
+        )
+
+    def _content(self, file_id):
+        lines = []
+        for line in self.uploads[file_id[len("out-"):]].splitlines():
+            request = json.loads(line)
+            body = {"choices": [{"message": {"content": json.dumps(ADAPTATION)}}]}
+            response = {"status_code": 200, "body": body}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "response": response}))
+        return SimpleNamespace(text="\n".join(lines))
+
+
+@pytest.fixture
+def adapter():
+    adapter = LLMAdapter("sk-test", backend=OfflineBackend(LLMAdapter.CHARACTER_LIMITS))
+    adapter._client = FakeBatchClient()
+    return adapter
+
+
+def test_batch_requests_are_fitted_and_without_internal_keys(adapter):
+    adapter.max_input_tokens = 400
+    jobs = JOBS[:1] + [dict(JOBS[1], content="Párrafo larguísimo. " * 400)]
+    errors = {}
+
+    requests = build_batch_requests(adapter, jobs, errors)
+
+    assert [request["custom_id"] for request in requests] == ["a:linkedin"]
+    assert "backend_task" not in requests[0]["body"]
+    assert requests[0]["body"]["max_tokens"] == adapter.max_output_tokens("linkedin")
+    assert "Prompt demasiado largo" in errors["a:instagram"]
+
+
+def test_run_offline_batch_collects_each_batch_with_its_own_jobs(adapter, tmp_path):
+    results, errors = run_offline_batch(
+        JOBS, adapter, workdir=str(tmp_path), poll_interval=0, max_requests_per_file=3
+    )
+
+    assert len(adapter.client.created) == 2
+    assert set(results) == {job["custom_id"] for job in JOBS}
+    assert errors == {}
+    grouped = group_by_record(results, errors)
+    assert list(grouped["b"]["results"]) == ["linkedin", "instagram"]
+
+
+def test_run_offline_batch_resumes_submitted_batches(adapter, tmp_path):
+    state_path = str(tmp_path / "salida.jsonl.batches")
+    client = adapter.client
+    original_retrieve = client.batches.retrieve
+
+    def interrupted(batch_id):
+        raise KeyboardInterrupt
+
+    client.batches.retrieve = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        run_offline_batch(
+            JOBS, adapter, workdir=str(tmp_path), poll_interval=0, state_path=state_path
+        )
+    with open(state_path, "r", encoding="utf-8") as f:
+        assert list(json.load(f).values()) == ["batch-0"]
+
+    client.batches.retrieve = original_retrieve
+    results, errors = run_offline_batch(
+        JOBS, adapter, workdir=str(tmp_path), poll_interval=0, state_path=state_path
+    )
+
+    # El lote ya enviado no se vuelve a enviar
+    assert [batch_id for batch_id, _ in client.created] == ["batch-0"]
+    assert len(results) == len(JOBS) and errors == {}
+    assert not os.path.exists(state_path)
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from output_schema import (
+    SchemaValidationError,
+    build_response_format,
+    schema_errors,
+    schema_from_structure,
+    validate_schema,
+)
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+
+
+def test_schema_from_structure_is_strict():
+    schema = LLMAdapter("sk-test", backend=OfflineBackend()).get_output_schema("instagram")
+
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == list(schema["properties"])
+    assert schema["properties"]["character_count"] == {"type": "integer"}
+    assert schema["properties"]["hashtags"] == {"type": "array", "items": {"type": "string"}}
+    assert "suggested_image_prompt" in schema["required"]
+
+
+def test_schema_errors_report_paths():
+    schema = schema_from_structure({"text": "", "hashtags": [""], "meta": {"n": 1}})
+    value = {"text": 1, "hashtags": ["#a", 2], "meta": {"n": True}, "extra": None}
+
+    assert schema_errors(value, schema) == [
+        "$: clave no permitida 'extra'",
+        "$.text: se esperaba string, se obtuvo int",
+        "$.hashtags[1]: se esperaba string, se obtuvo int",
+        "$.meta.n: se esperaba integer, se obtuvo bool",
+    ]
+    with pytest.raises(SchemaValidationError) as raised:
+        validate_schema({}, schema)
+    assert len(raised.value.errors) == 3
+
+
+def test_build_response_format():
+    assert build_response_format("json_object", "x", None) == {"type": "json_object"}
+    param = build_response_format("json_schema", "adaptacion_linkedin", {"type": "object"})
+    assert param["json_schema"]["strict"] is True
+    with pytest.raises(ValueError):
+        build_response_format("yaml", "x", None)
+    with pytest.raises(ValueError):
+        LLMAdapter("sk-test", response_format="yaml")
+
+
+class WrongTypesBackend(OfflineBackend):
+    """La primera adaptación trae ``hashtags`` como texto; las reparaciones, bien"""
+
+    def __init__(self):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.requests = []
+
+    def respond(self, request, network):
+        self.requests.append(request)
+        response = super().respond(request, network)
+        if request["backend_task"]["kind"] == "adapt":
+            adapted = json.loads(response)
+            adapted["hashtags"] = " ".join(adapted["hashtags"])
+            return json.dumps(adapted, ensure_ascii=False)
+        return response
+
+
+@pytest.mark.parametrize("mode", ["json_object", "json_schema"])
+def test_schema_violations_are_repaired(mode):
+    backend = WrongTypesBackend()
+    adapter = LLMAdapter("sk-test", backend=backend, response_format=mode)
+
+    adapted = adapter.adapt_content(TITLE, CONTENT, "linkedin")
+
+    assert isinstance(adapted["hashtags"], list)
+    adapt, repair = backend.requests
+    assert adapt["response_format"]["type"] == mode
+    assert "se esperaba array" in repair["messages"][1]["content"]
+
+
+def test_schema_violation_without_repair_fails():
+    adapter = LLMAdapter(
+        "sk-test",
+        backend=WrongTypesBackend(),
+        response_format="json_schema",
+        max_repair_attempts=0,
+    )
+
+    with pytest.raises(Exception, match="se esperaba array"):
+        adapter.adapt_content(TITLE, CONTENT, "linkedin")
+
+
+def test_free_text_mode_does_not_check_types():
+    adapter = LLMAdapter("sk-test", backend=WrongTypesBackend())
+
+    adapted = adapter.adapt_content(TITLE, CONTENT, "linkedin")
+
+    assert isinstance(adapted["hashtags"], str)
@@ -0,0 +1,159 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from llm_metrics import InMemoryMetrics
+from prompt_templates import (
+    DEFAULT_SYSTEM_PROMPTS,
+    PromptRegistry,
+    UserPromptTemplate,
+    parse_system_prompts,
+)
+from token_accounting import estimate_tokens
+
+TITLE = "Lanzamiento"
+CONTENT = "Presentamos nuestra nueva plataforma de análisis para equipos de marketing."
+
+LINKEDIN_PROMPTS = """### LinkedIn - Prompts Profesionales
+**System Prompt Específico**:
+```
+{prompt}
+```
+"""
+
+
+def write_prompts(path, prompt, mtime):
+    path.write_text(LINKEDIN_PROMPTS.format(prompt=prompt), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_docs_prompts_match_the_defaults():
+    with open(os.path.join(project_root, "docs", "prompts.md"), encoding="utf-8") as f:
+        assert parse_system_prompts(f.read()) == DEFAULT_SYSTEM_PROMPTS
+
+
+def test_user_template_only_interpolates_title_and_content():
+    adapter = LLMAdapter("sk-test", backend=OfflineBackend())
+    template = UserPromptTemplate("linkedin", adapter.get_json_structure("linkedin"), 3000)
+
+    prompt = template.render("{título}", "50% de {descuento}")
+    assert "TÍTULO: {título}\nCONTENIDO: 50% de {descuento}" in prompt
+    assert prompt == adapter.get_user_prompt("{título}", "50% de {descuento}", "linkedin")
+
+    # La plantilla se construye una vez por red y se reutiliza
+    cached = adapter._user_templates["linkedin"]
+    adapter.get_user_prompt("Otro", "post", "linkedin")
+    assert adapter._user_templates["linkedin"] is cached
+
+    with pytest.raises(ValueError):
+        UserPromptTemplate("linkedin", {}, 3000, layout="inverso")
+
+
+def test_registry_reloads_changed_files(tmp_path):
+    path = tmp_path / "prompts.md"
+    write_prompts(path, "Eres editor de LinkedIn.", 1_000_000)
+    registry = PromptRegistry(str(path), reload_interval=0)
+
+    assert registry.system_prompt("linkedin") == "\nEres editor de LinkedIn.\n"
+    # Las redes que el archivo no define usan los prompts por defecto
+    assert registry.system_prompt("tiktok") == DEFAULT_SYSTEM_PROMPTS["tiktok"]
+
+    write_prompts(path, "Eres redactor técnico.", 1_000_010)
+    assert registry.system_prompt("linkedin") == "\nEres redactor técnico.\n"
+
+    # Si el archivo deja de ser legible se conservan los prompts vigentes
+    path.unlink()
+    assert registry.reload() is False
+    assert registry.system_prompt("linkedin") == "\nEres redactor técnico.\n"
+
+
+def test_adapter_sends_the_registry_prompt(tmp_path):
+    path = tmp_path / "prompts.md"
+    write_prompts(path, "Eres editor de LinkedIn.", 1_000_000)
+    requests = []
+
+    class RecordingBackend(OfflineBackend):
+        def respond(self, request, network):
+            requests.append(request)
+            return super().respond(request, network)
+
+    adapter = LLMAdapter(
+        "sk-test",
+        backend=RecordingBackend(LLMAdapter.CHARACTER_LIMITS),
+        prompts=PromptRegistry(str(path)),
+    )
+    adapter.adapt_content(TITLE, CONTENT, "linkedin")
+
+    assert requests[0]["messages"][0] == {
+        "role": "system",
+        "content": "\nEres editor de LinkedIn.\n",
+    }
+
+
+class PrefixCachingBackend(OfflineBackend):
+    """Simula la caché de prefijos: reutiliza el prefijo común con el prompt anterior"""
+
+    def __init__(self):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.seen = {}
+
+    def _response(self, request, network, stream):
+        prompt = "".join(message["content"] for message in request["messages"])
+        previous = self.seen.get(network, "")
+        self.seen[network] = prompt
+        shared = os.path.commonprefix([previous, prompt])
+        response = super()._response(request, network, stream)
+        response.usage.prompt_tokens_details = SimpleNamespace(
+            cached_tokens=estimate_tokens(shared) if shared else 0
+        )
+        return response
+
+
+def test_prefix_cache_layout_puts_the_post_last():
+    adapter = LLMAdapter("sk-test", backend=OfflineBackend(), prompt_layout="prefix_cache")
+    first = adapter.get_user_prompt(TITLE, CONTENT, "linkedin")
+    second = adapter.get_user_prompt("Otro título", "Otro contenido", "linkedin")
+
+    prefix = os.path.commonprefix([first, second])
+    assert prefix.endswith("TÍTULO: ")
+    assert "IMPORTANTE:" in prefix and "character_count" in prefix
+    assert first.endswith(f"TÍTULO: {TITLE}\nCONTENIDO: {CONTENT}\n")
+
+    adapter.set_prompt_layout("classic")
+    classic = adapter.get_user_prompt(TITLE, CONTENT, "linkedin")
+    assert classic.index("TÍTULO: ") < classic.index("IMPORTANTE:")
+
+
+@pytest.mark.parametrize("layout", ["classic", "prefix_cache"])
+def test_cached_tokens_are_reported_per_network(layout):
+    metrics = InMemoryMetrics()
+    adapter = LLMAdapter(
+        "sk-test", backend=PrefixCachingBackend(), prompt_layout=layout, metrics=metrics
+    )
+    networks = ["linkedin", "tiktok"]
+    adapter.adapt_to_multiple_networks(TITLE, CONTENT, networks)
+
+    results = adapter.adapt_to_multiple_networks(
+        "Otro título", "Otro contenido distinto", networks, include_usage=True
+    )
+
+    usage = results["_usage"]["networks"]["linkedin"]
+    ratio = usage["cached_tokens"] / usage["prompt_tokens"]
+    tokens = metrics.summary()["tokens"]
+    assert set(tokens) == set(networks)
+    assert tokens["linkedin"]["cached_tokens"] == usage["cached_tokens"]
+    if layout == "prefix_cache":
+        # Todo salvo el post se sirve desde la caché
+        assert ratio > 0.8
+        assert metrics.summary()["latency"]["tiktok"]["round_trip_cached"]["count"] == 1
+    else:
+        assert ratio < 0.8
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+from email.utils import formatdate
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from rate_limiter import RateLimiter, is_transient_error, retry_after_seconds
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = Response(headers or {})
+
+
+def test_retry_after_seconds_reads_headers():
+    assert retry_after_seconds(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(APIError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(APIError(429)) is None
+    assert retry_after_seconds(ValueError("sin respuesta")) is None
+
+
+@pytest.fixture
+def local_time_ahead_of_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "Etc/GMT-5")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_retry_after_seconds_reads_http_dates(local_time_ahead_of_utc):
+    header = formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after_seconds(APIError(429, {"retry-after": header})) <= 30
+
+    # "-0000" da una fecha sin zona horaria: se toma como UTC, no como hora local
+    naive = formatdate(time.time() + 30)
+    assert naive.endswith("-0000")
+    assert 28 <= retry_after_seconds(APIError(429, {"retry-after": naive})) <= 30
+
+
+@pytest.mark.parametrize("header", ["soon", "Mon, 99 Foo 2024"])
+def test_retry_after_seconds_ignores_malformed_headers(header):
+    assert retry_after_seconds(APIError(429, {"retry-after": header})) is None
+
+
+def test_is_transient_error():
+    assert is_transient_error(APIError(503))
+    assert is_transient_error(APIError(408))
+    assert is_transient_error(ConnectionError())
+    assert not is_transient_error(APIError(400))
+    assert not is_transient_error(ValueError())
+
+
+def calls_failing_with(*errors):
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return fn, calls
+
+
+def test_call_retries_rate_limit_after_retry_after():
+    limiter = RateLimiter(max_retries=2)
+    fn, calls = calls_failing_with(APIError(429, {"retry-after-ms": "50"}))
+
+    assert limiter.call(fn, tokens=10) == "ok"
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.045
+
+
+def test_call_falls_back_to_backoff_on_malformed_retry_after():
+    limiter = RateLimiter(max_retries=1, base_delay=0.01)
+    fn, calls = calls_failing_with(APIError(429, {"retry-after": "soon"}))
+
+    assert limiter.call(fn, tokens=10) == "ok"
+    assert len(calls) == 2
+
+
+def test_call_raises_after_max_retries_and_on_client_errors():
+    limiter = RateLimiter(max_retries=1, base_delay=0.01)
+    fn, calls = calls_failing_with(APIError(503), APIError(503))
+    with pytest.raises(APIError):
+        limiter.call(fn, tokens=10)
+    assert len(calls) == 2
+
+    fn, calls = calls_failing_with(APIError(400))
+    with pytest.raises(APIError):
+        limiter.call(fn, tokens=10)
+    assert len(calls) == 1
+
+
+def test_requests_wait_for_budget():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._requests.level = 0
+
+    # 600 por minuto: cada petición reserva 0.1 s
+    start = time.monotonic()
+    limiter.acquire(tokens=10)
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+import llm_apadter
+from llm_backends import AsyncOfflineBackend, OfflineBackend
+from llm_metrics import InMemoryMetrics
+from response_cache import MemoryCache
+
+INPUT = {
+    "titulo": "Lanzamiento",
+    "contenido": "Presentamos nuestra nueva plataforma de análisis.",
+    "target_networks": ["linkedin", "facebook", "myspace"],
+}
+
+
+@pytest.fixture(autouse=True)
+def offline_registry(monkeypatch):
+    """Registro vacío con el backend sin red; la configuración se restaura al terminar"""
+    llm_apadter.reset_adapters()
+    monkeypatch.setattr(llm_apadter, "_registry_settings", llm_apadter._RegistrySettings())
+    llm_apadter.configure_backend("offline")
+    yield
+    llm_apadter.reset_adapters()
+
+
+def test_get_adapter_reuses_instance_per_key():
+    adapter = llm_apadter.get_adapter("sk-test", model="gpt-4o-mini")
+
+    assert llm_apadter.get_adapter("sk-test", model="gpt-4o-mini") is adapter
+    assert llm_apadter.get_adapter("sk-test", model="gpt-4o") is not adapter
+    assert isinstance(adapter.backend, OfflineBackend)
+
+
+def test_configure_cache_applies_to_existing_and_new_adapters():
+    existing = llm_apadter.get_adapter("sk-test")
+    cache = MemoryCache()
+
+    llm_apadter.configure_cache(cache, max_temperature=0.5)
+
+    created = llm_apadter.get_adapter("sk-test", model="gpt-4o")
+    for adapter in (existing, created):
+        assert adapter.cache is cache
+        assert adapter.cache_max_temperature == 0.5
+
+
+def test_configure_concurrency_applies_to_existing_adapters():
+    adapter = llm_apadter.get_adapter("sk-test")
+
+    llm_apadter.configure_concurrency(3)
+
+    assert adapter.max_concurrency == 3
+    with pytest.raises(ValueError):
+        llm_apadter.configure_concurrency(0)
+
+
+def test_configure_functions_reach_sync_and_async_adapters():
+    loop = asyncio.new_event_loop()
+    try:
+        sync_adapter = llm_apadter.get_adapter("sk-test")
+        async_adapter = loop.run_until_complete(_get_async_adapter())
+        metrics = InMemoryMetrics()
+
+        llm_apadter.configure_metrics(metrics)
+        llm_apadter.configure_prompt_layout("prefix_cache")
+        llm_apadter.configure_resilience(deadlines={"linkedin": 5.0})
+
+        for adapter in (sync_adapter, async_adapter):
+            assert adapter.metrics is metrics
+            assert adapter.prompt_layout == "prefix_cache"
+            assert adapter.deadlines == {"linkedin": 5.0}
+        assert sync_adapter.circuit_breaker is async_adapter.circuit_breaker
+
+        # Los creados después reciben la misma configuración
+        created = llm_apadter.get_adapter("sk-test", model="gpt-4o")
+        assert (created.metrics, created.prompt_layout) == (metrics, "prefix_cache")
+    finally:
+        llm_apadter.reset_adapters()
+        loop.close()
+
+
+def test_reset_adapters_discards_registered_adapters():
+    adapter = llm_apadter.get_adapter("sk-test")
+
+    llm_apadter.reset_adapters()
+
+    assert llm_apadter.get_adapter("sk-test") is not adapter
+
+
+def test_async_adapters_are_per_event_loop():
+    async def get_twice():
+        first = llm_apadter.get_async_adapter("sk-test")
+        assert llm_apadter.get_async_adapter("sk-test") is first
+        return first
+
+    loop = asyncio.new_event_loop()
+    first = loop.run_until_complete(get_twice())
+    loop.close()
+    second = asyncio.run(get_twice())
+
+    assert second is not first
+    assert isinstance(second.backend, AsyncOfflineBackend)
+    # Los adaptadores del loop cerrado se descartan al pedir uno nuevo
+    assert loop not in llm_apadter._async_adapters
+
+
+async def _get_async_adapter():
+    return llm_apadter.get_async_adapter("sk-test")
+
+
+def test_reset_adapters_closes_async_adapters_of_open_loops():
+    loop = asyncio.new_event_loop()
+    try:
+        adapter = loop.run_until_complete(_get_async_adapter())
+        llm_apadter.reset_adapters()
+        assert loop not in llm_apadter._async_adapters
+        assert loop.run_until_complete(_get_async_adapter()) is not adapter
+    finally:
+        loop.close()
+
+
+def test_process_content_offline():
+    assert list(llm_apadter.process_content(INPUT)) == ["linkedin", "facebook"]
+
+    results = llm_apadter.process_content(INPUT, include_usage=True)
+    assert list(results) == ["linkedin", "facebook", "_usage"]
+    assert results["_usage"]["total"]["calls"] == 2
+    assert results["_usage"]["total"]["cost_usd"] == 0.0
+
+
+def test_process_content_async_matches_sync():
+    results = asyncio.run(llm_apadter.process_content_async(INPUT))
+    assert results == llm_apadter.process_content(INPUT)
+
+    results = asyncio.run(llm_apadter.process_content_async(INPUT, include_usage=True))
+    assert results == llm_apadter.process_content(INPUT, include_usage=True)
+
+
+def test_process_content_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        llm_apadter.process_content({"titulo": 1, "contenido": "x", "target_networks": ["linkedin"]})
+
+
+def test_package_exports_services_lazily():
+    code = (
+        "import sys, src.services as services\n"
+        "assert 'src.services.job_queue' not in sys.modules\n"
+        "assert 'src.services.http_service' not in sys.modules\n"
+        "assert services.SQLiteBroker.__module__ == 'src.services.job_queue'\n"
+        "assert services.__all__ == sorted(services.__all__)\n"
+        "assert all(hasattr(services, name) for name in services.__all__)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=project_root, check=True)
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgePolicy,
+    hedged_call,
+    hedged_call_async,
+    is_endpoint_failure,
+)
+
+
+class EndpointError(Exception):
+    def __init__(self, status_code=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def fail(error):
+    def call():
+        raise error
+
+    return call
+
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=reset_timeout)
+    for _ in range(2):
+        with pytest.raises(EndpointError):
+            breaker.call(fail(EndpointError(503)))
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = open_breaker(reset_timeout=30.0)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "no se envía")
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    with pytest.raises(EndpointError):
+        breaker.call(fail(EndpointError(500)))
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(EndpointError):
+        breaker.call(fail(EndpointError(500)))
+    assert breaker.state == "closed"
+
+
+def test_breaker_ignores_client_errors():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    with pytest.raises(EndpointError):
+        breaker.call(fail(EndpointError(400)))
+    assert breaker.state == "closed"
+
+
+def test_is_endpoint_failure_only_counts_timeouts_connection_and_5xx():
+    assert is_endpoint_failure(EndpointError(502))
+    assert is_endpoint_failure(ConnectionError())
+    assert is_endpoint_failure(TimeoutError())
+    assert is_endpoint_failure(asyncio.TimeoutError())
+    assert not is_endpoint_failure(EndpointError(429))
+    assert not is_endpoint_failure(ValueError("JSON inválido"))
+    assert not is_endpoint_failure(TypeError())
+
+
+def test_breaker_ignores_local_errors():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    with pytest.raises(ValueError):
+        breaker.call(fail(ValueError("error del parseo")))
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_allows_a_single_probe():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(EndpointError):
+        breaker.call(fail(EndpointError(502)))
+    assert breaker.state == "open"
+
+
+def test_breaker_releases_probe_on_interruption():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(fail(KeyboardInterrupt()))
+
+    # La interrupción no dice nada del endpoint: la siguiente petición prueba
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_breaker_call_async():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30.0)
+
+    async def down():
+        raise EndpointError(503)
+
+    async def scenario():
+        with pytest.raises(EndpointError):
+            await breaker.call_async(down)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call_async(down)
+
+    asyncio.run(scenario())
+    assert breaker.state == "open"
+
+
+def test_hedge_delay_needs_min_samples():
+    policy = HedgePolicy(quantile=95, min_samples=3, min_delay=0.01)
+    policy.record("linkedin", 0.2)
+    policy.record("linkedin", 0.3)
+    assert policy.delay("linkedin") is None
+
+    policy.record("linkedin", 0.1)
+    assert policy.delay("linkedin") == 0.3
+
+
+def slow_then_fast():
+    calls = []
+
+    def fn():
+        calls.append("original")
+        time.sleep(0.2)
+        return "original"
+
+    def replica():
+        calls.append("réplica")
+        return "réplica"
+
+    return fn, replica, calls
+
+
+def test_hedged_call_uses_replica_within_free_slots():
+    fn, replica, calls = slow_then_fast()
+    slots = threading.BoundedSemaphore(2)
+    slots.acquire()  # el hueco de la petición original
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = hedged_call(fn, 0.01, executor, replica=replica, slots=slots)
+
+    assert result == ("réplica", True)
+    # La réplica devolvió su hueco al terminar
+    assert slots.acquire(blocking=False)
+
+
+def test_hedged_call_skips_replica_without_free_slots():
+    fn, replica, calls = slow_then_fast()
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    hedges = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = hedged_call(
+            fn, 0.01, executor, on_hedge=lambda: hedges.append(1), replica=replica, slots=slots
+        )
+
+    assert result == ("original", False)
+    assert calls == ["original"] and hedges == []
+
+
+def test_hedged_call_async_respects_slots():
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "original"
+
+    async def fast():
+        return "réplica"
+
+    async def scenario(free):
+        slots = asyncio.Semaphore(free + 1)
+        async with slots:
+            return await hedged_call_async(slow, 0.01, replica=fast, slots=slots)
+
+    assert asyncio.run(scenario(free=1)) == ("réplica", True)
+    assert asyncio.run(scenario(free=0)) == ("original", False)
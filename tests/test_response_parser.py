@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from llm_metrics import InMemoryMetrics
+from response_parser import parse_json_object
+from response_repair import RepairBudget, build_repair_request
+
+CORPUS_PATH = os.path.join(project_root, "tests", "data", "respuestas_llm.jsonl")
+
+with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+    CORPUS = [json.loads(line) for line in f if line.strip()]
+
+
+def usable(response):
+    """Si el parser extrae una adaptación utilizable (como en benchmark_parser)"""
+    try:
+        result = parse_json_object(response)
+    except ValueError:
+        return False
+    return isinstance(result, dict) and "text" in result
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+def test_parse_json_object_corpus(case):
+    assert usable(case["response"]) == case["valid"]
+
+
+def test_parse_json_object_returns_first_of_two_objects():
+    text = '{"text": "Primera"}\n{"text": "Segunda"}'
+    assert parse_json_object(text) == {"text": "Primera"}
+
+
+def test_parse_json_object_skips_placeholders_and_braces_inside_strings():
+    text = 'Usa {clave}: {"text": "a } b {", "n": {"x": 1}} y {sin cerrar'
+    assert parse_json_object(text) == {"text": "a } b {", "n": {"x": 1}}
+
+
+def test_parse_json_object_starts_at_the_markdown_block():
+    text = 'Ejemplo: {"text": "no"}\n```json\n{"text": "sí"}\n```'
+    assert parse_json_object(text) == {"text": "sí"}
+
+
+def test_parse_json_object_reports_truncation():
+    with pytest.raises(ValueError, match="Unterminated string"):
+        parse_json_object('Nota {x}. {"text": "Respuesta cortada por max_')
+    with pytest.raises(ValueError):
+        parse_json_object("Lo siento, no puedo ayudar.")
+
+
+def test_parse_json_object_ignores_objects_nested_in_invalid_json():
+    with pytest.raises(ValueError):
+        parse_json_object('{"text": "Dijo "hola"", "meta": {"a": 1}}')
+
+
+def test_parse_json_object_keeps_fences_inside_strings():
+    text = '{"text": "Usa ```json {x}``` en el código"}'
+    assert parse_json_object(text) == {"text": "Usa ```json {x}``` en el código"}
+
+
+def test_repair_budget_counts_attempts_and_tokens():
+    request = build_repair_request("gpt-4o-mini", '{"text": "x"}', "faltan campos", ["text"], 200)
+    budget = RepairBudget(max_attempts=2, max_tokens=10_000)
+    assert budget.allows(request)
+
+    budget.spend(request, {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70})
+    assert budget.attempts == 1
+    assert budget.remaining_tokens == 10_000 - 70
+    assert budget.usage["total_tokens"] == 70
+
+    assert not RepairBudget(max_attempts=2, max_tokens=1).allows(request)
+    assert not RepairBudget(max_attempts=0, max_tokens=10_000).allows(request)
+
+
+def test_repair_request_caps_output_by_kind_of_problem():
+    bad_output = '{"text": "x"'
+    fix = build_repair_request("gpt-4o-mini", bad_output, "faltan campos", ["text"], 500)
+    rewrite = build_repair_request(
+        "gpt-4o-mini", bad_output, "no es un JSON válido", ["text"], 500, rewrite=True
+    )
+
+    # Corregir un objeto cuesta lo que el objeto; rehacer uno cortado, lo de la red
+    assert fix["max_tokens"] < 500
+    assert rewrite["max_tokens"] == 500
+
+
+class TruncatingBackend(OfflineBackend):
+    """Devuelve la primera adaptación sin campos; las reparaciones, completas"""
+
+    first_response = '```json\n{"text": "Sin el resto de campos"}\n```'
+
+    def __init__(self):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.kinds = []
+        self.requests = []
+
+    def respond(self, request, network):
+        self.kinds.append(request["backend_task"]["kind"])
+        self.requests.append(request)
+        if request["backend_task"]["kind"] == "adapt":
+            return self.first_response
+        return super().respond(request, network)
+
+
+class CutOffBackend(TruncatingBackend):
+    """La primera adaptación llega cortada por ``max_tokens``"""
+
+    first_response = '{"text": "Una publicación que se quedó a med'
+
+
+def test_adapt_content_repairs_missing_fields():
+    backend = TruncatingBackend()
+    metrics = InMemoryMetrics()
+    adapter = LLMAdapter("sk-test", backend=backend, metrics=metrics)
+
+    adapted = adapter.adapt_content("Título", "Contenido de la publicación", "linkedin")
+
+    assert set(adapter.get_json_structure("linkedin")) <= set(adapted)
+    assert backend.kinds == ["adapt", "repair"]
+    assert metrics.summary()["calls"]["linkedin"] == {"repaired": 1}
+
+
+def test_adapt_content_rewrites_truncated_json_with_the_network_budget():
+    backend = CutOffBackend()
+    adapter = LLMAdapter("sk-test", backend=backend)
+
+    adapter.adapt_content("Título", "Contenido de la publicación", "linkedin")
+
+    assert backend.kinds == ["adapt", "repair"]
+    repair = backend.requests[1]
+    assert repair["max_tokens"] == adapter.max_output_tokens("linkedin")
+    assert repair["max_tokens"] > len(CutOffBackend.first_response)
+
+
+def test_adapt_content_without_repair_budget_fails():
+    adapter = LLMAdapter("sk-test", backend=TruncatingBackend(), max_repair_attempts=0)
+
+    with pytest.raises(Exception, match="linkedin"):
+        adapter.adapt_content("Título", "Contenido", "linkedin")
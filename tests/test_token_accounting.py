@@ -0,0 +1,102 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# Configurar rutas
+project_root = os.path.dirname(os.path.dirname(__file__))
+services_path = os.path.join(project_root, "src", "services")
+sys.path.insert(0, services_path)
+
+from llm_apadter import LLMAdapter
+from llm_backends import OfflineBackend
+from token_accounting import (
+    PromptTooLargeError,
+    UsageSummary,
+    chunk_text,
+    count_message_tokens,
+    encoding_name,
+    estimate_tokens,
+)
+
+LONG_CONTENT = "\n\n".join(
+    f"Párrafo {i}: la plataforma integra analítica, alertas y paneles." for i in range(60)
+)
+
+
+class RecordingBackend(OfflineBackend):
+    def __init__(self):
+        super().__init__(LLMAdapter.CHARACTER_LIMITS)
+        self.requests = []
+
+    def respond(self, request, network):
+        self.requests.append(request)
+        return super().respond(request, network)
+
+
+@pytest.mark.parametrize(
+    "model, encoding",
+    [
+        ("gpt-4o-mini", "o200k_base"),
+        ("gpt-4.1-nano", "o200k_base"),
+        ("o3-mini", "o200k_base"),
+        ("gpt-4-turbo", "cl100k_base"),
+        ("gpt-3.5-turbo", "cl100k_base"),
+        # Un nombre que empieza por "o" no basta para ser de la familia o1/o3
+        ("orca-mini", "cl100k_base"),
+    ],
+)
+def test_encoding_name_matches_model_families(model, encoding):
+    assert encoding_name(model) == encoding
+
+
+def test_chunk_text_respects_the_budget():
+    chunks = chunk_text(LONG_CONTENT, 50, "gpt-4o-mini")
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert chunks[0].startswith("Párrafo 0:")
+
+
+def test_oversize_prompt_is_rejected_before_the_call():
+    backend = RecordingBackend()
+    adapter = LLMAdapter("sk-test", backend=backend, max_input_tokens=300)
+
+    def build(title, content):
+        return adapter.build_request(title, content, "linkedin")
+
+    with pytest.raises(PromptTooLargeError, match="máximo 300"):
+        adapter.fit_request(build, "Título", LONG_CONTENT, "linkedin")
+    with pytest.raises(Exception, match="Prompt demasiado largo para linkedin"):
+        adapter.adapt_content("Título", LONG_CONTENT, "linkedin")
+    assert backend.requests == []
+
+
+def test_truncate_policy_sends_the_first_chunk_and_logs_the_rest(caplog):
+    backend = RecordingBackend()
+    adapter = LLMAdapter(
+        "sk-test", backend=backend, max_input_tokens=600, oversize_policy="truncate"
+    )
+
+    with caplog.at_level(logging.WARNING):
+        adapter.adapt_content("Título", LONG_CONTENT, "linkedin")
+
+    (request,) = backend.requests
+    assert count_message_tokens(request["messages"], request["model"]) <= 600
+    assert "Párrafo 0:" in request["messages"][1]["content"]
+    assert "Párrafo 59:" not in request["messages"][1]["content"]
+    assert "se descartan los otros" in caplog.text
+
+
+def test_usage_summary_adds_calls_and_cost():
+    summary = UsageSummary("gpt-4o-mini")
+    call = {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}
+    summary.add("linkedin", call)
+    summary.add("facebook", call)
+
+    usage = summary.to_dict()
+    assert set(usage["networks"]) == {"linkedin", "facebook"}
+    assert usage["total"]["calls"] == 2
+    assert usage["total"]["total_tokens"] == 3000
+    assert usage["total"]["cost_usd"] == pytest.approx(2 * (1000 * 0.15 + 500 * 0.60) / 1e6)